@@ -0,0 +1,92 @@
+"""Cold-start time of the inference app, per serving mode.
+
+Each run starts `uvicorn src.app.main:app` in a fresh process and polls
+/health/ready until it answers 200, which includes the model load and the
+warm-up inference. The import time and the startup phases the app exports
+on /metrics (wine_app_startup_seconds) are reported as well.
+
+    python benchmarks/app_startup.py --mode onnx --mode local
+    python benchmarks/app_startup.py --mode onnx --runs 5 --max-seconds 3
+
+With --max-seconds the script exits non-zero when the median time to
+ready of any mode exceeds it, so it can guard against regressions in CI.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def startup_phases(text):
+    phases = {}
+    for line in text.splitlines():
+        if line.startswith("wine_app_startup_seconds{"):
+            labels, value = line.rsplit(" ", 1)
+            phases[labels.split('"')[1]] = float(value)
+    return phases
+
+
+def measure(mode, timeout):
+    port = free_port()
+    env = dict(os.environ, SERVING_MODE=mode, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"App exited with code {proc.returncode} in mode '{mode}'")
+            try:
+                if httpx.get(f"{url}/health/ready", timeout=1).status_code == 200:
+                    ready = time.perf_counter() - start
+                    return {"ready_seconds": ready, "phases": startup_phases(httpx.get(f"{url}/metrics").text)}
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"App was not ready after {timeout}s in mode '{mode}'")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app cold start per serving mode")
+    parser.add_argument("--mode", action="append", help="Serving mode to start (repeatable), default onnx")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--max-seconds", type=float, help="Fail when a mode's median time to ready exceeds this")
+    args = parser.parse_args()
+
+    report, failed = {}, False
+    for mode in args.mode or ["onnx"]:
+        runs = [measure(mode, args.timeout) for _ in range(args.runs)]
+        ready = sorted(r["ready_seconds"] for r in runs)
+        median = ready[len(ready) // 2]
+        report[mode] = {"median_ready_seconds": median, "runs": runs}
+        phases = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in runs[-1]["phases"].items())
+        print(f"{mode:8s} ready in {median:.2f}s (median of {args.runs}; {phases})")
+        if args.max_seconds and median > args.max_seconds:
+            print(f"  over the {args.max_seconds}s limit")
+            failed = True
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
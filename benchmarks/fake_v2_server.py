@@ -0,0 +1,87 @@
+"""Stand-in KServe V2 inference server for offline benchmarks.
+
+Answers POST /v2/models/<any model>/infer like the Triton ensembles do, so
+the app's Triton (HTTP, binary tensors) and Seldon (JSON tensors) proxies
+can be load-tested without a real server. The "model" is the row sum of
+the inputs (per-feature [N, 1] inputs or one packed [N, 13] input), and
+`--delay-ms` adds a fixed server-side latency.
+
+    python benchmarks/fake_v2_server.py --port 8900 --delay-ms 0.5
+"""
+import argparse
+import asyncio
+import json
+import numpy as np
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+HEADER_LENGTH = "inference-header-content-length"
+
+
+def read_inputs(body, header_length):
+    # V2 request -> list of float32 arrays, binary data extension or JSON "data"
+    header = json.loads(body[:header_length] if header_length is not None else body)
+    offset = header_length or 0
+    arrays = []
+    for tensor in header["inputs"]:
+        shape = tensor["shape"]
+        size = (tensor.get("parameters") or {}).get("binary_data_size")
+        if size is not None:
+            arrays.append(np.frombuffer(body[offset:offset + size], dtype=np.float32).reshape(shape))
+            offset += size
+        else:
+            arrays.append(np.asarray(tensor["data"], dtype=np.float32).reshape(shape))
+    return header, arrays
+
+
+def create_app(delay_ms=0.0):
+    async def infer(request: Request):
+        body = await request.body()
+        length = request.headers.get(HEADER_LENGTH)
+        header, arrays = read_inputs(body, int(length) if length else None)
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        prediction = sum(a.reshape(len(a), -1).sum(axis=1) for a in arrays).astype(np.float32).reshape(-1, 1)
+
+        outputs = header.get("outputs") or [{"name": "prediction"}]
+        binary = any((o.get("parameters") or {}).get("binary_data") for o in outputs)
+        if not binary:
+            return JSONResponse({"outputs": [{
+                "name": "prediction", "datatype": "FP32", "shape": list(prediction.shape),
+                "data": prediction.ravel().tolist()
+            }]})
+        raw = prediction.tobytes()
+        out_header = json.dumps({"outputs": [{
+            "name": "prediction", "datatype": "FP32", "shape": list(prediction.shape),
+            "parameters": {"binary_data_size": len(raw)}
+        }]}).encode()
+        return Response(
+            out_header + raw,
+            media_type="application/octet-stream",
+            headers={"Inference-Header-Content-Length": str(len(out_header))}
+        )
+
+    async def ready(request: Request):
+        return Response(status_code=200)
+
+    return Starlette(routes=[
+        Route("/v2/models/{model}/infer", infer, methods=["POST"]),
+        Route("/v2/health/ready", ready),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake V2 inference server (row-sum model)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.delay_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""Offline end-to-end benchmark suite for every serving mode.
+
+Targets (all local, no trained model or inference server needed):
+
+    app-local    the app (uvicorn) in local sklearn mode
+    app-onnx     the app in embedded ONNX Runtime mode
+    app-triton   the app proxying to benchmarks/fake_v2_server.py over the Triton client
+    app-seldon   the app proxying to the fake V2 server over the Seldon client
+    onnx-direct  the ONNX model in this process, no HTTP
+
+The model is a seeded synthetic random forest (pickled and exported to
+ONNX), so results are comparable across commits. Each app target gets
+closed-loop load (`--concurrency` clients sending back to back) and
+open-loop load (`--rates` requests/s at fixed intervals, latency counted
+from the scheduled send time so a stalled server is not hidden) for every
+`--batch-sizes` value; batch size 1 uses /predict, larger ones
+/predict/batch. Reported per scenario: requests/s, rows/s, p50/p95/p99
+latency, errors, CPU (% of one core) and RSS of the serving process.
+
+Results are written to `--output` as JSON. With `--baseline` they are
+compared to an earlier run, and the script exits 1 when throughput drops
+or p99 grows by more than `--tolerance`:
+
+    python benchmarks/suite.py --output benchmarks/results/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/results/baseline.json
+    make benchmark
+"""
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from src.model.features import FEATURE_NAMES, NUM_FEATURES  # noqa: E402
+
+TARGETS = ("app-local", "app-onnx", "app-triton", "app-seldon", "onnx-direct")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+# Differences below this are noise whatever the relative change
+MIN_P99_DELTA_MS = 0.5
+
+
+def build_models(directory, trees=50, seed=0):
+    from sklearn.ensemble import RandomForestRegressor
+    from src.model.optimize_onnx import convert
+    rng = np.random.default_rng(seed)
+    X = rng.random((2000, NUM_FEATURES)).astype(np.float32)
+    model = RandomForestRegressor(n_estimators=trees, max_depth=8, random_state=seed)
+    model.fit(X, X @ rng.random(NUM_FEATURES))
+    with open(os.path.join(directory, "model.pkl"), "wb") as f:
+        pickle.dump(model, f)
+    with open(os.path.join(directory, "model.onnx"), "wb") as f:
+        f.write(convert(model))
+
+
+class ProcessStats:
+    """CPU time and memory of one process from /proc (Linux)."""
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+    def memory_mb(self):
+        values = {}
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(rest.split()[0]) / 1024
+        return values.get("VmRSS", 0.0), values.get("VmHWM", 0.0)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(cmd, env, url, ready_path, timeout=60):
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{' '.join(cmd)} exited with code {proc.returncode}")
+        try:
+            if httpx.get(url + ready_path, timeout=1).status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError(f"{' '.join(cmd)} was not ready after {timeout}s")
+
+
+def stop(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def request_for(batch_size, seed=0):
+    # (path, JSON body) for one request of `batch_size` rows
+    rows = np.random.default_rng(seed).random((batch_size, NUM_FEATURES)).tolist()
+    if batch_size == 1:
+        return "/predict", dict(zip(FEATURE_NAMES, rows[0]))
+    return "/predict/batch", {"instances": [dict(zip(FEATURE_NAMES, row)) for row in rows]}
+
+
+async def closed_loop(send, concurrency, duration):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start_time = time.perf_counter()
+            if await send():
+                latencies.append(time.perf_counter() - start_time)
+            else:
+                errors += 1
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start_time
+
+
+async def open_loop(send, rate, duration, max_outstanding=10000):
+    # Fixed arrival schedule; latency includes any time a request spent behind schedule
+    latencies, errors, tasks = [], 0, []
+    interval = 1.0 / rate
+
+    async def one(scheduled):
+        nonlocal errors
+        if await send():
+            latencies.append(time.perf_counter() - scheduled)
+        else:
+            errors += 1
+
+    start_time = time.perf_counter()
+    for i in range(int(rate * duration)):
+        scheduled = start_time + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending = sum(not t.done() for t in tasks[-max_outstanding:])
+        if pending >= max_outstanding:
+            errors += 1
+            continue
+        tasks.append(asyncio.ensure_future(one(scheduled)))
+    await asyncio.gather(*tasks)
+    return latencies, errors, time.perf_counter() - start_time
+
+
+def summarize(latencies, errors, elapsed, rows, stats=None, cpu_before=None):
+    latencies = np.asarray(latencies) * 1000 if latencies else np.array([np.nan])
+    done = int(np.isfinite(latencies).sum())
+    result = {
+        "requests_per_second": done / elapsed,
+        "rows_per_second": done * rows / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "requests": done,
+        "errors": errors,
+    }
+    if stats is not None:
+        rss, peak = stats.memory_mb()
+        result.update(
+            cpu_percent=100 * (stats.cpu_seconds() - cpu_before) / elapsed,
+            rss_mb=rss,
+            peak_rss_mb=peak,
+        )
+    return result
+
+
+def run_app_target(target, args, model_dir):
+    mode = target.split("-", 1)[1]
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ, PYTHONPATH=ROOT, SERVING_MODE=mode,
+        MODEL_PATH=model_dir, ONNX_MODEL_PATH=os.path.join(model_dir, "model.onnx"),
+        MODEL_WATCH_SECONDS="0", LOG_LEVEL="WARNING", MAX_BATCH_SIZE=str(max(args.batch_sizes)),
+    )
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    env.pop("TRITON_URL", None)
+    env.pop("SELDON_URL", None)
+
+    fake = None
+    if mode in ("triton", "seldon"):
+        fake_port = free_port()
+        fake = start(
+            [sys.executable, "benchmarks/fake_v2_server.py", "--port", str(fake_port), "--delay-ms", str(args.delay_ms)],
+            env, f"http://127.0.0.1:{fake_port}", "/v2/health/ready"
+        )
+        env["TRITON_URL" if mode == "triton" else "SELDON_URL"] = (
+            f"127.0.0.1:{fake_port}" if mode == "triton" else f"http://127.0.0.1:{fake_port}"
+        )
+
+    app = None
+    try:
+        app = start(
+            [sys.executable, "-m", "uvicorn", "src.app.main:app", "--port", str(port), "--log-level", "warning"],
+            env, url, "/health/ready"
+        )
+        stats = ProcessStats(app.pid)
+        return asyncio.run(drive_app(url, stats, args))
+    finally:
+        if app is not None:
+            stop(app)
+        if fake is not None:
+            stop(fake)
+
+
+async def drive_app(url, stats, args):
+    results = {}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=1000)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as http:
+        for batch_size in args.batch_sizes:
+            path, body = request_for(batch_size)
+            payload = json.dumps(body).encode()
+            headers = {"content-type": "application/json"}
+
+            async def send():
+                try:
+                    response = await http.post(path, content=payload, headers=headers)
+                    return response.status_code == 200
+                except httpx.HTTPError:
+                    return False
+
+            await closed_loop(send, max(args.concurrency), args.warmup)
+            for concurrency in args.concurrency:
+                cpu_before = stats.cpu_seconds()
+                latencies, errors, elapsed = await closed_loop(send, concurrency, args.duration)
+                results[f"closed/c{concurrency}/b{batch_size}"] = summarize(
+                    latencies, errors, elapsed, batch_size, stats, cpu_before
+                )
+            for rate in args.rates:
+                cpu_before = stats.cpu_seconds()
+                latencies, errors, elapsed = await open_loop(send, rate, args.duration)
+                results[f"open/r{rate}/b{batch_size}"] = summarize(
+                    latencies, errors, elapsed, batch_size, stats, cpu_before
+                )
+    return results
+
+
+def run_onnx_direct(args, model_dir):
+    # Closed loop only: `concurrency` threads calling one session, as the app's worker threads would
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = 1
+    options.inter_op_num_threads = 1
+    session = ort.InferenceSession(os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"])
+    stats = ProcessStats(os.getpid())
+    results = {}
+    for batch_size in args.batch_sizes:
+        X = np.random.default_rng(0).random((batch_size, NUM_FEATURES)).astype(np.float32)
+        for concurrency in args.concurrency:
+            samples = [[] for _ in range(concurrency)]
+            deadline = time.perf_counter() + args.duration
+
+            def run(out):
+                while time.perf_counter() < deadline:
+                    start_time = time.perf_counter()
+                    session.run(None, {"float_input": X})
+                    out.append(time.perf_counter() - start_time)
+
+            threads = [threading.Thread(target=run, args=(out,)) for out in samples]
+            cpu_before = stats.cpu_seconds()
+            start_time = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start_time
+            latencies = [s for out in samples for s in out]
+            results[f"closed/c{concurrency}/b{batch_size}"] = summarize(
+                latencies, 0, elapsed, batch_size, stats, cpu_before
+            )
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of `current` against `baseline` results, as readable lines."""
+    regressions = []
+    for target, scenarios in current.items():
+        for scenario, result in scenarios.items():
+            base = baseline.get(target, {}).get(scenario)
+            if base is None:
+                continue
+            name = f"{target} {scenario}"
+            if result["rows_per_second"] < base["rows_per_second"] * (1 - tolerance):
+                regressions.append(
+                    f"{name}: throughput {result['rows_per_second']:.0f} rows/s vs {base['rows_per_second']:.0f}"
+                )
+            if (result["p99_ms"] > base["p99_ms"] * (1 + tolerance)
+                    and result["p99_ms"] - base["p99_ms"] > MIN_P99_DELTA_MS):
+                regressions.append(f"{name}: p99 {result['p99_ms']:.2f}ms vs {base['p99_ms']:.2f}ms")
+            if result["errors"] > base["errors"]:
+                regressions.append(f"{name}: {result['errors']} errors vs {base['errors']}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for every serving mode")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"Comma-separated subset of {list(TARGETS)}")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 16], help="Closed-loop client counts")
+    parser.add_argument("--rates", type=int_list, default=[200], help="Open-loop request rates per second")
+    parser.add_argument("--batch-sizes", type=int_list, default=[1, 8], help="Rows per request")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1, help="Seconds of unmeasured load per batch size")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Latency added by the fake V2 server")
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative throughput/p99 change")
+    args = parser.parse_args()
+
+    targets = [t for t in args.targets.split(",") if t]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"Unknown targets {sorted(unknown)}, use {list(TARGETS)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-model-") as model_dir:
+        build_models(model_dir)
+        for target in targets:
+            print(f"Running {target} ...", flush=True)
+            results[target] = run_onnx_direct(args, model_dir) if target == "onnx-direct" else run_app_target(
+                target, args, model_dir
+            )
+            for scenario, r in results[target].items():
+                cpu = f" cpu {r['cpu_percent']:5.0f}% rss {r['rss_mb']:6.1f}MB" if "cpu_percent" in r else ""
+                print(f"  {scenario:16s} {r['requests_per_second']:9.0f} req/s {r['rows_per_second']:10.0f} rows/s "
+                      f"p50 {r['p50_ms']:7.2f} p95 {r['p95_ms']:7.2f} p99 {r['p99_ms']:7.2f} ms "
+                      f"errors {r['errors']}{cpu}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        print(f"Compared with {args.baseline} (commit {baseline['meta'].get('commit')}), tolerance {args.tolerance:.0%}")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("  no regressions")
+
+
+if __name__ == "__main__":
+    main()
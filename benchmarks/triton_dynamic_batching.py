@@ -0,0 +1,137 @@
+"""Tune dynamic_batching for the Python preprocessing/postprocessing backends.
+
+For every candidate (preferred_batch_size, max_queue_delay_microseconds)
+the script reloads both Python models on a running Triton with that
+config override, drives the named-feature ensemble with concurrent
+single-row requests and reports throughput and latency. The best
+candidate within the p99 budget is printed as a config.pbtxt block; with
+--repo it is also written into both Python models' config.pbtxt there,
+and every measurement into dynamic_batching_profile.json next to them.
+
+Triton must run with explicit model control so models can be reloaded:
+
+    tritonserver --model-repository=/models --model-control-mode=explicit --load-model=*
+
+    python benchmarks/triton_dynamic_batching.py --url localhost:8080 --concurrency 32
+    python benchmarks/triton_dynamic_batching.py --url localhost:8080 --repo model_repository
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import numpy as np
+import tritonclient.http as httpclient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.app.backends import ENSEMBLE_MODELS, FEATURE_NAMES, TritonBackend  # noqa: E402
+
+PYTHON_MODELS = ["preprocessing", "postprocessing"]
+
+PREFERRED_SIZES = [[8], [4, 8], [2, 4, 8]]
+QUEUE_DELAYS_US = [0, 50, 100, 250, 500, 1000]
+
+
+def apply_config(client, preferred, delay_us):
+    for name in PYTHON_MODELS:
+        config = client.get_model_config(name)
+        config["dynamic_batching"] = {
+            "preferred_batch_size": preferred,
+            "max_queue_delay_microseconds": delay_us
+        }
+        client.load_model(name, config=json.dumps(config))
+    # The ensemble picks up the reloaded steps
+    client.load_model(ENSEMBLE_MODELS["named"])
+
+
+def batching_block(preferred, delay_us):
+    return (
+        "dynamic_batching {\n"
+        f"  preferred_batch_size: [ {', '.join(str(p) for p in preferred)} ]\n"
+        f"  max_queue_delay_microseconds: {delay_us}\n"
+        "}\n"
+    )
+
+
+def write_repo(repo, block, report):
+    # Replace the placeholder (or earlier tuned) block and comment in the Python model configs
+    for name in PYTHON_MODELS:
+        path = os.path.join(repo, name, "config.pbtxt")
+        with open(path) as f:
+            text = f.read()
+        text = re.sub(r"(#[^\n]*\n)*dynamic_batching\s*\{[^}]*\}\n?", "", text)
+        comment = "# Tuned by benchmarks/triton_dynamic_batching.py, see ../dynamic_batching_profile.json\n"
+        text = re.sub(r"(max_batch_size:\s*\d+\n)", lambda m: m.group(1) + comment + block, text, count=1)
+        with open(path, "w") as f:
+            f.write(text)
+    with open(os.path.join(repo, "dynamic_batching_profile.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+
+async def drive(url, concurrency, duration):
+    backend = TritonBackend(url, protocol="http", layout="named")
+    await backend.start()
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        X = np.random.rand(1, len(FEATURE_NAMES)).astype(np.float32)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await backend.predict(X)
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await backend.close()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+    return len(latencies) / elapsed, p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="localhost:8080", help="Triton HTTP endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per candidate")
+    parser.add_argument("--p99-budget-ms", type=float, default=20.0)
+    parser.add_argument("--repo", help="Model repository whose Python model configs get the best block")
+    args = parser.parse_args()
+
+    client = httpclient.InferenceServerClient(url=args.url)
+    results = []
+
+    print(f"{'preferred':<12} {'delay_us':>8} {'req/s':>9} {'p50 ms':>7} {'p99 ms':>7}")
+    for preferred in PREFERRED_SIZES:
+        for delay_us in QUEUE_DELAYS_US:
+            apply_config(client, preferred, delay_us)
+            throughput, p50, p99 = asyncio.run(drive(args.url, args.concurrency, args.duration))
+            results.append((throughput, p99, preferred, delay_us, p50))
+            print(f"{str(preferred):<12} {delay_us:>8} {throughput:>9.0f} {p50:>7.2f} {p99:>7.2f}")
+
+    within_budget = [r for r in results if r[1] <= args.p99_budget_ms] or results
+    throughput, p99, preferred, delay_us, _ = max(within_budget)
+    block = batching_block(preferred, delay_us)
+    print(f"\nBest: {throughput:.0f} req/s at p99 {p99:.2f} ms")
+    print(block, end="")
+
+    if args.repo:
+        write_repo(args.repo, block, {
+            "chosen": {"preferred_batch_size": preferred, "max_queue_delay_microseconds": delay_us},
+            "settings": {"concurrency": args.concurrency, "duration": args.duration, "p99_budget_ms": args.p99_budget_ms},
+            "results": [
+                {"preferred_batch_size": p, "max_queue_delay_microseconds": d,
+                 "requests_per_second": t, "p50_ms": m, "p99_ms": q}
+                for t, q, p, d, m in results
+            ],
+        })
+        print(f"Wrote the block to {args.repo}/{{{','.join(PYTHON_MODELS)}}}/config.pbtxt")
+
+
+if __name__ == "__main__":
+    main()
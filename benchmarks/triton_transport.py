@@ -0,0 +1,167 @@
+"""Compare Triton request transports for the ensemble-model call.
+
+Measures, per request, the client-side cost of encoding the 13 feature
+tensors and decoding the prediction for:
+
+  * http-json   - V2 JSON tensors (what the app used to send)
+  * http-binary - V2 HTTP with the binary tensor data extension
+  * grpc        - protobuf ModelInferRequest with raw tensor contents
+
+With --http-url / --grpc-url pointing at a running Triton the script also
+measures end-to-end latency over a persistent client.
+
+    python benchmarks/triton_transport.py
+    python benchmarks/triton_transport.py --http-url localhost:8080 --grpc-url localhost:8001
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import numpy as np
+import tritonclient.http as httpclient
+import tritonclient.http._utils as http_utils
+import tritonclient.grpc as grpcclient
+import tritonclient.grpc._utils as grpc_utils
+from tritonclient.grpc import service_pb2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.app.backends import ENSEMBLE_MODELS, FEATURE_NAMES, TritonBackend  # noqa: E402
+
+
+def http_request(X, binary):
+    inputs = []
+    for i, name in enumerate(FEATURE_NAMES):
+        column = np.ascontiguousarray(X[:, i:i + 1])
+        infer_input = httpclient.InferInput(name, column.shape, "FP32")
+        infer_input.set_data_from_numpy(column, binary_data=binary)
+        inputs.append(infer_input)
+    outputs = [httpclient.InferRequestedOutput("prediction", binary_data=binary)]
+    body, json_size = http_utils._get_inference_request(
+        inputs, "", outputs, 0, False, False, 0, None, None
+    )
+    return body, json_size
+
+
+def http_response(y, binary):
+    # Body a Triton server would send back for the ensemble output
+    if not binary:
+        body = json.dumps({"outputs": [{
+            "name": "prediction", "datatype": "FP32", "shape": list(y.shape), "data": y.ravel().tolist()
+        }]}).encode()
+        return body, None
+    header = json.dumps({"outputs": [{
+        "name": "prediction", "datatype": "FP32", "shape": list(y.shape),
+        "parameters": {"binary_data_size": y.nbytes}
+    }]}).encode()
+    return header + y.tobytes(), len(header)
+
+
+def grpc_request(X):
+    inputs = []
+    for i, name in enumerate(FEATURE_NAMES):
+        column = np.ascontiguousarray(X[:, i:i + 1])
+        infer_input = grpcclient.InferInput(name, column.shape, "FP32")
+        infer_input.set_data_from_numpy(column)
+        inputs.append(infer_input)
+    outputs = [grpcclient.InferRequestedOutput("prediction")]
+    request = grpc_utils._get_inference_request(
+        ENSEMBLE_MODELS["named"], inputs, "", "", outputs, 0, False, False, 0, None, None
+    )
+    return request.SerializeToString()
+
+
+def grpc_response(y):
+    response = service_pb2.ModelInferResponse(model_name=ENSEMBLE_MODELS["named"])
+    output = response.outputs.add()
+    output.name = "prediction"
+    output.datatype = "FP32"
+    output.shape.extend(y.shape)
+    response.raw_output_contents.append(y.tobytes())
+    return response.SerializeToString()
+
+
+def time_per_call(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def serialization_report(batch_size, iterations):
+    X = np.random.rand(batch_size, len(FEATURE_NAMES)).astype(np.float32)
+    y = np.random.rand(batch_size, 1).astype(np.float32)
+    rows = []
+
+    for label, binary in (("http-json", False), ("http-binary", True)):
+        body, json_size = http_request(X, binary)
+        response_body, header_length = http_response(y, binary)
+
+        def roundtrip():
+            http_request(X, binary)
+            result = httpclient.InferResult.from_response_body(response_body, header_length=header_length)
+            result.as_numpy("prediction")
+
+        rows.append((label, len(body), len(response_body), time_per_call(roundtrip, iterations)))
+
+    request_bytes = grpc_request(X)
+    response_bytes = grpc_response(y)
+
+    def grpc_roundtrip():
+        grpc_request(X)
+        parsed = service_pb2.ModelInferResponse()
+        parsed.ParseFromString(response_bytes)
+        grpcclient.InferResult(parsed).as_numpy("prediction")
+
+    rows.append(("grpc", len(request_bytes), len(response_bytes), time_per_call(grpc_roundtrip, iterations)))
+    return rows
+
+
+async def latency_report(url, protocol, batch_size, iterations):
+    backend = TritonBackend(url, protocol=protocol)
+    X = np.random.rand(batch_size, len(FEATURE_NAMES)).astype(np.float32)
+    await backend.start()
+    try:
+        await backend.predict(X)
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await backend.predict(X)
+            latencies.append((time.perf_counter() - start) * 1e3)
+    finally:
+        await backend.close()
+    return np.percentile(latencies, [50, 95, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", default="1,8", help="Comma separated rows per request")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--http-url", help="Triton HTTP endpoint, e.g. localhost:8080")
+    parser.add_argument("--grpc-url", help="Triton gRPC endpoint, e.g. localhost:8001")
+    args = parser.parse_args()
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    print("Client serialization (encode request + decode response)")
+    print(f"{'batch':>5}  {'transport':<12} {'req bytes':>9} {'resp bytes':>10} {'us/call':>8}")
+    for batch_size in batch_sizes:
+        for label, req_size, resp_size, micros in serialization_report(batch_size, args.iterations):
+            print(f"{batch_size:>5}  {label:<12} {req_size:>9} {resp_size:>10} {micros:>8.1f}")
+
+    live = [(args.http_url, "http"), (args.grpc_url, "grpc")]
+    if any(url for url, _ in live):
+        print("\nEnd-to-end latency against Triton (ms)")
+        print(f"{'batch':>5}  {'transport':<12} {'p50':>7} {'p95':>7} {'p99':>7}")
+        for batch_size in batch_sizes:
+            for url, protocol in live:
+                if not url:
+                    continue
+                p50, p95, p99 = asyncio.run(latency_report(url, protocol, batch_size, args.iterations // 4))
+                print(f"{batch_size:>5}  {protocol:<12} {p50:>7.2f} {p95:>7.2f} {p99:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Throughput and memory of the multi-worker app as the worker count grows.
+
+For each worker count the app is started with gunicorn and
+src/app/gunicorn_conf.py (preloaded model shared copy-on-write), loaded
+by several client processes for `--duration` seconds, and measured:
+
+  * rows/s and p50/p99 latency of /predict/batch
+  * PSS of master + workers (shared pages split between the processes)
+    and private memory per worker (what each extra worker really costs),
+    read from /proc/<pid>/smaps_rollup (Linux only)
+
+Without --model-path a synthetic RandomForestRegressor (--trees) is
+pickled into a temporary directory, so the shared-weights effect is
+visible without a trained model.
+
+    python benchmarks/worker_scaling.py --workers 1,2,4
+    python benchmarks/worker_scaling.py --model-path models/wine_model --rows 8
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from src.model.features import FEATURE_NAMES  # noqa: E402
+
+
+def synthetic_model(directory, trees):
+    from sklearn.ensemble import RandomForestRegressor
+    rng = np.random.default_rng(0)
+    X = rng.random((5000, len(FEATURE_NAMES)))
+    model = RandomForestRegressor(n_estimators=trees, random_state=0).fit(X, X @ rng.random(len(FEATURE_NAMES)))
+    with open(os.path.join(directory, "model.pkl"), "wb") as f:
+        pickle.dump(model, f)
+
+
+def memory_kb(pid):
+    # Pss and private (clean + dirty) kB of one process
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values.get("Pss", 0), values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+
+
+def worker_pids(master):
+    with open(f"/proc/{master}/task/{master}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def client(args):
+    url, rows, concurrency, duration, seed = args
+    rng = np.random.default_rng(seed)
+    payload = {"instances": [dict(zip(FEATURE_NAMES, row)) for row in rng.random((rows, len(FEATURE_NAMES))).tolist()]}
+
+    async def run():
+        latencies = []
+        deadline = time.perf_counter() + duration
+        async with httpx.AsyncClient(base_url=url, timeout=30) as http:
+            async def loop():
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    response = await http.post("/predict/batch", json=payload)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+            await asyncio.gather(*(loop() for _ in range(concurrency)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def wait_ready(url, proc, timeout=60):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("App did not become ready")
+
+
+def measure(workers, args, model_path, port):
+    url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ, PYTHONPATH=ROOT, SERVING_MODE=args.mode, MODEL_PATH=model_path,
+        WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}", MODEL_WATCH_SECONDS="0"
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "src/app/gunicorn_conf.py", "src.app.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(url, proc)
+        # Short warm phase so every worker has served requests before measuring
+        with multiprocessing.Pool(args.clients) as pool:
+            pool.map(client, [(url, args.rows, args.concurrency, 1.0, i) for i in range(args.clients)])
+            start = time.perf_counter()
+            results = pool.map(client, [(url, args.rows, args.concurrency, args.duration, i) for i in range(args.clients)])
+            elapsed = time.perf_counter() - start
+        latencies = np.concatenate([np.asarray(r) for r in results])
+
+        pids = worker_pids(proc.pid)
+        master_pss, _ = memory_kb(proc.pid)
+        worker_memory = [memory_kb(pid) for pid in pids]
+        return {
+            "workers": workers,
+            "rows_per_second": len(latencies) * args.rows / elapsed,
+            "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+            "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+            "total_pss_mb": (master_pss + sum(pss for pss, _ in worker_memory)) / 1024,
+            "private_mb_per_worker": float(np.mean([private for _, private in worker_memory])) / 1024,
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and memory scaling of gunicorn workers")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--mode", default="local", choices=["local", "onnx"])
+    parser.add_argument("--model-path", help="Model directory (default: synthetic random forest)")
+    parser.add_argument("--trees", type=int, default=300, help="Trees in the synthetic model")
+    parser.add_argument("--rows", type=int, default=8, help="Rows per /predict/batch request")
+    parser.add_argument("--clients", type=int, default=4, help="Client processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight requests per client")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model_path
+        if model_path is None:
+            synthetic_model(tmp, args.trees)
+            model_path = tmp
+        results = [measure(int(n), args, model_path, args.port) for n in args.workers.split(",")]
+
+    base = results[0]["rows_per_second"]
+    print(f"{'workers':>7} {'rows/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'PSS MB':>8} {'private MB/worker':>18}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['rows_per_second']:>10.0f} {r['rows_per_second'] / base:>8.2f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['total_pss_mb']:>8.1f} {r['private_mb_per_worker']:>18.1f}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,44 @@ import json
 
 class TritonPythonModel:
     def initialize(self, args):
-        self.model_config = model_config = bs_utils = args['model_config']
+        self.model_config = json.loads(args['model_config'])
 
     def execute(self, requests):
-        responses = []
-        for request in requests:
-            # Get model output
+        # Dynamic batching hands us several requests at once. Concatenate the
+        # model outputs, post-process them in one vectorized operation and
+        # split the result back per request.
+        arrays = []
+        sizes = []
+        errors = {}
+
+        for r, request in enumerate(requests):
             # "variable" is the output name from the ONNX model
             input_tensor = pb_utils.get_input_tensor_by_name(request, "variable")
-            
-            if input_tensor is not None:
-                # Just pass it through as "prediction"
-                # In a more complex scenario, we could apply thresholds, map to classes, etc.
-                prediction_data = input_tensor.as_numpy()
-                
-                output_tensor = pb_utils.Tensor("prediction", prediction_data)
-                
-                inference_response = pb_utils.InferenceResponse(output_tensors=[output_tensor])
-                responses.append(inference_response)
-            else:
-                responses.append(pb_utils.InferenceResponse(
-                    error=pb_utils.TritonError("Input tensor 'variable' not found")
-                ))
-            
+            if input_tensor is None:
+                errors[r] = pb_utils.TritonError("Input tensor 'variable' not found")
+                sizes.append(0)
+                continue
+            array = input_tensor.as_numpy()
+            arrays.append(array.reshape(-1))
+            sizes.append(array.shape[0])
+
+        # Pass the values through as "prediction", shape [Total, 1]
+        # In a more complex scenario, we could apply thresholds, map to classes, etc.
+        if arrays:
+            predictions = np.concatenate(arrays).astype(np.float32, copy=False).reshape(-1, 1)
+        else:
+            predictions = np.zeros((0, 1), dtype=np.float32)
+
+        per_request = np.split(predictions, np.cumsum(sizes)[:-1])
+
+        responses = []
+        for r, data in enumerate(per_request):
+            if r in errors:
+                responses.append(pb_utils.InferenceResponse(error=errors[r]))
+                continue
+            output_tensor = pb_utils.Tensor("prediction", np.ascontiguousarray(data))
+            responses.append(pb_utils.InferenceResponse(output_tensors=[output_tensor]))
+
         return responses
 
     def finalize(self):
@@ -1,45 +1,55 @@
 import triton_python_backend_utils as pb_utils
 import numpy as np
+import json
 
 class TritonPythonModel:
     def initialize(self, args):
-        self.model_config = model_config = bs_utils = args['model_config']
+        self.model_config = json.loads(args['model_config'])
+
+        # Input feature names in model order, taken once from config.pbtxt whose
+        # input list follows the shared schema (src/model/features.py)
+        self.feature_names = [inp["name"] for inp in self.model_config["input"]]
 
     def execute(self, requests):
+        # Dynamic batching hands us several requests at once. Gather every
+        # request's feature columns, stack them into one [Total, 13] array in a
+        # single vectorized pass and split the result back per request.
+        columns = [[] for _ in self.feature_names]
+        sizes = []
+        errors = {}
+
+        for r, request in enumerate(requests):
+            tensors = [pb_utils.get_input_tensor_by_name(request, name) for name in self.feature_names]
+            missing = [name for name, tensor in zip(self.feature_names, tensors) if tensor is None]
+            if missing:
+                errors[r] = pb_utils.TritonError(f"Missing input tensors: {', '.join(missing)}")
+                sizes.append(0)
+                continue
+
+            # tensor.as_numpy() is [Batch, 1]
+            arrays = [tensor.as_numpy().reshape(-1) for tensor in tensors]
+            sizes.append(arrays[0].shape[0])
+            for i, array in enumerate(arrays):
+                columns[i].append(array)
+
+        if sum(sizes) > 0:
+            # Stack features: [Total, 1] x 13 -> [Total, 13]
+            processed_data = np.stack(
+                [np.concatenate(column) for column in columns], axis=1
+            ).astype(np.float32, copy=False)
+        else:
+            processed_data = np.zeros((0, len(self.feature_names)), dtype=np.float32)
+
+        per_request = np.split(processed_data, np.cumsum(sizes)[:-1])
+
         responses = []
-        for request in requests:
-            # List of input feature names in specific order
-            feature_names = [
-                "alcohol", "malic_acid", "ash", "alcalinity_of_ash", "magnesium",
-                "total_phenols", "flavanoids", "nonflavanoid_phenols", "proanthocyanins",
-                "color_intensity", "hue", "od280_od315_of_diluted_wines", "proline"
-            ]
-            
-            # Extract inputs
-            input_data = []
-            batch_size = 0
-            
-            # We assume all inputs have the same batch size
-            first_input = pb_utils.get_input_tensor_by_name(request, feature_names[0])
-            if first_input is not None:
-                batch_size = first_input.as_numpy().shape[0]
-            
-            # Stack features: [Batch, 1] -> [Batch, 13]
-            # Initialize empty array [Batch, 13]
-            processed_data = np.zeros((batch_size, len(feature_names)), dtype=np.float32)
-            
-            for i, name in enumerate(feature_names):
-                tensor = pb_utils.get_input_tensor_by_name(request, name)
-                if tensor is not None:
-                    # tensor.as_numpy() is [Batch, 1]
-                    processed_data[:, i] = tensor.as_numpy().flatten()
-            
-            # Create output tensor
-            output_tensor = pb_utils.Tensor("float_input", processed_data)
-            
-            inference_response = pb_utils.InferenceResponse(output_tensors=[output_tensor])
-            responses.append(inference_response)
-            
+        for r, data in enumerate(per_request):
+            if r in errors:
+                responses.append(pb_utils.InferenceResponse(error=errors[r]))
+                continue
+            output_tensor = pb_utils.Tensor("float_input", np.ascontiguousarray(data))
+            responses.append(pb_utils.InferenceResponse(output_tensors=[output_tensor]))
+
         return responses
 
     def finalize(self):
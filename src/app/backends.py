@@ -0,0 +1,536 @@
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import time
+import numpy as np
+
+# Client libraries (tritonclient, aiohttp, httpx, onnxruntime, mlflow) are
+# imported by the backend that needs them, so a pod only pays for its own mode
+from src.model.features import FEATURE_NAMES, TRAINING_COLUMNS
+from src.app.instrumentation import get_logger, record
+
+log = get_logger("wine.backends")
+
+MODEL_PATH = os.getenv("MODEL_PATH", "models/wine_model")
+# Plain pickle of the estimator written next to the MLflow copy by train.py
+LOCAL_PICKLE = "model.pkl"
+TRITON_URL = os.getenv("TRITON_URL")
+# Transport for Triton: "http" (binary tensor payloads) or "grpc" (TRITON_URL then points at port 8001)
+TRITON_PROTOCOL = os.getenv("TRITON_PROTOCOL", "http").lower()
+SELDON_URL = os.getenv("SELDON_URL")
+
+# Version of the model behind the remote backends (cache keys, metrics).
+# When unset, the run_id in run_info.json written by train.py is used
+MODEL_VERSION = os.getenv("MODEL_VERSION")
+RUN_INFO_PATH = os.getenv("RUN_INFO_PATH", "run_info.json")
+
+# Serving mode: triton | seldon | onnx | local. Inferred from the URLs when unset
+SERVING_MODE = os.getenv("SERVING_MODE", "").lower()
+
+# Embedded ONNX Runtime mode (exported by src/model/train.py)
+# Prefer the output of the optimize_onnx stage when it has been run
+OPTIMIZED_ONNX_PATH = "models/wine_model_optimized/model.onnx"
+ONNX_MODEL_PATH = os.getenv(
+    "ONNX_MODEL_PATH",
+    OPTIMIZED_ONNX_PATH if os.path.exists(OPTIMIZED_ONNX_PATH) else os.path.join(MODEL_PATH, "model.onnx")
+)
+ORT_INTRA_OP_THREADS = int(os.getenv("ORT_INTRA_OP_THREADS", "1"))
+ORT_INTER_OP_THREADS = int(os.getenv("ORT_INTER_OP_THREADS", "1"))
+ORT_GRAPH_OPT_LEVEL = os.getenv("ORT_GRAPH_OPT_LEVEL", "all").lower()
+# Batches up to this many rows run inline on the event loop (microseconds of work),
+# larger ones are moved to a worker thread
+ORT_INLINE_MAX_ROWS = int(os.getenv("ORT_INLINE_MAX_ROWS", "64"))
+
+# Ensemble entry point used by the Triton/Seldon proxies:
+#   "named"  - 13 per-feature inputs to ensemble-model (Python pre/postprocessing)
+#   "packed" - one [N, 13] float_input tensor to ensemble-packed, straight into wine_model
+ENSEMBLE_LAYOUT = os.getenv("ENSEMBLE_LAYOUT", "named").lower()
+PACKED_INPUT_NAME = "float_input"
+# Model names as in model_repository/*/config.pbtxt
+ENSEMBLE_MODELS = {"named": "ensemble-model", "packed": "ensemble-packed"}
+
+# Largest batch a single Triton/Seldon call may carry.
+# Must not exceed max_batch_size in model_repository/*/config.pbtxt
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "8"))
+# Chunks of one request sent to Triton/Seldon at the same time
+CHUNK_MAX_INFLIGHT = int(os.getenv("CHUNK_MAX_INFLIGHT", "4"))
+
+# Connection pooling, timeouts and retries for the proxy backends
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "100"))
+# Connect timeout applies to Seldon only: tritonclient's asyncio clients take one total
+# timeout, so BACKEND_TIMEOUT also bounds connecting to an unreachable Triton
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "5"))
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "30"))
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", "2"))
+
+def iter_chunks(X, size=MAX_BATCH_SIZE):
+    # Split an (N, 13) matrix into row chunks the backend accepts
+    for start in range(0, X.shape[0], size):
+        yield X[start:start + size]
+
+
+async def gather_chunks(infer_chunk, X, limit=None):
+    # Chunks are independent and sent concurrently, but at most `limit` per request,
+    # so one large batch cannot take every pooled connection
+    semaphore = asyncio.Semaphore(limit or CHUNK_MAX_INFLIGHT)
+
+    async def bounded(chunk):
+        async with semaphore:
+            return await infer_chunk(chunk)
+
+    return await asyncio.gather(*(bounded(chunk) for chunk in iter_chunks(X)))
+
+
+class RunInfoVersion:
+    """Model version of a remote backend: MODEL_VERSION, else run_info.json's run_id.
+
+    The file is re-read when its mtime changes, checked at most once per
+    `check_interval` seconds so the lookup stays off the request hot path.
+    """
+
+    def __init__(self, path=RUN_INFO_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._version = "unknown"
+        self._mtime = None
+        self._checked = None
+
+    def get(self):
+        if MODEL_VERSION:
+            return MODEL_VERSION
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < self.check_interval:
+            return self._version
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime != self._mtime:
+                with open(self.path) as f:
+                    self._version = json.load(f).get("run_id") or "unknown"
+                self._mtime = mtime
+        except (OSError, ValueError):
+            self._version = "unknown"
+            self._mtime = None
+        return self._version
+
+
+def load_local_model(model_path):
+    # Returns the sklearn estimator saved by train.py and its version.
+    # model.pkl is unpickled directly; the MLflow flavor (which resolves
+    # MLmodel metadata and environments first) is only the fallback
+    pickled = os.path.join(model_path, LOCAL_PICKLE)
+    if os.path.exists(pickled):
+        with open(pickled, "rb") as f:
+            model = pickle.load(f)
+    else:
+        import mlflow.sklearn
+        model = mlflow.sklearn.load_model(model_path)
+    return model, local_model_version(model_path)
+
+
+def local_model_version(model_path):
+    # MLflow writes a unique model_uuid into the MLmodel file of every saved model
+    for candidate in (model_path, os.path.join(model_path, "sklearn")):
+        mlmodel = os.path.join(candidate, "MLmodel")
+        if os.path.exists(mlmodel):
+            import yaml
+            with open(mlmodel) as f:
+                meta = yaml.safe_load(f) or {}
+            return str(meta.get("model_uuid") or meta.get("run_id") or meta.get("utc_time_created"))
+    return "local"
+
+
+class TritonBackend:
+    """Proxy to the Triton ensemble with the asyncio HTTP or gRPC client.
+
+    One client per event loop is shared by every request: over HTTP it holds
+    an aiohttp pool of `pool_size` keep-alive connections and sends tensors
+    with the binary data extension, over gRPC it keeps a single persistent
+    channel. Either way no JSON is built for the tensors.
+    """
+    name = "Triton"
+
+    def __init__(self, url, protocol=TRITON_PROTOCOL, layout=ENSEMBLE_LAYOUT, pool_size=BACKEND_POOL_SIZE):
+        if protocol not in ("http", "grpc"):
+            raise ValueError(f"Unsupported TRITON_PROTOCOL: {protocol}")
+        check_layout(layout)
+        import aiohttp
+        from tritonclient.utils import InferenceServerException
+        self._module = _triton_client(protocol)
+        self._retry_errors = (aiohttp.ClientConnectionError, OSError, InferenceServerException)
+        self.url = url
+        self.protocol = protocol
+        self.layout = layout
+        self.model_name = ENSEMBLE_MODELS[layout]
+        self.pool_size = pool_size
+        self._client = None
+        self._loop = None
+        self._version = RunInfoVersion()
+
+    async def start(self):
+        # aiohttp sessions and grpc.aio channels are bound to their event loop
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return
+        self._loop = loop
+        if self.protocol == "grpc":
+            self._client = self._module.InferenceServerClient(
+                url=self.url,
+                keepalive_options=self._module.KeepAliveOptions(keepalive_time_ms=30000)
+            )
+        else:
+            self._client = self._module.InferenceServerClient(
+                url=self.url,
+                conn_limit=self.pool_size,
+                conn_timeout=BACKEND_TIMEOUT
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    @property
+    def ready(self):
+        return True
+
+    @property
+    def version(self):
+        return self._version.get()
+
+    def _build_request(self, chunk):
+        module = self._module
+        if self.layout == "packed":
+            # The whole chunk as one [BATCH_SIZE, 13] tensor
+            tensors = [(PACKED_INPUT_NAME, np.ascontiguousarray(chunk))]
+        else:
+            # One FP32 input per feature, shape [BATCH_SIZE, 1]
+            tensors = [(name, np.ascontiguousarray(chunk[:, i:i + 1])) for i, name in enumerate(FEATURE_NAMES)]
+
+        inputs = []
+        for name, data in tensors:
+            infer_input = module.InferInput(name, data.shape, "FP32")
+            if self.protocol == "grpc":
+                infer_input.set_data_from_numpy(data)
+            else:
+                infer_input.set_data_from_numpy(data, binary_data=True)
+            inputs.append(infer_input)
+
+        if self.protocol == "grpc":
+            outputs = [module.InferRequestedOutput("prediction")]
+        else:
+            outputs = [module.InferRequestedOutput("prediction", binary_data=True)]
+        return inputs, outputs
+
+    async def predict(self, X):
+        await self.start()
+
+        async def infer_chunk(chunk):
+            inputs, outputs = self._build_request(chunk)
+            response = await self._infer_with_retry(inputs, outputs)
+            started = time.perf_counter()
+            # Result is [Batch, 1]
+            predictions = response.as_numpy("prediction").reshape(-1)
+            record("decode", time.perf_counter() - started)
+            return predictions
+
+        predictions = await gather_chunks(infer_chunk, X)
+        return np.concatenate(predictions)
+
+    async def _infer_with_retry(self, inputs, outputs):
+        # Inference is idempotent, so connection-level failures are retried
+        for attempt in range(BACKEND_RETRIES + 1):
+            try:
+                if self.protocol == "grpc":
+                    return await self._client.infer(
+                        self.model_name, inputs=inputs, outputs=outputs, client_timeout=BACKEND_TIMEOUT
+                    )
+                return await self._client.infer(self.model_name, inputs=inputs, outputs=outputs)
+            except self._retry_errors as e:
+                if attempt == BACKEND_RETRIES or not _is_retryable(e):
+                    raise
+
+
+def _triton_client(protocol):
+    # tritonclient's HTTP and gRPC flavors each pull in their own stack
+    if protocol == "grpc":
+        import tritonclient.grpc.aio as module
+    else:
+        import tritonclient.http.aio as module
+    return module
+
+
+def check_layout(layout):
+    if layout not in ("named", "packed"):
+        raise ValueError(f"Unsupported ENSEMBLE_LAYOUT: {layout}")
+
+
+def _is_retryable(error):
+    # gRPC reports a dropped/unreachable server as UNAVAILABLE, other server errors are final
+    from tritonclient.utils import InferenceServerException
+    if isinstance(error, InferenceServerException):
+        return "UNAVAILABLE" in str(error.status())
+    return True
+
+
+class SeldonBackend:
+    """Proxy to Seldon Core (KServe V2 Protocol) over a keep-alive httpx client."""
+    name = "Seldon"
+
+    def __init__(self, url, layout=ENSEMBLE_LAYOUT, pool_size=BACKEND_POOL_SIZE):
+        check_layout(layout)
+        # Model name is the Triton ensemble entry point
+        self.predict_url = f"{url}/v2/models/{ENSEMBLE_MODELS[layout]}/infer"
+        self.layout = layout
+        self.pool_size = pool_size
+        self._client = None
+        self._loop = None
+        self._version = RunInfoVersion()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return
+        self._loop = loop
+        self._client = self._make_client()
+
+    def _make_client(self):
+        # httpx retries connection failures (not HTTP error statuses)
+        import httpx
+        transport = httpx.AsyncHTTPTransport(
+            retries=BACKEND_RETRIES,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size
+            )
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(BACKEND_TIMEOUT, connect=BACKEND_CONNECT_TIMEOUT)
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def ready(self):
+        return True
+
+    @property
+    def version(self):
+        return self._version.get()
+
+    async def predict(self, X):
+        await self.start()
+
+        async def infer_chunk(chunk):
+            if self.layout == "packed":
+                # One [BATCH_SIZE, 13] tensor, row-major
+                inputs = [{
+                    "name": PACKED_INPUT_NAME,
+                    "shape": list(chunk.shape),
+                    "datatype": "FP32",
+                    "data": chunk.ravel().tolist()
+                }]
+            else:
+                # Build V2 inference request with individual inputs for each feature
+                inputs = [
+                    {
+                        "name": name,
+                        "shape": [chunk.shape[0], 1],
+                        "datatype": "FP32",
+                        "data": chunk[:, i].tolist()
+                    }
+                    for i, name in enumerate(FEATURE_NAMES)
+                ]
+            payload = {
+                "inputs": inputs,
+                "outputs": [{"name": "prediction"}]
+            }
+
+            response = await self._client.post(self.predict_url, json=payload)
+            response.raise_for_status()
+            started = time.perf_counter()
+
+            # Format: {"outputs": [{"name": "prediction", "data": [...]}]}
+            outputs = response.json().get("outputs", [])
+            data = outputs[0].get("data", []) if outputs else []
+            if len(data) != chunk.shape[0]:
+                raise ValueError(f"Expected {chunk.shape[0]} predictions, got {len(data)}")
+            predictions = np.asarray(data, dtype=np.float32).reshape(-1)
+            record("decode", time.perf_counter() - started)
+            return predictions
+
+        predictions = await gather_chunks(infer_chunk, X)
+        return np.concatenate(predictions)
+
+
+class LocalBackend:
+    """Local Inference (Scikit-Learn) with the model loaded in-process.
+
+    The estimator is called with float32 arrays in FEATURE_NAMES order, no
+    DataFrame is built per request. Prediction is CPU bound, so it runs in
+    a worker thread to keep the event loop responsive.
+    """
+    name = "Local"
+
+    def __init__(self, model, version="local"):
+        self.model = compile_estimator(model) if model is not None else None
+        self.version = version
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @property
+    def ready(self):
+        return self.model is not None
+
+    async def predict(self, X):
+        return await asyncio.to_thread(self._predict, X)
+
+    def _predict(self, X):
+        return np.asarray(self.model.predict(X)).reshape(-1)
+
+
+def compile_estimator(model):
+    # Estimators fitted on a DataFrame check column names on every predict.
+    # Verify the order once here, then drop the names so arrays are accepted as-is.
+    fitted_names = getattr(model, "feature_names_in_", None)
+    if fitted_names is not None:
+        if tuple(fitted_names) != TRAINING_COLUMNS:
+            raise ValueError(f"Model was trained on columns {list(fitted_names)}, expected {list(TRAINING_COLUMNS)}")
+        del model.feature_names_in_
+    return model
+
+
+class OnnxBackend:
+    """In-process ONNX Runtime inference on float32 arrays, no network hop.
+
+    The session is created once with a fixed thread budget and graph
+    optimization level. Small batches run inline on the event loop since
+    they take microseconds; larger ones go to a worker thread.
+    """
+    name = "ONNX"
+
+    # Names of ort.GraphOptimizationLevel members
+    GRAPH_OPT_LEVELS = {
+        "disable": "ORT_DISABLE_ALL",
+        "basic": "ORT_ENABLE_BASIC",
+        "extended": "ORT_ENABLE_EXTENDED",
+        "all": "ORT_ENABLE_ALL",
+    }
+
+    def __init__(self, model_path=ONNX_MODEL_PATH, intra_op_threads=ORT_INTRA_OP_THREADS,
+                 inter_op_threads=ORT_INTER_OP_THREADS, graph_opt_level=ORT_GRAPH_OPT_LEVEL):
+        if graph_opt_level not in self.GRAPH_OPT_LEVELS:
+            raise ValueError(f"Unsupported ORT_GRAPH_OPT_LEVEL: {graph_opt_level}")
+        self.model_path = model_path
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.graph_opt_level = graph_opt_level
+        self.session = None
+        self.version = None
+        self._load_attempted = False
+
+    def load(self):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = getattr(
+            ort.GraphOptimizationLevel, self.GRAPH_OPT_LEVELS[self.graph_opt_level]
+        )
+        with open(self.model_path, "rb") as f:
+            model_bytes = f.read()
+        session = ort.InferenceSession(model_bytes, sess_options=options, providers=["CPUExecutionProvider"])
+        self.version = hashlib.md5(model_bytes).hexdigest()
+        self._input_name = session.get_inputs()[0].name
+        self._output_names = [session.get_outputs()[0].name]
+        self.session = session
+
+    async def start(self):
+        if self.session is None and not self._load_attempted:
+            self._load_attempted = True
+            try:
+                self.load()
+                log.info("ONNX model loaded from %s", self.model_path)
+            except Exception as e:
+                log.error("Error loading ONNX model: %s", e)
+
+    async def close(self):
+        pass
+
+    @property
+    def ready(self):
+        return self.session is not None
+
+    async def predict(self, X):
+        if X.shape[0] <= ORT_INLINE_MAX_ROWS:
+            return self._predict(X)
+        return await asyncio.to_thread(self._predict, X)
+
+    def _predict(self, X):
+        return self.session.run(self._output_names, {self._input_name: X})[0].reshape(-1)
+
+
+def resolve_mode():
+    # Explicit SERVING_MODE wins, otherwise the configured URLs decide
+    if SERVING_MODE:
+        if SERVING_MODE not in ("triton", "seldon", "onnx", "local"):
+            raise ValueError(f"Unsupported SERVING_MODE: {SERVING_MODE}")
+        return SERVING_MODE
+    if TRITON_URL:
+        return "triton"
+    elif SELDON_URL:
+        return "seldon"
+    return "local"
+
+
+def file_fingerprint(*paths):
+    # (path, mtime, size) of every file that exists; None when none do
+    stamp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stamp.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(stamp) or None
+
+
+def reload_source(mode):
+    """(factory, fingerprint) used by the model registry to hot-reload `mode`.
+
+    The factory builds a backend with the model on disk loaded; remote
+    modes have no factory and are fingerprinted by run_info.json's run_id.
+    """
+    if mode == "local":
+        def factory():
+            return LocalBackend(*load_local_model(MODEL_PATH))
+        paths = (os.path.join(MODEL_PATH, LOCAL_PICKLE), os.path.join(MODEL_PATH, "sklearn", "MLmodel"))
+        return factory, lambda: file_fingerprint(*paths)
+    if mode == "onnx":
+        def factory():
+            backend = OnnxBackend()
+            backend.load()
+            return backend
+        return factory, lambda: file_fingerprint(ONNX_MODEL_PATH)
+    return None, RunInfoVersion(check_interval=0).get
+
+
+def create_backend(mode, model=None, version="local"):
+    if mode == "triton":
+        return TritonBackend(TRITON_URL)
+    elif mode == "seldon":
+        return SeldonBackend(SELDON_URL)
+    elif mode == "onnx":
+        return OnnxBackend()
+    return LocalBackend(model, version)
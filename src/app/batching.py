@@ -0,0 +1,111 @@
+import asyncio
+import contextvars
+import time
+import numpy as np
+
+from src.app.instrumentation import StageTimer, current_timer, share_stages, use_timer
+from src.app.metrics import BATCH_QUEUE_DEPTH, BATCH_SIZE, BATCH_QUEUE_LATENCY
+
+
+class MicroBatcher:
+    """Groups concurrent single-row requests into one stacked inference.
+
+    Rows are collected until `max_batch_size` is reached or the oldest row
+    has waited `max_wait_us` microseconds, then `infer_fn` is awaited with an
+    (N, 13) float32 matrix and each caller gets back its own prediction.
+    Up to `max_inflight` batches may be running against the backend at once.
+    Stages the backend records during a batch (e.g. decode) are charged to
+    the stage timer of every request in it.
+    """
+
+    def __init__(self, infer_fn, max_batch_size=8, max_wait_us=1000, max_inflight=4):
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1_000_000
+        self.max_inflight = max_inflight
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._inflight = None
+        self._tasks = set()
+
+    def _ensure_started(self):
+        # The queue is bound to the running event loop, so start lazily
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        # Fresh context: the worker outlives the request that happened to start it
+        self._worker = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def submit(self, row):
+        # row is a float32 vector of the 13 features, returns its prediction
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((row, future, time.perf_counter(), current_timer()))
+        BATCH_QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0][2] + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued before waiting for more
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            BATCH_QUEUE_DEPTH.set(self._queue.qsize())
+            await self._inflight.acquire()
+            task = self._loop.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            now = time.perf_counter()
+            for _, _, enqueued, _ in batch:
+                BATCH_QUEUE_LATENCY.observe(now - enqueued)
+            BATCH_SIZE.observe(len(batch))
+
+            X = np.stack([row for row, _, _, _ in batch])
+            timer = StageTimer("batch")
+            use_timer(timer)
+            try:
+                predictions = await self.infer_fn(X)
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            finally:
+                share_stages(timer, [waiter for _, _, _, waiter in batch])
+
+            for (_, future, _, _), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(prediction)
+        finally:
+            self._inflight.release()
+
+    async def close(self):
+        # Stop collecting and let already dispatched batches finish
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
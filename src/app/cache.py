@@ -0,0 +1,88 @@
+import sys
+import time
+from collections import OrderedDict
+import numpy as np
+
+from src.model.features import NUM_FEATURES
+from src.app.metrics import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS, CACHE_ENTRIES
+
+
+class PredictionCache:
+    """In-process LRU/TTL cache of predictions keyed on feature vectors.
+
+    Keys are the float32 bytes of the feature vector, optionally rounded to
+    `decimals` places first so near-identical rows share an entry, together
+    with the model version. Entries expire after `ttl_seconds` (0 = never)
+    and the least recently used entry is evicted once `max_entries` or the
+    `max_bytes` budget is reached. A new model version clears the cache.
+    """
+
+    def __init__(self, max_entries=100_000, ttl_seconds=0, max_bytes=0, decimals=None, clock=time.monotonic):
+        self.ttl = ttl_seconds
+        self.decimals = decimals
+        self.clock = clock
+        self.version = None
+        self._entries = OrderedDict()
+
+        # Memory cap is enforced as an entry budget from the size of one entry
+        if max_bytes:
+            max_entries = min(max_entries, max(1, max_bytes // self._entry_size()))
+        self.max_entries = max_entries
+
+    @staticmethod
+    def _entry_size():
+        key = np.zeros(NUM_FEATURES, dtype=np.float32).tobytes()
+        value = (0.0, 0.0)
+        # key bytes + value tuple + its floats + one OrderedDict slot (~100 bytes)
+        return sys.getsizeof(key) + sys.getsizeof(value) + 2 * sys.getsizeof(0.0) + 100
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, row):
+        if self.decimals is not None:
+            row = np.round(row, self.decimals)
+        return np.ascontiguousarray(row, dtype=np.float32).tobytes()
+
+    def check_version(self, version):
+        # Entries from another model version are never valid, drop them all
+        if version != self.version:
+            if self._entries:
+                CACHE_EVICTIONS.labels(reason="invalidate").inc(len(self._entries))
+                self._entries.clear()
+                CACHE_ENTRIES.set(0)
+            self.version = version
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            CACHE_MISSES.inc()
+            return None
+
+        prediction, expires_at = entry
+        if expires_at and expires_at <= self.clock():
+            del self._entries[key]
+            CACHE_EVICTIONS.labels(reason="ttl").inc()
+            CACHE_ENTRIES.set(len(self._entries))
+            CACHE_MISSES.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        CACHE_HITS.inc()
+        return prediction
+
+    def put(self, key, prediction, version):
+        # Results computed under a version that has since been replaced are dropped
+        if version != self.version:
+            return
+        expires_at = self.clock() + self.ttl if self.ttl else 0.0
+        self._entries[key] = (float(prediction), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.labels(reason="lru").inc()
+        CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        self._entries.clear()
+        CACHE_ENTRIES.set(0)
@@ -0,0 +1,204 @@
+import asyncio
+import contextvars
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+
+from src.model.features import FEATURE_NAMES
+from src.app.metrics import DRIFT_LOG_ROWS, DRIFT_LOG_QUEUE_ROWS, DRIFT_LOG_FLUSH_SECONDS
+from src.app.instrumentation import get_logger
+
+log = get_logger("wine.drift_logger")
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest")
+
+
+class V2InferSink:
+    """Posts batches to the drift server's V2 infer endpoint as one (N, 13) FP32 input."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        self._client = None
+
+    async def send(self, X):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        payload = {
+            "inputs": [{
+                "name": "drift_input",
+                "shape": list(X.shape),
+                "datatype": "FP32",
+                "data": X.ravel().tolist()
+            }]
+        }
+        response = await self._client.post(self.url, json=payload)
+        response.raise_for_status()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class SpoolSink:
+    """Appends batches to a local NDJSON file, one 13-value array per line."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _write(self, X):
+        lines = "".join(json.dumps(row) + "\n" for row in X.tolist())
+        with open(self.path, "a") as f:
+            f.write(lines)
+
+    async def send(self, X):
+        # File I/O in a thread so a slow disk never stalls the event loop
+        await asyncio.to_thread(self._write, X)
+
+    async def close(self):
+        pass
+
+
+class DriftLogger:
+    """Ships scored feature vectors to drift detection off the request path.
+
+    `log` samples rows and appends them to a bounded in-memory queue without
+    awaiting anything. A background task sends them to `sink` in batches of
+    up to `batch_size` rows, at least every `flush_interval` seconds. When
+    `max_queue_rows` is reached, `overflow` decides whether the incoming
+    rows (drop_newest) or the oldest queued rows (drop_oldest) are dropped.
+    Failed sends are counted and dropped, never retried on the request path.
+    """
+
+    def __init__(self, sink, sample_rate=1.0, batch_size=256, flush_interval=1.0,
+                 max_queue_rows=10_000, overflow="drop_newest", seed=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown drift overflow policy '{overflow}', use one of {list(OVERFLOW_POLICIES)}")
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_rows = max_queue_rows
+        self.overflow = overflow
+        self._rng = np.random.default_rng(seed)
+        self._queue = deque()
+        self._queued_rows = 0
+        self._loop = None
+        self._wakeup = None
+        self._worker = None
+
+    def _ensure_started(self):
+        # Like MicroBatcher, the worker is bound to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        # Fresh context so the worker does not keep the first request's stage timer
+        self._worker = loop.create_task(self._run(), context=contextvars.Context())
+
+    def log(self, X):
+        # X is an (N, 13) float32 matrix of rows that were just scored
+        X = np.asarray(X, dtype=np.float32).reshape(-1, len(FEATURE_NAMES))
+        if self.sample_rate < 1.0:
+            keep = self._rng.random(len(X)) < self.sample_rate
+            DRIFT_LOG_ROWS.labels(outcome="sampled_out").inc(len(X) - int(keep.sum()))
+            X = X[keep]
+        if len(X) == 0:
+            return
+
+        if self._queued_rows + len(X) > self.max_queue_rows:
+            if self.overflow == "drop_newest":
+                DRIFT_LOG_ROWS.labels(outcome="dropped").inc(len(X))
+                return
+            while self._queue and self._queued_rows + len(X) > self.max_queue_rows:
+                dropped = self._queue.popleft()
+                self._queued_rows -= len(dropped)
+                DRIFT_LOG_ROWS.labels(outcome="dropped").inc(len(dropped))
+            X = X[-self.max_queue_rows:]
+
+        # Copy: callers may reuse their buffers once the response is sent
+        self._queue.append(X.copy())
+        self._queued_rows += len(X)
+        DRIFT_LOG_ROWS.labels(outcome="queued").inc(len(X))
+        DRIFT_LOG_QUEUE_ROWS.set(self._queued_rows)
+
+        self._ensure_started()
+        if self._queued_rows >= self.batch_size:
+            self._wakeup.set()
+
+    def _take(self):
+        # Up to batch_size queued rows as one matrix
+        parts, rows = [], 0
+        while self._queue and rows < self.batch_size:
+            X = self._queue.popleft()
+            room = self.batch_size - rows
+            if len(X) > room:
+                self._queue.appendleft(X[room:])
+                X = X[:room]
+            parts.append(X)
+            rows += len(X)
+        self._queued_rows -= rows
+        DRIFT_LOG_QUEUE_ROWS.set(self._queued_rows)
+        return np.concatenate(parts)
+
+    async def _send(self, X):
+        start = time.perf_counter()
+        try:
+            await self.sink.send(X)
+            DRIFT_LOG_ROWS.labels(outcome="sent").inc(len(X))
+        except Exception as e:
+            DRIFT_LOG_ROWS.labels(outcome="failed").inc(len(X))
+            log.warning("Drift logging failed for %d rows: %s", len(X), e)
+        finally:
+            DRIFT_LOG_FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue:
+                await self._send(self._take())
+                # Keep sending full batches, leave a partial one for the next interval
+                if self._queued_rows < self.batch_size:
+                    break
+
+    async def flush(self):
+        while self._queue:
+            await self._send(self._take())
+
+    async def close(self):
+        # Send what is left, then release the sink
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.flush()
+        await self.sink.close()
+
+
+def create_drift_logger():
+    # Configured from the environment; None when no destination is set
+    url = os.getenv("DRIFT_URL")
+    spool_path = os.getenv("DRIFT_SPOOL_PATH")
+    if not url and not spool_path:
+        return None
+    sink = V2InferSink(url) if url else SpoolSink(spool_path)
+    return DriftLogger(
+        sink,
+        sample_rate=float(os.getenv("DRIFT_SAMPLE_RATE", "1.0")),
+        batch_size=int(os.getenv("DRIFT_BATCH_SIZE", "256")),
+        flush_interval=int(os.getenv("DRIFT_FLUSH_INTERVAL_MS", "1000")) / 1000,
+        max_queue_rows=int(os.getenv("DRIFT_QUEUE_ROWS", "10000")),
+        overflow=os.getenv("DRIFT_OVERFLOW", "drop_newest"),
+    )
@@ -0,0 +1,109 @@
+"""Gunicorn settings for multi-process serving of src.app.main:app.
+
+    gunicorn -c src/app/gunicorn_conf.py src.app.main:app
+
+The app is imported once in the master (preload_app), so a local sklearn
+model is unpickled once and the forked workers share its pages
+copy-on-write. gc.freeze() moves everything loaded so far out of the
+garbage collector's generations, so collections in the workers do not
+write to (and thereby copy) those pages. Each worker runs its own event
+loop, backend clients and, in ONNX mode, its own ONNX Runtime session,
+which is created after the fork since sessions are not fork-safe.
+
+Hot reload happens in the master, not in the workers: a model reloaded
+by each worker would be a private copy per worker. The workers' own
+watchers are turned off; the master polls the model every
+MODEL_WATCH_SECONDS and sends itself HUP when it changed. On HUP
+(also `kill -HUP <master pid>`) the master loads the new model once,
+freezes it again and replaces the workers with fresh forks, which share
+it. The cost is that the workers restart for each new model, and that
+/admin/reload and /admin/rollback only switch the worker that answers.
+
+WEB_CONCURRENCY sets the number of workers (default 1). Prometheus
+metrics are aggregated across workers through PROMETHEUS_MULTIPROC_DIR.
+"""
+import gc
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Must be set before prometheus_client is imported by the preloaded app.
+# This file runs again on HUP, so what it changed in the environment is remembered there
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.environ["GUNICORN_OWN_METRICS_DIR"] = tempfile.mkdtemp(
+        prefix="wine-metrics-"
+    )
+_own_metrics_dir = os.environ.get("GUNICORN_OWN_METRICS_DIR") == os.environ["PROMETHEUS_MULTIPROC_DIR"]
+
+# The master watches the model; the preloaded app (and so every worker) must not
+model_watch_seconds = float(os.environ.setdefault("GUNICORN_MODEL_WATCH_SECONDS", os.getenv("MODEL_WATCH_SECONDS", "10")))
+os.environ["MODEL_WATCH_SECONDS"] = "0"
+
+
+def _freeze():
+    gc.collect()
+    gc.freeze()
+
+
+def _watch_model(server):
+    from src.app import main
+    while True:
+        time.sleep(model_watch_seconds)
+        try:
+            changed = main.registry.fingerprint() != main.registry.stamp
+        except Exception as e:
+            server.log.warning("Model check failed: %s", e)
+            continue
+        if changed:
+            server.log.info("Model on disk changed, reloading workers")
+            os.kill(os.getpid(), signal.SIGHUP)
+
+
+def when_ready(server):
+    # The app (and its model) is loaded; freeze it before the first fork
+    _freeze()
+    server.log.info("Preloaded app frozen for copy-on-write sharing across %d workers", workers)
+    if model_watch_seconds > 0:
+        threading.Thread(target=_watch_model, args=(server,), name="model-watch", daemon=True).start()
+
+
+def on_reload(server):
+    # HUP: load the model on disk here, before the new workers are forked from this process
+    from src.app import main
+    registry = main.registry
+    stamp = registry.fingerprint()
+    if stamp == registry.stamp:
+        return
+    backend = None
+    # ONNX sessions are not fork-safe: the new workers load the file themselves
+    if main.SERVING_MODE == "local":
+        try:
+            backend = registry.factory()
+        except Exception as e:
+            # Recorded anyway, so a broken file is not retried until it changes again
+            server.log.warning("Model reload failed, new workers keep the current model: %s", e)
+            registry.stamp = stamp
+            return
+    registry.adopt(backend, stamp)
+    _freeze()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if _own_metrics_dir:
+        shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
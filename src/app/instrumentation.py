@@ -0,0 +1,161 @@
+"""Per-request stage timing and logging for the inference endpoints.
+
+StageMiddleware starts a StageTimer for every instrumented request and
+makes it the current one (a ContextVar, so backends can report into it
+without passing it around). Handlers mark stages as they finish them:
+
+    validate   request received, body read, parsed and validated
+    cache      prediction cache lookups
+    pack       features packed into the float32 matrix
+    backend    backend call, minus decode
+    decode     backend response turned into an array (Triton/Seldon)
+    serialize  JSON response rendered
+
+When the response has been sent, each stage is observed into
+wine_request_stage_seconds and the whole request into
+wine_request_seconds, labeled by endpoint, serving mode and model version.
+
+Logging goes through the "wine" logger at LOG_LEVEL (default INFO).
+Per-request debug lines use `debug_sampled`, which only formats the
+message when DEBUG is enabled and the request falls in LOG_SAMPLE_RATE.
+"""
+import logging
+import os
+import random
+import sys
+import time
+from contextvars import ContextVar
+
+from src.app.metrics import REQUEST_SECONDS, STAGE_SECONDS
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+# Set to 0 to skip stage timing entirely
+STAGE_METRICS = os.getenv("STAGE_METRICS", "1").lower() in ("1", "true", "yes")
+
+_current = ContextVar("stage_timer", default=None)
+
+
+def get_logger(name="wine"):
+    # Own handler so messages show up under uvicorn/gunicorn, which only configure their loggers
+    logger = logging.getLogger(name)
+    root = logging.getLogger("wine")
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+    return logger
+
+
+def debug_sampled(logger, msg, *args):
+    # Per-request debug output: level-gated first, then sampled
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_SAMPLE_RATE:
+        logger.debug(msg, *args)
+
+
+class StageTimer:
+    """Accumulates seconds per stage for one request.
+
+    `mark(stage)` charges the time since the previous mark to `stage`;
+    `add(stage, seconds)` records a stage nested in the current one (e.g.
+    decode inside the backend call), which the next mark leaves out.
+    """
+    __slots__ = ("endpoint", "started", "timings", "_last", "_nested")
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = self._last = time.perf_counter()
+        self.timings = {}
+        self._nested = 0.0
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        elapsed = max(0.0, now - self._last - self._nested)
+        self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+        self._last = now
+        self._nested = 0.0
+
+    def add(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        self._nested += seconds
+
+    def observe(self, mode, version):
+        labels = (self.endpoint, mode, version)
+        for stage, seconds in self.timings.items():
+            _stage_child(stage, *labels).observe(seconds)
+        _request_child(*labels).observe(time.perf_counter() - self.started)
+
+
+_children = {}
+
+
+def _stage_child(stage, endpoint, mode, version):
+    # Cached label lookups keep the per-request cost to the observe calls
+    key = ("stage", stage, endpoint, mode, version)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = STAGE_SECONDS.labels(endpoint, stage, mode, version)
+    return child
+
+
+def _request_child(endpoint, mode, version):
+    key = ("request", endpoint, mode, version)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = REQUEST_SECONDS.labels(endpoint, mode, version)
+    return child
+
+
+def current_timer():
+    return _current.get()
+
+
+def use_timer(timer):
+    # Makes `timer` current for the running task (e.g. one shared batch)
+    return _current.set(timer)
+
+
+def share_stages(timer, waiters):
+    # Charges the stages recorded for a shared backend call to every request that waited on it
+    for waiter in waiters:
+        if waiter is not None:
+            for stage, seconds in timer.timings.items():
+                waiter.add(stage, seconds)
+
+
+def mark(stage):
+    timer = _current.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+def record(stage, seconds):
+    timer = _current.get()
+    if timer is not None:
+        timer.add(stage, seconds)
+
+
+class StageMiddleware:
+    """ASGI middleware timing the requests to `paths`.
+
+    `labels()` returns (mode, model version) at the end of the request,
+    so a hot reload is attributed to the version that served it.
+    """
+
+    def __init__(self, app, paths, labels):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.labels = labels
+
+    async def __call__(self, scope, receive, send):
+        if not STAGE_METRICS or scope["type"] != "http" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        timer = StageTimer(scope["path"])
+        token = _current.set(timer)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            timer.observe(*self.labels())
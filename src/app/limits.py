@@ -0,0 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class Saturated(Exception):
+    """Raised when a request cannot get an inference slot."""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight inferences and sheds load once the app is saturated.
+
+    Up to `max_inflight` requests run at once and up to `max_waiting` more
+    may wait for a slot. Beyond that requests are rejected straight away
+    with 429; a waiter that does not get a slot within `acquire_timeout`
+    seconds is rejected with 503.
+    """
+
+    def __init__(self, max_inflight=1000, max_waiting=1000, acquire_timeout=1.0):
+        self.max_inflight = max_inflight
+        self.max_waiting = max_waiting
+        self.acquire_timeout = acquire_timeout
+        self.inflight = 0
+        self.waiting = 0
+        self._loop = None
+        self._semaphore = None
+
+    def _get_semaphore(self):
+        # The semaphore is bound to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self.waiting >= self.max_waiting:
+                raise Saturated(429, "Too many concurrent requests")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.acquire_timeout)
+            except asyncio.TimeoutError:
+                raise Saturated(503, "Inference backend saturated, retry later")
+            finally:
+                self.waiting -= 1
+        else:
+            await semaphore.acquire()
+
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            semaphore.release()
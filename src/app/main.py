@@ -1,41 +1,93 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import mlflow.sklearn
-import pandas as pd
-import uvicorn
+import time
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, model_validator
+from typing import List, Optional
+import logging
 import os
-import requests
-import json
+import secrets
 import numpy as np
-import tritonclient.http as httpclient
-from tritonclient.utils import *
 
-app = FastAPI(title="Wine Quality Prediction API")
+from src.app.backends import (
+    MODEL_PATH, TRITON_URL, SELDON_URL, ONNX_MODEL_PATH, MAX_BATCH_SIZE,
+    resolve_mode, create_backend, load_local_model, reload_source,
+)
+from src.model.features import FEATURE_NAMES, SCHEMA
+from src.app.batching import MicroBatcher
+from src.app.cache import PredictionCache
+from src.app.registry import ModelRegistry, warm as warm_backend
+from src.app.drift_logger import create_drift_logger
+from src.app.streaming import FORMATS, detect_format, stream_ndjson
+from src.app.limits import ConcurrencyLimiter, Saturated
+from src.app import metrics
+from src.app.instrumentation import StageMiddleware, debug_sampled, get_logger, mark
+
+log = get_logger("wine.app")
 
 # Configuration
-print("DEBUG: Dumping environment variables at startup:")
-for k, v in os.environ.items():
-    if "URL" in k or "MODEL" in k:
-        print(f"{k}={v}")
-print("DEBUG: End of environment variables")
+if log.isEnabledFor(logging.DEBUG):
+    for k, v in os.environ.items():
+        if "URL" in k or "MODEL" in k:
+            log.debug("%s=%s", k, v)
+
+SERVING_MODE = resolve_mode()
+
+# Dynamic micro-batching of concurrent /predict calls (off by default)
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "0").lower() in ("1", "true", "yes")
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", str(MAX_BATCH_SIZE)))
+BATCH_MAX_WAIT_US = int(os.getenv("BATCH_MAX_WAIT_US", "1000"))
+BATCH_MAX_INFLIGHT = int(os.getenv("BATCH_MAX_INFLIGHT", "4"))
+
+# Rows accepted by one /predict/batch request; larger inputs go to /predict/stream
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "10000"))
+
+# Backpressure: in-flight predictions, queued waiters and how long a waiter may queue
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "1000"))
+MAX_WAITING = int(os.getenv("MAX_WAITING", "1000"))
+ACQUIRE_TIMEOUT_MS = int(os.getenv("ACQUIRE_TIMEOUT_MS", "1000"))
+
+# Optional in-process prediction cache (off by default)
+PREDICTION_CACHE = os.getenv("PREDICTION_CACHE", "0").lower() in ("1", "true", "yes")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "100000"))
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "0"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "0"))
+# Round features to this many decimals before keying (unset = exact match)
+CACHE_DECIMALS = os.getenv("CACHE_DECIMALS")
 
-TRITON_URL = os.getenv("TRITON_URL")
-SELDON_URL = os.getenv("SELDON_URL")
-MODEL_PATH = os.getenv("MODEL_PATH", "models/wine_model")
+# Streaming bulk scoring: rows per parsed chunk and chunks scored concurrently
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "1024"))
+STREAM_MAX_INFLIGHT = int(os.getenv("STREAM_MAX_INFLIGHT", "4"))
+
+# Batch sizes scored once at startup (and by /health/ready until one succeeds)
+# so the first real request does not pay for lazy allocation, JIT or connection setup
+WARMUP_BATCH_SIZES = [int(size) for size in os.getenv("WARMUP_BATCH_SIZES", f"1,{MAX_BATCH_SIZE}").split(",") if size]
+
+# Hot reload: seconds between checks of the model on disk / run_info.json (0 = off),
+# and the token /admin/* requests must send in X-Admin-Token (unset = admin endpoints disabled)
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "10"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
 model = None
+model_version = "local"
 
-if TRITON_URL:
-    print(f"Configured to proxy predictions to Triton: {TRITON_URL}")
-elif SELDON_URL:
-    print(f"Configured to proxy predictions to Seldon: {SELDON_URL}")
+if SERVING_MODE == "triton":
+    log.info("Configured to proxy predictions to Triton: %s", TRITON_URL)
+elif SERVING_MODE == "seldon":
+    log.info("Configured to proxy predictions to Seldon: %s", SELDON_URL)
+elif SERVING_MODE == "onnx":
+    log.info("Configured to serve ONNX model in-process: %s", ONNX_MODEL_PATH)
 else:
     # Load model locally for Dev/Test
     try:
-        model = mlflow.sklearn.load_model(MODEL_PATH)
-        print(f"Model loaded locally from {MODEL_PATH}")
+        load_started = time.perf_counter()
+        model, model_version = load_local_model(MODEL_PATH)
+        metrics.STARTUP_SECONDS.labels("load").set(time.perf_counter() - load_started)
+        log.info("Model loaded locally from %s", MODEL_PATH)
     except Exception as e:
-        print(f"Error loading local model: {e}")
+        log.error("Error loading local model: %s", e)
 
 class WineFeatures(BaseModel):
     alcohol: float
@@ -52,120 +104,322 @@ class WineFeatures(BaseModel):
     od280_od315_of_diluted_wines: float
     proline: float
 
+class WineColumns(BaseModel):
+    # Columnar payload: one array per feature, all of the same length
+    alcohol: List[float]
+    malic_acid: List[float]
+    ash: List[float]
+    alcalinity_of_ash: List[float]
+    magnesium: List[float]
+    total_phenols: List[float]
+    flavanoids: List[float]
+    nonflavanoid_phenols: List[float]
+    proanthocyanins: List[float]
+    color_intensity: List[float]
+    hue: List[float]
+    od280_od315_of_diluted_wines: List[float]
+    proline: List[float]
+
+class WineBatch(BaseModel):
+    # Either a list of records or a columnar payload
+    instances: Optional[List[WineFeatures]] = None
+    columns: Optional[WineColumns] = None
+
+    @model_validator(mode="after")
+    def check_payload(self):
+        if (self.instances is None) == (self.columns is None):
+            raise ValueError("Provide exactly one of 'instances' or 'columns'")
+        if self.instances is not None and len(self.instances) == 0:
+            raise ValueError("'instances' must not be empty")
+        if self.columns is not None:
+            lengths = {len(getattr(self.columns, name)) for name in FEATURE_NAMES}
+            if len(lengths) != 1:
+                raise ValueError("All feature columns must have the same length")
+            if lengths == {0}:
+                raise ValueError("'columns' must not be empty")
+        rows = len(self.instances) if self.instances is not None else lengths.pop()
+        if rows > MAX_BATCH_ROWS:
+            raise ValueError(f"{rows} rows exceed the limit of {MAX_BATCH_ROWS}, use /predict/stream for bulk scoring")
+        return self
+
+    def to_matrix(self):
+        # Pack the payload into one float32 (N, 13) matrix in FEATURE_NAMES order
+        if self.columns is not None:
+            return SCHEMA.columns(self.columns)
+        return SCHEMA.rows(self.instances)
+
+# Long-lived backend with pooled clients, started/closed with the app
+backend = create_backend(SERVING_MODE, model, model_version)
+
+cache = None
+if PREDICTION_CACHE:
+    cache = PredictionCache(
+        max_entries=CACHE_MAX_ENTRIES,
+        ttl_seconds=CACHE_TTL_SECONDS,
+        max_bytes=int(CACHE_MAX_MB * 1024 * 1024),
+        decimals=int(CACHE_DECIMALS) if CACHE_DECIMALS else None
+    )
+    log.info("Prediction cache enabled: max_entries=%d, ttl=%ss", cache.max_entries, CACHE_TTL_SECONDS)
+
+limiter = ConcurrencyLimiter(
+    max_inflight=MAX_INFLIGHT,
+    max_waiting=MAX_WAITING,
+    acquire_timeout=ACQUIRE_TIMEOUT_MS / 1000
+)
+
+def use_backend(new):
+    # Called by the registry when a reloaded (already warm) model becomes current
+    global backend, warm
+    backend = new
+    warm = True
+
+registry_factory, registry_fingerprint = reload_source(SERVING_MODE)
+registry = ModelRegistry(
+    backend,
+    factory=registry_factory,
+    fingerprint=registry_fingerprint,
+    on_swap=use_backend,
+    warmup_batch_sizes=WARMUP_BATCH_SIZES,
+    poll_interval=MODEL_WATCH_SECONDS
+)
+
+async def run_inference(X):
+    # Send an (N, 13) float32 matrix to the configured backend, returns N predictions.
+    # The backend is picked once, so a reload mid-request does not switch versions
+    current = backend
+    if not current.ready:
+        await current.start()
+        if not current.ready:
+            raise HTTPException(status_code=500, detail="Model not loaded locally")
+    try:
+        return await current.predict(X)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{current.name} inference failed: {str(e)}")
+
+async def run_cached_inference(X):
+    # Serve cached rows and send only the misses to the backend, in one call
+    version = backend.version
+    cache.check_version(version)
+    keys = [cache.key(row) for row in X]
+    predictions = np.empty(len(keys), dtype=np.float64)
+    missing = []
+    for i, key in enumerate(keys):
+        hit = cache.get(key)
+        if hit is None:
+            missing.append(i)
+        else:
+            predictions[i] = hit
+    mark("cache")
+
+    if missing:
+        computed = await run_inference(X[missing])
+        mark("backend")
+        predictions[missing] = computed
+        for i, prediction in zip(missing, computed):
+            cache.put(keys[i], prediction, version)
+        mark("cache")
+    return predictions
+
+async def infer_rows(X):
+    # Multi-row scoring shared by the batch and streaming endpoints
+    async with limiter.slot():
+        mark("queue")
+        if cache is not None:
+            predictions = await run_cached_inference(X)
+        else:
+            predictions = await run_inference(X)
+            mark("backend")
+    if drift_logger is not None:
+        drift_logger.log(X)
+        mark("drift_log")
+    return predictions
+
+batcher = None
+if MICRO_BATCHING:
+    batcher = MicroBatcher(
+        run_inference,
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_us=BATCH_MAX_WAIT_US,
+        max_inflight=BATCH_MAX_INFLIGHT
+    )
+    log.info("Micro-batching enabled: max_batch_size=%d, max_wait_us=%d", BATCH_MAX_SIZE, BATCH_MAX_WAIT_US)
+
+# Scored rows are queued for the drift detector in every serving mode (DRIFT_URL / DRIFT_SPOOL_PATH)
+drift_logger = create_drift_logger()
+if drift_logger is not None:
+    log.info("Drift logging enabled: sample_rate=%s, batch_size=%d", drift_logger.sample_rate, drift_logger.batch_size)
+
+warm = False
+
+async def warm_up():
+    # Score zero rows straight through the backend (no cache, limiter or drift log)
+    global warm
+    started = time.perf_counter()
+    try:
+        await warm_backend(backend, WARMUP_BATCH_SIZES)
+    except Exception as e:
+        log.warning("Warm-up failed: %s", e)
+        return False
+    warm = True
+    metrics.STARTUP_SECONDS.labels("warmup").set(time.perf_counter() - started)
+    return True
+
+metrics.STARTUP_SECONDS.labels("import").set(time.perf_counter() - _import_started)
+
+@asynccontextmanager
+async def lifespan(app):
+    await warm_up()
+    registry.start_watching()
+    yield
+    if batcher is not None:
+        await batcher.close()
+    if drift_logger is not None:
+        await drift_logger.close()
+    await registry.close()
+
+app = FastAPI(title="Wine Quality Prediction API", lifespan=lifespan)
+
+def stage_labels():
+    # Read when the request ends, so a reload mid-request counts for the version that served it
+    return SERVING_MODE, backend.version
+
+app.add_middleware(StageMiddleware, paths=("/predict", "/predict/batch"), labels=stage_labels)
+
+@app.exception_handler(Saturated)
+async def saturated_handler(request: Request, exc: Saturated):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers={"Retry-After": "1"})
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator reads the request body as it goes.
+
+    The stock response listens for client disconnects on `receive` while
+    streaming, which would swallow the request body messages we are still
+    reading. Here the body iterator is the only consumer of `receive` and
+    sees the disconnect itself.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
 @app.get("/")
 def read_root():
-    mode = "Triton Proxy" if TRITON_URL else "Local Model"
+    mode = {
+        "triton": "Triton Proxy",
+        "seldon": "Seldon Proxy",
+        "onnx": "Embedded ONNX Runtime",
+    }.get(SERVING_MODE, "Local Model")
     return {"message": "Wine Quality Prediction API", "mode": mode}
 
+@app.get("/health/live")
+def health_live():
+    # The process is up and serving; restart only when this stops answering
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    # Ready once the model is loaded and a warm-up inference went through
+    if not warm:
+        await warm_up()
+    if not warm:
+        return JSONResponse(status_code=503, content={"status": "not ready", "mode": SERVING_MODE})
+    return {"status": "ready", "mode": SERVING_MODE, "version": backend.version}
+
+def check_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled, set ADMIN_TOKEN to enable them")
+    token = request.headers.get("x-admin-token", "")
+    if not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/reload")
+async def admin_reload(request: Request, force: bool = True):
+    # Load, warm and swap in the model on disk; requests keep being served meanwhile
+    check_admin(request)
+    previous = backend.version
+    try:
+        reloaded = await registry.reload(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving {backend.version}: {e}")
+    return {"reloaded": reloaded, "version": backend.version, "previous": previous}
+
+@app.post("/admin/rollback")
+async def admin_rollback(request: Request):
+    check_admin(request)
+    previous = backend.version
+    try:
+        await registry.rollback()
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"version": backend.version, "previous": previous}
+
+def respond(content):
+    # Rendered here rather than by FastAPI's encoder, so serialization is timed as its own stage
+    response = JSONResponse(content)
+    mark("serialize")
+    return response
+
 @app.post("/predict")
-def predict(features: WineFeatures):
-    print(f"DEBUG: TRITON_URL='{TRITON_URL}'")
-    print(f"DEBUG: SELDON_URL='{SELDON_URL}'")
-    print(f"DEBUG: os.environ['SELDON_URL']='{os.environ.get('SELDON_URL')}'")
-    data_dict = features.model_dump()
-    
-    if TRITON_URL:
-        # Proxy to Triton Ensemble
-        try:
-            client = httpclient.InferenceServerClient(url=TRITON_URL)
-            inputs = []
-            
-            # Create individual inputs for each feature
-            for key, value in data_dict.items():
-                # Input shape: [BATCH_SIZE, 1]. Here batch size is 1.
-                input_data = np.array([[value]], dtype=np.float32)
-                
-                # Create InferInput
-                infer_input = httpclient.InferInput(key, input_data.shape, "FP32")
-                infer_input.set_data_from_numpy(input_data)
-                inputs.append(infer_input)
-            
-            # Request output "prediction" from ensemble
-            output = httpclient.InferRequestedOutput("prediction")
-            
-            # Run inference
-            response = client.infer("ensemble_model", inputs=inputs, outputs=[output])
-            
-            # Get result
-            prediction = response.as_numpy("prediction")
-            
-            # Result is [Batch, 1], extract scalar
-            return {"prediction": float(prediction[0][0])}
-            
-        except Exception as e:
-             raise HTTPException(status_code=500, detail=f"Triton inference failed: {str(e)}")
-
-    elif SELDON_URL:
-        # Proxy to Seldon Core (KServe V2 Protocol)
-        try:
-            # KServe V2 payload format for Triton ensemble
-            # The ensemble expects individual feature inputs matching preprocessing model
-            expected_cols = [
-                "alcohol", "malic_acid", "ash", "alcalinity_of_ash", "magnesium",
-                "total_phenols", "flavanoids", "nonflavanoid_phenols", "proanthocyanins",
-                "color_intensity", "hue", "od280_od315_of_diluted_wines", "proline"
-            ]
-            
-            # Build V2 inference request with individual inputs for each feature
-            inputs = []
-            for col in expected_cols:
-                value = data_dict.get(col)
-                inputs.append({
-                    "name": col,
-                    "shape": [1, 1],
-                    "datatype": "FP32",
-                    "data": [[value]]
-                })
-            
-            payload = {
-                "inputs": inputs,
-                "outputs": [{"name": "prediction"}]
-            }
-            
-            # KServe V2 endpoint: /v2/models/{model_name}/infer
-            # Model name is "ensemble-model" (the Triton ensemble entry point)
-            predict_url = f"{SELDON_URL}/v2/models/ensemble-model/infer"
-            
-            response = requests.post(predict_url, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            print(f"DEBUG: Seldon Response: {json.dumps(result, indent=2)}")
-            
-            # Extract prediction from V2 response
-            # Format: {"outputs": [{"name": "prediction", "data": [...]}]}
-            outputs = result.get("outputs", [])
-            prediction = outputs[0].get("data", [0])[0] if outputs else 0
-            
-            return {"prediction": float(prediction)}
-            
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Seldon inference failed: {str(e)}")
-
-    else:
-        # Local Inference (Scikit-Learn)
-        if model is None:
-            raise HTTPException(status_code=500, detail="Model not loaded locally")
-        
-        # Rename column to match model training data (CSV has slash)
-        if 'od280_od315_of_diluted_wines' in data_dict:
-            data_dict['od280/od315_of_diluted_wines'] = data_dict.pop('od280_od315_of_diluted_wines')
-        
-        data = pd.DataFrame([data_dict])
-        
-        # Ensure columns are in the exact order the model expects
-        expected_cols = [
-            "alcohol", "malic_acid", "ash", "alcalinity_of_ash", "magnesium",
-            "total_phenols", "flavanoids", "nonflavanoid_phenols", "proanthocyanins",
-            "color_intensity", "hue", "od280/od315_of_diluted_wines", "proline"
-        ]
-        data = data[expected_cols]
-        
-        try:
-            prediction = model.predict(data)
-            return {"prediction": prediction[0]}
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+async def predict(features: WineFeatures):
+    mark("validate")
+    row = SCHEMA.row(features)
+    mark("pack")
+    if cache is not None:
+        version = backend.version
+        cache.check_version(version)
+        key = cache.key(row)
+        hit = cache.get(key)
+        mark("cache")
+        if hit is not None:
+            if drift_logger is not None:
+                drift_logger.log(row)
+                mark("drift_log")
+            return respond({"prediction": float(hit)})
+
+    async with limiter.slot():
+        mark("queue")
+        if batcher is not None:
+            # Stacked with other concurrent requests into one backend call
+            prediction = await batcher.submit(row)
+        else:
+            prediction = (await run_inference(row.reshape(1, -1)))[0]
+        mark("backend")
+
+    if cache is not None:
+        cache.put(key, prediction, version)
+        mark("cache")
+    if drift_logger is not None:
+        drift_logger.log(row)
+        mark("drift_log")
+    debug_sampled(log, "predict %s -> %s (%s, version %s)", row.tolist(), prediction, SERVING_MODE, backend.version)
+    return respond({"prediction": float(prediction)})
+
+@app.post("/predict/batch")
+async def predict_batch(batch: WineBatch):
+    mark("validate")
+    X = batch.to_matrix()
+    mark("pack")
+    predictions = await infer_rows(X)
+    debug_sampled(log, "predict/batch %d rows (%s, version %s)", len(X), SERVING_MODE, backend.version)
+    return respond({"predictions": predictions.tolist()})
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request, format: Optional[str] = None):
+    # NDJSON or CSV body in, one NDJSON prediction line per row out
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}', use one of {list(FORMATS)}")
+    return DuplexStreamingResponse(
+        stream_ndjson(request.stream(), fmt, infer_rows, STREAM_CHUNK_ROWS, STREAM_MAX_INFLIGHT),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/metrics")
+def prometheus_metrics():
+    content, media_type = metrics.render()
+    return Response(content=content, media_type=media_type)
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
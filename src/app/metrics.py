@@ -0,0 +1,84 @@
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# Micro-batching queue (see src/app/batching.py)
+BATCH_QUEUE_DEPTH = Gauge(
+    "wine_batcher_queue_depth",
+    "Single-row requests waiting to be grouped into a batch"
+)
+BATCH_SIZE = Histogram(
+    "wine_batcher_batch_size",
+    "Rows per stacked backend inference",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+BATCH_QUEUE_LATENCY = Histogram(
+    "wine_batcher_queue_latency_seconds",
+    "Time a request waited in the batching queue before dispatch",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+# Prediction cache (see src/app/cache.py)
+CACHE_HITS = Counter("wine_cache_hits_total", "Predictions served from the cache")
+CACHE_MISSES = Counter("wine_cache_misses_total", "Cache lookups that went to the backend")
+CACHE_EVICTIONS = Counter(
+    "wine_cache_evictions_total",
+    "Cache entries removed, by reason (lru, ttl, invalidate)",
+    ["reason"]
+)
+CACHE_ENTRIES = Gauge("wine_cache_entries", "Predictions currently cached")
+
+# Drift logging queue (see src/app/drift_logger.py)
+DRIFT_LOG_ROWS = Counter(
+    "wine_drift_log_rows_total",
+    "Feature rows handled by the drift logger, by outcome (queued, sampled_out, dropped, sent, failed)",
+    ["outcome"]
+)
+DRIFT_LOG_QUEUE_ROWS = Gauge("wine_drift_log_queue_rows", "Rows waiting to be sent for drift detection")
+DRIFT_LOG_FLUSH_SECONDS = Histogram(
+    "wine_drift_log_flush_seconds",
+    "Time to send one batch to the drift sink",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+# Startup phases (see src/app/main.py): import, load (local model) and warmup
+STARTUP_SECONDS = Gauge(
+    "wine_app_startup_seconds",
+    "Time spent in each startup phase",
+    ["phase"],
+    multiprocess_mode="max"  # import/load happen once in the gunicorn master
+)
+
+# Hot model reload (see src/app/registry.py)
+MODEL_RELOADS = Counter(
+    "wine_model_reloads_total",
+    "Model reload attempts, by outcome (swapped, rewarmed, rolled_back, failed)",
+    ["outcome"]
+)
+
+# Per-request stage timing (see src/app/instrumentation.py)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5
+)
+STAGE_SECONDS = Histogram(
+    "wine_request_stage_seconds",
+    "Time spent per request stage (validate, cache, pack, backend, decode, serialize)",
+    ["endpoint", "stage", "mode", "version"],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "wine_request_seconds",
+    "Time from request start until the response was sent",
+    ["endpoint", "mode", "version"],
+    buckets=LATENCY_BUCKETS
+)
+
+
+def render():
+    # Prometheus text exposition of every registered metric; summed over
+    # all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set (gunicorn_conf.py)
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,145 @@
+"""Hot model reload for the in-process backends.
+
+The registry owns the serving backend. A watcher polls a cheap fingerprint
+of the model on disk (file mtimes and sizes in local/ONNX mode, the
+run_info.json run_id behind Triton/Seldon). When it changes, a new backend
+is built in a worker thread, started and warmed up, and only then swapped
+in. The swap is a single assignment on the event loop, so it always
+happens between requests. A request keeps the backend it picked up at its
+start, so in-flight requests finish on the old version.
+
+The replaced backend is kept for `rollback()`. Remote modes have nothing
+to load in-process: a new run_id only re-warms the proxy so the first
+requests after a Triton/Seldon rollout do not hit a cold model.
+"""
+import asyncio
+import numpy as np
+
+from src.model.features import NUM_FEATURES
+from src.app.metrics import MODEL_RELOADS
+from src.app.instrumentation import get_logger
+
+log = get_logger("wine.registry")
+
+
+async def warm(backend, batch_sizes):
+    # Score zero rows of each size; raises when the backend cannot serve
+    await backend.start()
+    if not backend.ready:
+        raise RuntimeError(f"{backend.name} backend has no model loaded")
+    for size in batch_sizes:
+        await backend.predict(np.zeros((size, NUM_FEATURES), dtype=np.float32))
+
+
+class ModelRegistry:
+    """Current and previous backend plus the reload/rollback logic.
+
+    `factory()` builds a new backend with its model loaded (blocking, run
+    in a thread; None for remote modes, which re-warm the current backend),
+    `fingerprint()` identifies what is on disk and `on_swap(backend)` is
+    called with every backend that becomes current.
+    """
+
+    def __init__(self, backend, factory=None, fingerprint=None, on_swap=None,
+                 warmup_batch_sizes=(1,), poll_interval=0.0):
+        self.backend = backend
+        self.previous = None
+        self.factory = factory
+        self.fingerprint = fingerprint or (lambda: None)
+        self.on_swap = on_swap
+        self.warmup_batch_sizes = list(warmup_batch_sizes)
+        self.poll_interval = poll_interval
+        self.stamp = self.fingerprint()
+        self._lock = None
+        self._loop = None
+        self._task = None
+
+    def _get_lock(self):
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    def _swap(self, backend):
+        self.previous, self.backend = self.backend, backend
+        if self.on_swap is not None:
+            self.on_swap(backend)
+
+    async def reload(self, force=False):
+        """Loads and warms the model on disk, swaps it in; returns True if swapped.
+
+        Without `force` nothing happens unless the fingerprint changed. A
+        failed load keeps serving the current backend and raises.
+        """
+        async with self._get_lock():
+            stamp = self.fingerprint()
+            if not force and stamp == self.stamp:
+                return False
+            try:
+                if self.factory is None:
+                    # Remote model: nothing to load here, warm the proxy for the new version
+                    await warm(self.backend, self.warmup_batch_sizes)
+                    self.stamp = stamp
+                    MODEL_RELOADS.labels("rewarmed").inc()
+                    return False
+                candidate = await asyncio.to_thread(self.factory)
+                await warm(candidate, self.warmup_batch_sizes)
+            except Exception:
+                MODEL_RELOADS.labels("failed").inc()
+                raise
+            evicted = self.previous
+            self._swap(candidate)
+            self.stamp = stamp
+            MODEL_RELOADS.labels("swapped").inc()
+            log.info("Model reloaded: version %s -> %s", self.previous.version, candidate.version)
+        if evicted is not None and evicted is not candidate:
+            await evicted.close()
+        return True
+
+    def adopt(self, backend, stamp):
+        """Makes `backend` (None: keep the current one) current without warm-up.
+
+        For a process that forks its servers after loading, like the
+        gunicorn master: the forked workers warm up on their own.
+        """
+        if backend is not None:
+            self._swap(backend)
+            MODEL_RELOADS.labels("swapped").inc()
+            log.info("Model reloaded: version %s -> %s", self.previous.version, backend.version)
+        self.stamp = stamp
+
+    async def rollback(self):
+        # Swaps back to the previous backend; the on-disk model stays ignored until it changes again
+        async with self._get_lock():
+            if self.previous is None:
+                raise LookupError("No previous model version to roll back to")
+            self._swap(self.previous)
+            MODEL_RELOADS.labels("rolled_back").inc()
+            log.info("Model rolled back: version %s -> %s", self.previous.version, self.backend.version)
+            return self.backend
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                # Keep serving the current model; a half-written file is retried next poll
+                log.warning("Model reload failed: %s", e)
+
+    def start_watching(self):
+        if self.poll_interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.previous is not None:
+            await self.previous.close()
+        await self.backend.close()
@@ -0,0 +1,180 @@
+"""Streaming bulk scoring shared by /predict/stream and src/model/score.py.
+
+Input (NDJSON records or CSV with a header row) is consumed in fixed-size
+byte blocks, parsed into float32 (chunk_rows, 13) matrices and scored with
+up to `max_inflight` chunks running against the backend at once.
+Predictions come back as NDJSON lines in input order. Nothing holds more
+than a few chunks, so memory stays flat whatever the input size.
+"""
+import asyncio
+import csv
+import json
+from collections import deque
+import numpy as np
+
+from src.model.features import SCHEMA, FEATURE_NAMES, CSV_COLUMN_NAMES
+
+FORMATS = ("ndjson", "csv")
+
+
+class StreamFormatError(ValueError):
+    """Raised for input lines that cannot be turned into feature vectors."""
+
+
+class LineSplitter:
+    """Turns arbitrary byte blocks into complete text lines."""
+
+    def __init__(self):
+        self._tail = b""
+
+    def feed(self, block):
+        data = self._tail + block
+        lines = data.split(b"\n")
+        self._tail = lines.pop()
+        return [line.decode("utf-8") for line in lines]
+
+    def flush(self):
+        tail, self._tail = self._tail, b""
+        return [tail.decode("utf-8")] if tail else []
+
+
+class ChunkParser:
+    """Parses lines into (chunk_rows, 13) float32 matrices.
+
+    NDJSON lines are objects keyed by feature name (or the CSV spelling) or
+    plain arrays of 13 values. CSV input starts with a header row naming
+    the feature columns; extra columns are ignored.
+    """
+
+    def __init__(self, fmt, chunk_rows=1024):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported stream format: {fmt}")
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.line_number = 0
+        self._buffer = np.empty((chunk_rows, len(FEATURE_NAMES)), dtype=np.float32)
+        self._rows = 0
+        self._csv_index = None
+
+    def feed(self, lines):
+        # Returns the chunks completed by these lines
+        chunks = []
+        for line in lines:
+            self.line_number += 1
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                if self.fmt == "csv":
+                    if self._csv_index is None:
+                        self._csv_index = self._parse_header(line)
+                        continue
+                    self._buffer[self._rows] = self._parse_csv(line)
+                else:
+                    self._buffer[self._rows] = self._parse_ndjson(line)
+            except KeyError as e:
+                raise StreamFormatError(f"line {self.line_number}: missing feature {e}")
+            except (ValueError, TypeError, IndexError) as e:
+                raise StreamFormatError(f"line {self.line_number}: {e}")
+            self._rows += 1
+            if self._rows == self.chunk_rows:
+                chunks.append(self._take())
+        return chunks
+
+    def flush(self):
+        return [self._take()] if self._rows else []
+
+    def _take(self):
+        chunk = self._buffer[:self._rows].copy()
+        self._rows = 0
+        return chunk
+
+    def _parse_ndjson(self, line):
+        record = json.loads(line)
+        if isinstance(record, list):
+            if len(record) != len(FEATURE_NAMES):
+                raise ValueError(f"expected {len(FEATURE_NAMES)} values, got {len(record)}")
+            return record
+        return SCHEMA.row_from_mapping(record)
+
+    def _parse_header(self, line):
+        header = [name.strip() for name in next(csv.reader([line]))]
+        positions = {name: i for i, name in enumerate(header)}
+        index = []
+        for name in FEATURE_NAMES:
+            column = name if name in positions else CSV_COLUMN_NAMES.get(name)
+            if column not in positions:
+                raise KeyError(f"CSV header is missing column '{name}'")
+            index.append(positions[column])
+        return index
+
+    def _parse_csv(self, line):
+        values = next(csv.reader([line]))
+        return [float(values[i]) for i in self._csv_index]
+
+
+def format_predictions(predictions):
+    # One {"prediction": ...} NDJSON line per row
+    return "".join('{"prediction": %r}\n' % float(p) for p in predictions).encode()
+
+
+async def score_chunks(chunks, infer_fn, max_inflight=4):
+    """Scores an async iterable of matrices with a bounded pipeline.
+
+    Up to `max_inflight` chunks are being scored at once; results are
+    yielded in input order. Reading more input waits while the window is
+    full, which keeps memory bounded.
+    """
+    pending = deque()
+    try:
+        try:
+            async for X in chunks:
+                pending.append(asyncio.ensure_future(infer_fn(X)))
+                if len(pending) >= max_inflight:
+                    yield await pending.popleft()
+        except StreamFormatError:
+            # Deliver rows already sent to the backend before reporting bad input
+            while pending:
+                yield await pending.popleft()
+            raise
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def parse_stream(blocks, fmt, chunk_rows=1024):
+    # Async byte blocks -> float32 matrices
+    splitter = LineSplitter()
+    parser = ChunkParser(fmt, chunk_rows)
+    async for block in blocks:
+        for chunk in parser.feed(splitter.feed(block)):
+            yield chunk
+    for chunk in parser.feed(splitter.flush()):
+        yield chunk
+    for chunk in parser.flush():
+        yield chunk
+
+
+async def stream_ndjson(blocks, fmt, infer_fn, chunk_rows=1024, max_inflight=4):
+    """Bytes in, NDJSON prediction bytes out.
+
+    Errors after output has started cannot change the response status, so
+    they are reported as a final {"error": ...} line.
+    """
+    try:
+        async for predictions in score_chunks(parse_stream(blocks, fmt, chunk_rows), infer_fn, max_inflight):
+            yield format_predictions(predictions)
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)
+        yield (json.dumps({"error": detail}) + "\n").encode()
+
+
+def detect_format(content_type=None, filename=None):
+    # Pick the input format from a Content-Type header or a file extension
+    if content_type and "csv" in content_type:
+        return "csv"
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
@@ -0,0 +1,104 @@
+"""Versioned, memory-mappable drift detector artifact.
+
+A detector directory holds plain arrays plus a small JSON header instead of
+a pickled KSDrift object:
+
+    metadata.json     format version, detector settings, feature names, files
+    x_ref.npy         float32 (rows, 13) reference data for KSDrift
+    edges.npy, ref_counts.npy, mean.npy, std.npy
+                      the ReferenceProfile used by the native engine
+
+Arrays are opened with np.load(mmap_mode="r"), so loading only reads the
+header and several server processes on one node share the same page-cache
+pages. The alibi detector is built from the mapped reference on first use.
+"""
+import json
+import os
+import time
+import numpy as np
+
+from src.model.features import FEATURE_NAMES
+from src.drift.engine import ReferenceProfile
+
+FORMAT_VERSION = 1
+METADATA_FILE = "metadata.json"
+PROFILE_ARRAYS = ("edges", "ref_counts", "mean", "std")
+
+
+def is_artifact(path):
+    return os.path.isfile(os.path.join(path, METADATA_FILE))
+
+
+def save_artifact(path, x_ref, p_val=0.05, profile=None):
+    os.makedirs(path, exist_ok=True)
+    x_ref = np.ascontiguousarray(x_ref, dtype=np.float32)
+    profile = profile or ReferenceProfile.from_data(x_ref)
+
+    files = {"x_ref": "x_ref.npy"}
+    np.save(os.path.join(path, files["x_ref"]), x_ref)
+    for name, array in profile.arrays().items():
+        files[name] = f"{name}.npy"
+        np.save(os.path.join(path, files[name]), array)
+
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "detector": "KSDrift",
+        "p_val": p_val,
+        "features": list(FEATURE_NAMES),
+        "n_rows": int(len(x_ref)),
+        "psi_bins": profile.psi_bins,
+        "files": files,
+    }
+    # Header last: a reader that finds it also finds every array
+    tmp = os.path.join(path, METADATA_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp, os.path.join(path, METADATA_FILE))
+    return metadata
+
+
+class DetectorArtifact:
+    """Lazy view of a detector directory written by save_artifact."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            self.metadata = json.load(f)
+
+        version = self.metadata.get("format_version")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported drift artifact format {version} in {path} (expected {FORMAT_VERSION})")
+        if self.metadata["features"] != list(FEATURE_NAMES):
+            raise ValueError("Drift artifact was built for a different feature order")
+
+        self._profile = None
+        self._detector = None
+
+    def array(self, name):
+        return np.load(os.path.join(self.path, self.metadata["files"][name]), mmap_mode="r")
+
+    @property
+    def has_profile(self):
+        return all(name in self.metadata["files"] for name in PROFILE_ARRAYS)
+
+    @property
+    def profile(self):
+        if self._profile is None:
+            arrays = {name: self.array(name) for name in PROFILE_ARRAYS}
+            self._profile = ReferenceProfile(
+                n_rows=self.metadata["n_rows"], psi_bins=self.metadata["psi_bins"], **arrays
+            )
+        return self._profile
+
+    @property
+    def detector(self):
+        if self._detector is None:
+            # alibi-detect is heavy; only pay for it when the KSDrift path is used
+            from alibi_detect.cd import KSDrift
+            self._detector = KSDrift(self.array("x_ref"), p_val=self.metadata["p_val"])
+        return self._detector
+
+    def predict(self, X):
+        # Stands in for the detector so DriftWindow builds it on the first test
+        return self.detector.predict(X)
@@ -0,0 +1,182 @@
+"""Incremental drift statistics against a precomputed reference profile.
+
+Training reduces the reference data to a ReferenceProfile: per-feature
+quantile bin edges, the reference share of rows in each bin (its CDF at the
+edges), and its mean and standard deviation. Live traffic only updates
+per-feature bin counts and sums for a few sliding windows, so an update
+costs O(rows * features * log(bins)) and reading the statistics
+O(features * bins), independent of the reference size.
+
+Per window and feature the engine reports:
+  ks_stat     max |F_live - F_ref| over the bin edges (KS on the quantile grid)
+  p_val       asymptotic two-sample KS p-value for that statistic
+  psi         population stability index over `psi_bins` coarser bins
+  mean_shift  (live mean - reference mean) in reference standard errors
+A window drifts when any p-value is below p_val / n_features (Bonferroni,
+as alibi's KSDrift does) or any PSI exceeds `psi_threshold`.
+"""
+import os
+import numpy as np
+from scipy.special import kolmogorov
+
+DRIFT_WINDOWS = tuple(int(w) for w in os.getenv("DRIFT_WINDOWS", "500,5000").split(","))
+DRIFT_P_VAL = float(os.getenv("DRIFT_P_VAL", "0.05"))
+DRIFT_PSI_THRESHOLD = float(os.getenv("DRIFT_PSI_THRESHOLD", "0.2"))
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "30"))
+
+# Keeps log() finite for empty bins
+PSI_EPS = 1e-4
+
+
+class ReferenceProfile:
+    """Binned summary of the reference data, built once at training time."""
+
+    def __init__(self, edges, ref_counts, mean, std, n_rows, psi_bins=10):
+        self.edges = np.asarray(edges, dtype=np.float32)            # (F, B-1)
+        self.ref_counts = np.asarray(ref_counts, dtype=np.int64)    # (F, B)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.n_rows = int(n_rows)
+        self.psi_bins = psi_bins
+        self.n_features, self.n_bins = self.ref_counts.shape
+        if self.n_bins % psi_bins:
+            raise ValueError(f"{self.n_bins} bins cannot be grouped into {psi_bins} PSI bins")
+
+        self.ref_cdf = np.cumsum(self.ref_counts, axis=1)[:, :-1] / self.n_rows
+        self.ref_psi = np.maximum(self._coarse(self.ref_counts) / self.n_rows, PSI_EPS)
+
+    @classmethod
+    def from_data(cls, X, bins=100, psi_bins=10):
+        X = np.asarray(X, dtype=np.float64)
+        quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+        edges = np.quantile(X, quantiles, axis=0).T
+        profile_counts = np.stack([
+            np.bincount(np.searchsorted(edges[j], X[:, j], side="right"), minlength=bins)
+            for j in range(X.shape[1])
+        ])
+        std = X.std(axis=0)
+        return cls(edges, profile_counts, X.mean(axis=0), np.where(std > 0, std, 1.0), len(X), psi_bins)
+
+    def bin_index(self, X):
+        # (N, F) values -> (N, F) bin numbers in [0, n_bins)
+        out = np.empty(X.shape, dtype=np.intp)
+        for j in range(self.n_features):
+            out[:, j] = np.searchsorted(self.edges[j], X[:, j], side="right")
+        return out
+
+    def _coarse(self, counts):
+        return counts.reshape(counts.shape[0], self.psi_bins, -1).sum(axis=2)
+
+    def arrays(self):
+        # Everything needed to rebuild the profile, as plain arrays
+        return {
+            "edges": self.edges, "ref_counts": self.ref_counts,
+            "mean": self.mean, "std": self.std,
+        }
+
+
+class SlidingWindow:
+    """Bin counts and value sums over the last `size` rows."""
+
+    def __init__(self, size, profile):
+        self.size = size
+        self.rows = 0
+        self.counts = np.zeros((profile.n_features, profile.n_bins), dtype=np.int64)
+        self.sums = np.zeros(profile.n_features, dtype=np.float64)
+
+
+class DriftEngine:
+    """Several sliding windows of live traffic compared with one profile.
+
+    All windows share one ring of the last max(windows) rows, which is
+    only read to subtract rows as they slide out of a window.
+    """
+
+    def __init__(self, profile, windows=DRIFT_WINDOWS, p_val=DRIFT_P_VAL,
+                 psi_threshold=DRIFT_PSI_THRESHOLD, min_rows=DRIFT_MIN_ROWS):
+        self.profile = profile
+        self.p_val = p_val
+        self.psi_threshold = psi_threshold
+        self.min_rows = min_rows
+        self.windows = [SlidingWindow(size, profile) for size in sorted(windows)]
+        self.capacity = self.windows[-1].size
+        self._ring = np.zeros((self.capacity, profile.n_features), dtype=np.float32)
+        self.total = 0
+
+        # Flat (feature, bin) index offsets for bincount
+        self._offsets = np.arange(profile.n_features) * profile.n_bins
+
+    def _counts(self, X):
+        flat = (self.profile.bin_index(X) + self._offsets).ravel()
+        size = self.profile.n_features * self.profile.n_bins
+        return np.bincount(flat, minlength=size).reshape(self.profile.n_features, -1)
+
+    def _ring_rows(self, start, stop):
+        # Rows with global index in [start, stop), still held by the ring
+        index = np.arange(start, stop) % self.capacity
+        return self._ring[index]
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        n = len(X)
+        if n == 0:
+            return self.result()
+
+        for window in self.windows:
+            keep = X[-window.size:]
+            window.counts += self._counts(keep)
+            window.sums += keep.sum(axis=0, dtype=np.float64)
+
+            # Older rows that slide out of this window
+            start = max(0, self.total - window.size)
+            stop = max(start, min(self.total, self.total + n - window.size))
+            if stop > start:
+                old = self._ring_rows(start, stop)
+                window.counts -= self._counts(old)
+                window.sums -= old.sum(axis=0, dtype=np.float64)
+            window.rows = min(window.size, window.rows + n)
+
+        tail = X[-self.capacity:]
+        index = np.arange(self.total + n - len(tail), self.total + n) % self.capacity
+        self._ring[index] = tail
+        self.total += n
+        return self.result()
+
+    def window_stats(self, window):
+        profile = self.profile
+        n, m = window.rows, profile.n_rows
+        if n == 0:
+            nan = np.full(profile.n_features, np.nan)
+            return {"ks_stat": nan, "p_val": nan, "psi": nan, "mean_shift": nan}
+
+        live_cdf = np.cumsum(window.counts, axis=1)[:, :-1] / n
+        ks_stat = np.abs(live_cdf - profile.ref_cdf).max(axis=1)
+
+        en = np.sqrt(n * m / (n + m))
+        p_val = kolmogorov((en + 0.12 + 0.11 / en) * ks_stat)
+
+        live_psi = np.maximum(profile._coarse(window.counts) / n, PSI_EPS)
+        psi = ((live_psi - profile.ref_psi) * np.log(live_psi / profile.ref_psi)).sum(axis=1)
+
+        mean_shift = (window.sums / n - profile.mean) / (profile.std / np.sqrt(n))
+        return {"ks_stat": ks_stat, "p_val": p_val, "psi": psi, "mean_shift": mean_shift}
+
+    def result(self):
+        """Latest statistics for every window, shaped (windows, features).
+
+        Same keys as DriftWindow's result (is_drift, p_val, window_rows)
+        plus ks_stat, psi, mean_shift and per-window window_drift.
+        """
+        stats = [self.window_stats(w) for w in self.windows]
+        out = {key: np.stack([s[key] for s in stats]).astype(np.float32) for key in stats[0]}
+
+        rows = np.array([w.rows for w in self.windows], dtype=np.int32)
+        threshold = self.p_val / self.profile.n_features
+        window_drift = (
+            (rows >= self.min_rows)
+            & ((out["p_val"] < threshold).any(axis=1) | (out["psi"] > self.psi_threshold).any(axis=1))
+        )
+        out["window_rows"] = rows
+        out["window_drift"] = window_drift.astype(np.int32)
+        out["is_drift"] = int(window_drift.any())
+        return out
@@ -1,10 +1,12 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from alibi_detect.cd import KSDrift
-from alibi_detect.utils.saving import save_detector
 import os
-import dill
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.model.features import TRAINING_COLUMNS  # noqa: E402
+from src.drift.artifact import save_artifact  # noqa: E402
 
 def train_drift_detector():
     # Load data
@@ -18,26 +20,28 @@ def train_drift_detector():
     # Split data (same random state as model training to ensure same reference data)
     train, test = train_test_split(data, random_state=None) # train.py uses default random_state which is None? No, train.py uses None in train_test_split call.
 
-    # Features only
-    X_train = train.drop(["target"], axis=1).values.astype(np.float32)
+    # Features only, in the shared feature order
+    X_train = train[list(TRAINING_COLUMNS)].values.astype(np.float32)
     
-    # Define Drift Detector
     # K-S (Kolmogorov-Smirnov) test for feature-wise drift detection on continuous data
     # p_val: p-value used for significance of the K-S test
-    cd = KSDrift(X_train, p_val=0.05)
+    p_val = 0.05
 
-    # Save the detector
+    # Save the detector as arrays + metadata.json (src/drift/artifact.py). The
+    # server memory-maps the reference and builds KSDrift / the native engine
+    # from it, so nothing has to be unpickled at startup
     output_dir = "models/drift_detector"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Save using dill for simple loading or alibi's save_detector
-    # Seldon's alibi-detect server often expects the artifact to be loaded via dill or specific structure
-    # We will save as 'detector.dill' which is a common pattern for Seldon
-    filepath = os.path.join(output_dir, "detector.dill")
-    with open(filepath, "wb") as f:
-        dill.dump(cd, f)
-    
-    print(f"Drift detector saved to {filepath}")
+    metadata = save_artifact(output_dir, X_train, p_val=p_val)
+    print(f"Drift detector artifact (format v{metadata['format_version']}, {metadata['n_rows']} reference rows) saved to {output_dir}")
+
+    # Legacy pickle for servers that still load detector.dill
+    if os.getenv("DRIFT_SAVE_DILL", "0") == "1":
+        from alibi_detect.cd import KSDrift
+        import dill
+        filepath = os.path.join(output_dir, "detector.dill")
+        with open(filepath, "wb") as f:
+            dill.dump(KSDrift(X_train, p_val=p_val), f)
+        print(f"Drift detector pickle saved to {filepath}")
 
 if __name__ == "__main__":
     train_drift_detector()
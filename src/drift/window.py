@@ -0,0 +1,144 @@
+"""Windowed drift testing for DriftWrapper.
+
+Logged requests are appended to a fixed-size ring buffer instead of being
+tested one row at a time. The detector runs once per window: after
+`test_every` new rows, or after `max_age_seconds` when some new rows have
+arrived. It always sees the most recent rows, limited to `max_rows` and,
+when `max_age_seconds` is set, to rows that are not older than that.
+"""
+import os
+import time
+import numpy as np
+
+from src.model.features import FEATURE_NAMES
+
+DRIFT_WINDOW_ROWS = int(os.getenv("DRIFT_WINDOW_ROWS", "500"))
+DRIFT_WINDOW_SECONDS = float(os.getenv("DRIFT_WINDOW_SECONDS", "0"))
+DRIFT_TEST_EVERY = int(os.getenv("DRIFT_TEST_EVERY", "0")) or DRIFT_WINDOW_ROWS
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "30"))
+
+
+def stack_features(columns, names=FEATURE_NAMES, fill=0.0):
+    """Builds an (N, len(names)) float32 matrix from per-feature arrays.
+
+    `columns` maps feature name -> array of N values (any shape). Missing
+    features are filled with `fill`; a single-value column is broadcast.
+    """
+    arrays = {name: np.asarray(columns[name], dtype=np.float32).reshape(-1)
+              for name in names if name in columns}
+    if not arrays:
+        raise ValueError("None of the expected features are present")
+    n = max(a.size for a in arrays.values())
+    X = np.full((n, len(names)), fill, dtype=np.float32)
+    for j, name in enumerate(names):
+        a = arrays.get(name)
+        if a is None:
+            continue
+        if a.size not in (1, n):
+            raise ValueError(f"Feature '{name}' has {a.size} values, expected {n}")
+        X[:, j] = a
+    return X
+
+
+def as_matrix(X, width=len(FEATURE_NAMES)):
+    # Single array input: accept (width,), (N, width) or a flat N*width buffer
+    X = np.asarray(X, dtype=np.float32)
+    if X.ndim != 2:
+        X = X.reshape(-1, width)
+    if X.shape[1] != width:
+        raise ValueError(f"Expected {width} features, got shape {X.shape}")
+    return X
+
+
+class RingBuffer:
+    """Last `capacity` rows of a (capacity, width) float32 matrix with arrival times."""
+
+    def __init__(self, capacity, width=len(FEATURE_NAMES), clock=time.monotonic):
+        self.capacity = capacity
+        self.clock = clock
+        self._rows = np.zeros((capacity, width), dtype=np.float32)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, X):
+        X = X[-self.capacity:]
+        n = len(X)
+        if n == 0:
+            return
+        now = self.clock()
+        end = self._next + n
+        if end <= self.capacity:
+            self._rows[self._next:end] = X
+            self._times[self._next:end] = now
+        else:
+            first = self.capacity - self._next
+            self._rows[self._next:] = X[:first]
+            self._rows[:n - first] = X[first:]
+            self._times[self._next:] = now
+            self._times[:n - first] = now
+        self._next = end % self.capacity
+        self._size = min(self.capacity, self._size + n)
+
+    def values(self, max_age=0):
+        # Oldest first; copies because the buffer keeps being overwritten
+        start = (self._next - self._size) % self.capacity
+        order = (start + np.arange(self._size)) % self.capacity
+        if max_age:
+            order = order[self._times[order] >= self.clock() - max_age]
+        return self._rows[order]
+
+
+class DriftWindow:
+    """Accumulates rows and runs `detector.predict` once per window.
+
+    `update` returns the latest result dict ({"is_drift", "p_val",
+    "window_rows"}), which is the previous window's result until the next
+    window is due. Before the first test `is_drift` is 0 and `p_val` NaN.
+    """
+
+    def __init__(self, detector, max_rows=DRIFT_WINDOW_ROWS, max_age_seconds=DRIFT_WINDOW_SECONDS,
+                 test_every=DRIFT_TEST_EVERY, min_rows=DRIFT_MIN_ROWS, width=len(FEATURE_NAMES),
+                 clock=time.monotonic):
+        self.detector = detector
+        self.max_age = max_age_seconds
+        self.test_every = test_every or max_rows
+        self.min_rows = min(min_rows, max_rows)
+        self.clock = clock
+        self.buffer = RingBuffer(max_rows, width, clock)
+        self.new_rows = 0
+        self.last_test = clock()
+        self.tests = 0
+        self.result = {"is_drift": 0, "p_val": np.full(width, np.nan, dtype=np.float32), "window_rows": 0}
+
+    def due(self):
+        if self.new_rows == 0:
+            return False
+        if self.new_rows >= self.test_every:
+            return True
+        return bool(self.max_age) and self.clock() - self.last_test >= self.max_age
+
+    def update(self, X):
+        self.buffer.extend(X)
+        self.new_rows += len(X)
+        if self.due():
+            self.run()
+        return self.result
+
+    def run(self):
+        window = self.buffer.values(self.max_age)
+        self.new_rows = 0
+        self.last_test = self.clock()
+        if len(window) < self.min_rows:
+            return self.result
+        preds = self.detector.predict(window)
+        self.tests += 1
+        self.result = {
+            "is_drift": int(preds["data"]["is_drift"]),
+            "p_val": np.atleast_1d(np.asarray(preds["data"]["p_val"], dtype=np.float32)),
+            "window_rows": len(window),
+        }
+        return self.result
@@ -0,0 +1,80 @@
+"""Wine feature schema shared by training, serving and drift detection.
+
+FEATURE_NAMES is the order used everywhere a feature vector is built: the
+ONNX/sklearn model input, the Triton/Seldon payloads and the drift
+detector's reference data. The training CSV spells one column with a
+slash, which TRAINING_COLUMNS keeps for selecting columns from the CSV.
+"""
+import operator
+import numpy as np
+
+FEATURE_NAMES = (
+    "alcohol", "malic_acid", "ash", "alcalinity_of_ash", "magnesium",
+    "total_phenols", "flavanoids", "nonflavanoid_phenols", "proanthocyanins",
+    "color_intensity", "hue", "od280_od315_of_diluted_wines", "proline"
+)
+
+# Request/field name -> column name in data/wine_quality.csv
+CSV_COLUMN_NAMES = {"od280_od315_of_diluted_wines": "od280/od315_of_diluted_wines"}
+
+TRAINING_COLUMNS = tuple(CSV_COLUMN_NAMES.get(name, name) for name in FEATURE_NAMES)
+
+NUM_FEATURES = len(FEATURE_NAMES)
+
+
+class FeatureSchema:
+    """Column order compiled once into getters that pack float32 vectors.
+
+    `row` and `rows` read attributes (pydantic models), `row_from_mapping`
+    and `rows_from_mappings` read keys (dicts, accepting either the field
+    or the CSV spelling). Batch variants fill a caller-provided buffer when
+    one is given so hot loops can reuse it.
+    """
+
+    def __init__(self, names=FEATURE_NAMES):
+        self.names = tuple(names)
+        self.width = len(self.names)
+        self._attrs = operator.attrgetter(*self.names)
+        self._keys = operator.itemgetter(*self.names)
+
+    def row(self, record):
+        return np.array(self._attrs(record), dtype=np.float32)
+
+    def rows(self, records, out=None):
+        n = len(records)
+        out = self._buffer(n, out)
+        for i, values in enumerate(map(self._attrs, records)):
+            out[i] = values
+        return out
+
+    def columns(self, record):
+        # record holds one sequence per feature, returns (N, width)
+        return np.ascontiguousarray(np.array(self._attrs(record), dtype=np.float32).T)
+
+    def row_from_mapping(self, mapping):
+        return np.array(self._keys(self._normalize(mapping)), dtype=np.float32)
+
+    def rows_from_mappings(self, mappings, out=None):
+        n = len(mappings)
+        out = self._buffer(n, out)
+        for i, mapping in enumerate(mappings):
+            out[i] = self._keys(self._normalize(mapping))
+        return out
+
+    def _normalize(self, mapping):
+        # Accept CSV spellings (e.g. "od280/od315_of_diluted_wines") as well
+        for field, column in CSV_COLUMN_NAMES.items():
+            if field not in mapping and column in mapping:
+                mapping = dict(mapping)
+                mapping[field] = mapping.pop(column)
+        return mapping
+
+    def _buffer(self, n, out):
+        if out is None:
+            return np.empty((n, self.width), dtype=np.float32)
+        if out.shape[0] < n or out.shape[1] != self.width or out.dtype != np.float32:
+            raise ValueError(f"Buffer of shape {out.shape} cannot hold {n} rows of {self.width} features")
+        return out[:n]
+
+
+SCHEMA = FeatureSchema()
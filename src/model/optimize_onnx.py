@@ -0,0 +1,245 @@
+"""Post-export ONNX optimization for the trained wine model.
+
+Builds several ONNX variants of the sklearn model, checks each against
+sklearn's predictions on the test split and keeps the fastest one within
+`tolerance`:
+
+    baseline        convert_sklearn as exported by train.py
+    ml_opset3       converted for ai.onnx.ml opset 3 (tree ensembles)
+    linear_matmul   linear models as a plain MatMul + Add graph
+    linear_int8     linear_matmul with dynamic int8 weight quantization
+    linear_fp16     linear_matmul computed in float16
+    *_ort           any of the above after ONNX Runtime's offline graph
+                    optimizations (ORT_ENABLE_EXTENDED; the "all" level adds
+                    layout rewrites that are tied to the CPU it ran on)
+
+Variants that do not apply to the estimator, fail to load or drift from
+sklearn are skipped and listed in the report. The chosen model is written
+to models/wine_model_optimized/model.onnx (with report.json). When train.py
+assembled models/triton_repository, the model is copied into it, the
+Triton configs are profiled again on it, and the repository is re-logged
+as the run's triton_repo artifact, so what Triton serves is what was tuned.
+
+    python src/model/optimize_onnx.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import onnxruntime as ort
+import pandas as pd
+import yaml
+from onnx import helper, numpy_helper, TensorProto
+from sklearn.model_selection import train_test_split
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.model.features import TRAINING_COLUMNS, NUM_FEATURES  # noqa: E402
+from src.model.tracking import relog_artifacts  # noqa: E402
+from src.model.triton_config import generate as generate_triton_configs  # noqa: E402
+
+INPUT_NAME = "float_input"
+OUTPUT_NAME = "variable"
+OUTPUT_DIR = "models/wine_model_optimized"
+TRITON_REPO = "models/triton_repository"
+TRITON_MODEL_PATH = os.path.join(TRITON_REPO, "wine_model", "1", "model.onnx")
+
+DEFAULTS = {
+    "tolerance": 1e-4,
+    "batch_sizes": [1, 8, 64],
+    "repeats": 200,
+}
+
+
+def convert(model, target_opset=None):
+    initial_type = [(INPUT_NAME, FloatTensorType([None, NUM_FEATURES]))]
+    return convert_sklearn(model, initial_types=initial_type, target_opset=target_opset).SerializeToString()
+
+
+def linear_graph(model, dtype=np.float32):
+    # y = X @ coef + intercept as standard ONNX ops, so quantization and fp16 apply
+    coef = np.asarray(model.coef_, dtype=dtype).reshape(NUM_FEATURES, 1)
+    intercept = np.asarray(model.intercept_, dtype=dtype).reshape(1)
+    nodes, x = [], INPUT_NAME
+    if dtype == np.float16:
+        nodes.append(helper.make_node("Cast", [INPUT_NAME], ["x16"], to=TensorProto.FLOAT16))
+        x = "x16"
+    nodes.append(helper.make_node("MatMul", [x, "coef"], ["xw"]))
+    nodes.append(helper.make_node("Add", ["xw", "intercept"], ["y" if dtype == np.float16 else OUTPUT_NAME]))
+    if dtype == np.float16:
+        nodes.append(helper.make_node("Cast", ["y"], [OUTPUT_NAME], to=TensorProto.FLOAT))
+    graph = helper.make_graph(
+        nodes, "wine_linear",
+        [helper.make_tensor_value_info(INPUT_NAME, TensorProto.FLOAT, [None, NUM_FEATURES])],
+        [helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.FLOAT, [None, 1])],
+        initializer=[numpy_helper.from_array(coef, "coef"), numpy_helper.from_array(intercept, "intercept")],
+    )
+    return helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)]).SerializeToString()
+
+
+def quantize_int8(model_bytes):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "in.onnx"), os.path.join(tmp, "out.onnx")
+        with open(src, "wb") as f:
+            f.write(model_bytes)
+        quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+        with open(dst, "rb") as f:
+            return f.read()
+
+
+def ort_optimized(model_bytes):
+    # Let ONNX Runtime apply its portable graph rewrites once and save the result
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "optimized.onnx")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        options.optimized_model_filepath = path
+        ort.InferenceSession(model_bytes, options, providers=["CPUExecutionProvider"])
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def build_variants(model):
+    """name -> callable returning ONNX bytes; not every variant applies to every model."""
+    variants = {"baseline": lambda: convert(model)}
+    if hasattr(model, "estimators_"):
+        variants["ml_opset3"] = lambda: convert(model, {"": 17, "ai.onnx.ml": 3})
+    if hasattr(model, "coef_") and np.size(model.coef_) == NUM_FEATURES:
+        variants["linear_matmul"] = lambda: linear_graph(model)
+        variants["linear_int8"] = lambda: quantize_int8(linear_graph(model))
+        variants["linear_fp16"] = lambda: linear_graph(model, np.float16)
+    return variants
+
+
+def session(model_bytes):
+    # Same single-threaded setup as the app's ONNX mode and one Triton instance
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = 1
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(model_bytes, options, providers=["CPUExecutionProvider"])
+
+
+def predict(sess, X):
+    return sess.run(None, {INPUT_NAME: X})[0].reshape(-1)
+
+
+def benchmark(sess, X, batch_sizes, repeats):
+    # Median seconds per row for each batch size
+    timings = {}
+    for size in batch_sizes:
+        batch = np.ascontiguousarray(np.resize(X, (size, X.shape[1])))
+        predict(sess, batch)
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict(sess, batch)
+            samples.append(time.perf_counter() - start)
+        timings[size] = float(np.median(samples)) / size
+    return timings
+
+
+def optimize(model, X_test, tolerance=1e-4, batch_sizes=(1, 8, 64), repeats=200):
+    """Returns (best variant name, its ONNX bytes, report dict)."""
+    X_test = np.ascontiguousarray(X_test, dtype=np.float32)
+    expected = np.asarray(model.predict(X_test), dtype=np.float64).reshape(-1)
+    scale = max(1.0, float(np.abs(expected).max()))
+
+    candidates = {}
+    for name, build in build_variants(model).items():
+        try:
+            candidates[name] = build()
+            candidates[f"{name}_ort"] = ort_optimized(candidates[name])
+        except Exception as e:
+            candidates.setdefault(name, e)
+
+    report = {"tolerance": tolerance, "batch_sizes": list(batch_sizes), "variants": {}}
+    best, best_bytes, best_score = None, None, float("inf")
+    for name, model_bytes in candidates.items():
+        entry = report["variants"][name] = {}
+        if isinstance(model_bytes, Exception):
+            entry["skipped"] = f"build failed: {model_bytes}"
+            continue
+        try:
+            sess = session(model_bytes)
+            error = float(np.abs(predict(sess, X_test) - expected).max()) / scale
+        except Exception as e:
+            entry["skipped"] = f"load failed: {e}"
+            continue
+        entry.update(bytes=len(model_bytes), max_error=error)
+        if error > tolerance:
+            entry["skipped"] = "outside tolerance"
+            continue
+        timings = benchmark(sess, X_test, batch_sizes, repeats)
+        # Geometric mean of per-row latency across batch sizes
+        score = float(np.exp(np.mean(np.log(list(timings.values())))))
+        entry.update(us_per_row={str(k): v * 1e6 for k, v in timings.items()}, score_us=score * 1e6)
+        if score < best_score:
+            best, best_bytes, best_score = name, model_bytes, score
+
+    if best is None:
+        raise RuntimeError("No ONNX variant matched the sklearn model within tolerance")
+    report["selected"] = best
+    return best, best_bytes, report
+
+
+def main():
+    with open("params.yaml") as f:
+        all_params = yaml.safe_load(f)
+    settings = {**DEFAULTS, **(all_params.get("optimize") or {})}
+    seed = all_params["train"].get("seed", 42)
+
+    # Same split as train.py so parity is checked on held-out rows
+    data = pd.read_csv(os.path.join("data", "wine_quality.csv"))
+    _, test = train_test_split(data, random_state=seed)
+    X_test = test[list(TRAINING_COLUMNS)].to_numpy(dtype=np.float32)
+
+    import mlflow.sklearn
+    model = mlflow.sklearn.load_model("models/wine_model/sklearn")
+
+    best, model_bytes, report = optimize(
+        model, X_test, settings["tolerance"], settings["batch_sizes"], settings["repeats"]
+    )
+    for name, entry in report["variants"].items():
+        status = entry.get("skipped") or f"{entry['score_us']:.2f} us/row, max error {entry['max_error']:.2e}"
+        print(f"  {name:20s} {status}")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(os.path.join(OUTPUT_DIR, "model.onnx"), "wb") as f:
+        f.write(model_bytes)
+    with open(os.path.join(OUTPUT_DIR, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Selected '{best}', saved to {OUTPUT_DIR}/model.onnx")
+
+    if os.path.isdir(os.path.dirname(TRITON_MODEL_PATH)):
+        shutil.copy(os.path.join(OUTPUT_DIR, "model.onnx"), TRITON_MODEL_PATH)
+        print(f"Updated {TRITON_MODEL_PATH}")
+        update_triton_repo(all_params, model_bytes)
+
+
+def update_triton_repo(all_params, model_bytes):
+    # train.py tuned and logged the repository for the baseline export; redo both for the served model
+    triton_settings = all_params.get("triton") or {}
+    if triton_settings.get("enabled", True):
+        try:
+            generate_triton_configs(TRITON_REPO, model_bytes, triton_settings)
+        except Exception as e:
+            print(f"Warning: Triton profiling failed, keeping the previous configs: {e}")
+
+    if not os.path.exists("run_info.json"):
+        return
+    with open("run_info.json") as f:
+        run_id = json.load(f)["run_id"]
+    try:
+        uri = relog_artifacts(run_id, TRITON_REPO, "triton_repo", all_params["train"].get("tracking"))
+        print(f"Re-logged {TRITON_REPO} to run {run_id} at {uri}")
+    except Exception as e:
+        print(f"Warning: failed to re-log {TRITON_REPO}, the MLflow copy is the baseline export: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Search strategies for the training sweep (params.yaml train.search).
+
+    grid       every combination of search_space (the default)
+    random     `max_trials` combinations sampled from search_space; a value
+               may also be a {low, high, log, int} range instead of a list
+    halving    successive halving: all candidates start at `min_fraction`
+               of the budget, the best 1/`eta` move up a rung with `eta`
+               times the budget until the full budget is reached
+    hyperband  several halving brackets that trade the number of sampled
+               candidates against their starting budget
+
+The budget is n_estimators for random forests and the share of training
+rows otherwise (see sweep.apply_budget). With `prune_ratio`, candidates
+whose RMSE is worse than prune_ratio * the rung's best are dropped as
+well; for grid/random this adds one cheap screening rung at `min_fraction`.
+Only full-budget results compete for the best model.
+"""
+import itertools
+import math
+import numpy as np
+
+STRATEGIES = ("grid", "random", "halving", "hyperband")
+
+DEFAULTS = {
+    "strategy": "grid",
+    "max_trials": 20,
+    "eta": 3,
+    "min_fraction": 1 / 9,
+    "prune_ratio": None,
+    "resource": "auto",
+}
+
+
+def is_range(spec):
+    return isinstance(spec, dict) and "low" in spec and "high" in spec
+
+
+def expand_grid(space):
+    for name, spec in space.items():
+        if is_range(spec):
+            raise ValueError(f"'{name}' is a range; ranges are only supported by random/halving/hyperband search")
+    keys, values = zip(*space.items())
+    return [dict(zip(keys, v)) for v in itertools.product(*values)]
+
+
+def sample_params(space, rng):
+    params = {}
+    for name, spec in space.items():
+        if is_range(spec):
+            low, high = spec["low"], spec["high"]
+            if spec.get("log"):
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            else:
+                value = float(rng.uniform(low, high))
+            params[name] = int(round(value)) if spec.get("int") else value
+        else:
+            params[name] = spec[rng.integers(len(spec))]
+    return params
+
+
+def sample_candidates(spaces, n, rng):
+    """n distinct (algo_name, params) candidates across the algorithms' spaces.
+
+    Pure list spaces are sampled from their grid without replacement, so
+    asking for more than the grid holds returns the whole grid.
+    """
+    if all(not is_range(spec) for space in spaces.values() for spec in space.values()):
+        grid = [(algo, params) for algo, space in spaces.items() for params in expand_grid(space)]
+        picks = rng.permutation(len(grid))[:n]
+        return [grid[i] for i in picks]
+
+    algos = list(spaces)
+    candidates, seen = [], set()
+    for _ in range(n * 20):
+        if len(candidates) == n:
+            break
+        algo = algos[rng.integers(len(algos))]
+        params = sample_params(spaces[algo], rng)
+        key = (algo, tuple(sorted(params.items())))
+        if key not in seen:
+            seen.add(key)
+            candidates.append((algo, params))
+    return candidates
+
+
+def budget_steps(min_fraction, eta, rounding):
+    # Number of eta-fold budget increases from min_fraction to 1, tolerating 0.111 for 1/9
+    return max(0, rounding(round(math.log(1 / min_fraction, eta), 2)))
+
+
+def select(results, keep, prune_ratio=None):
+    # Best `keep` results by RMSE, minus those far behind the rung's best
+    ranked = sorted(results, key=lambda r: r["rmse"])
+    if prune_ratio:
+        ranked = [r for r in ranked if r["rmse"] <= ranked[0]["rmse"] * prune_ratio]
+    return ranked[:max(1, keep)]
+
+
+def successive_halving(executor, candidates, min_fraction, eta, prune_ratio=None, bracket=0):
+    """Runs candidates through rungs of growing budget, yielding every result.
+
+    Each result gets "rung" and "bracket" keys; the last rung runs at the
+    full budget (fraction 1.0).
+    """
+    rungs = budget_steps(min_fraction, eta, math.ceil)
+    survivors = candidates
+    for rung in range(rungs + 1):
+        fraction = 1.0 if rung == rungs else min_fraction * eta ** rung
+        results = []
+        for result in executor.run(survivors, fraction):
+            result.update(rung=rung, bracket=bracket)
+            results.append(result)
+            yield result
+        if fraction >= 1.0:
+            return
+        chosen = select(results, math.ceil(len(results) / eta), prune_ratio)
+        survivors = [(r["algorithm"], r["params"]) for r in chosen]
+
+
+def screened(executor, candidates, min_fraction, prune_ratio):
+    # One cheap rung that only drops clearly bad candidates, then full budget
+    results = []
+    for result in executor.run(candidates, min_fraction):
+        result.update(rung=0, bracket=0)
+        results.append(result)
+        yield result
+    survivors = [(r["algorithm"], r["params"]) for r in select(results, len(results), prune_ratio)]
+    for result in executor.run(survivors, 1.0):
+        result.update(rung=1, bracket=0)
+        yield result
+
+
+def run_search(spaces, settings, executor, seed=42):
+    """Yields every trial result of the configured strategy.
+
+    `spaces` maps algorithm name -> search_space, `settings` is
+    params.yaml's train.search (missing keys fall back to DEFAULTS).
+    """
+    settings = {**DEFAULTS, **(settings or {})}
+    strategy = settings["strategy"]
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy '{strategy}', use one of {list(STRATEGIES)}")
+    rng = np.random.default_rng(seed)
+    eta, min_fraction, prune_ratio = settings["eta"], settings["min_fraction"], settings["prune_ratio"]
+
+    if strategy in ("grid", "random"):
+        if strategy == "grid":
+            candidates = [(algo, params) for algo, space in spaces.items() for params in expand_grid(space)]
+        else:
+            candidates = sample_candidates(spaces, settings["max_trials"], rng)
+        if prune_ratio:
+            yield from screened(executor, candidates, min_fraction, prune_ratio)
+        else:
+            for result in executor.run(candidates):
+                result.update(rung=0, bracket=0)
+                yield result
+
+    elif strategy == "halving":
+        candidates = sample_candidates(spaces, settings["max_trials"], rng)
+        yield from successive_halving(executor, candidates, min_fraction, eta, prune_ratio)
+
+    else:
+        # Hyperband: bracket s starts n_s candidates at eta^-s of the budget
+        s_max = budget_steps(min_fraction, eta, math.floor)
+        for s in range(s_max, -1, -1):
+            n = math.ceil((s_max + 1) / (s + 1) * eta ** s)
+            candidates = sample_candidates(spaces, n, rng)
+            yield from successive_halving(executor, candidates, eta ** -s, eta, prune_ratio, bracket=s)
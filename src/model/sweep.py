@@ -0,0 +1,170 @@
+"""Parallel hyperparameter sweep for train.py.
+
+The train/test matrices are written once to .npy files and every worker
+process maps them read-only (np.load(mmap_mode="r")) from its initializer,
+so no DataFrame is pickled per task. Workers only fit and evaluate; the
+parent receives (candidate, metrics, fitted model) results as they finish
+and does all MLflow logging itself.
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import ElasticNet
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
+from src.model.features import TRAINING_COLUMNS
+
+SHARED_ARRAYS = ("train_x", "train_y", "test_x", "test_y")
+
+# Set in each worker by _init_worker (and in the parent for inline runs)
+_data = None
+
+
+def eval_metrics(actual, pred):
+    rmse = np.sqrt(mean_squared_error(actual, pred))
+    mae = mean_absolute_error(actual, pred)
+    r2 = r2_score(actual, pred)
+    return rmse, mae, r2
+
+
+def get_model(algo_name, params, seed):
+    if algo_name == "elastic_net":
+        return ElasticNet(
+            alpha=params["alpha"],
+            l1_ratio=params["l1_ratio"],
+            random_state=seed
+        )
+    elif algo_name == "random_forest":
+        return RandomForestRegressor(
+            n_estimators=params["n_estimators"],
+            max_depth=params["max_depth"],
+            random_state=seed
+        )
+    else:
+        raise ValueError(f"Unknown algorithm: {algo_name}")
+
+
+def resolve_workers(workers):
+    # 0 or unset = one worker per core
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+
+def share_arrays(arrays, directory):
+    # Writes each array once; returns name -> path for the workers to map
+    paths = {}
+    for name, array in arrays.items():
+        paths[name] = os.path.join(directory, f"{name}.npy")
+        np.save(paths[name], np.ascontiguousarray(array))
+    return paths
+
+
+def _init_worker(paths):
+    global _data
+    _data = {name: np.load(path, mmap_mode="r") for name, path in paths.items()}
+
+
+def _frame(X):
+    # Named columns so fitted models keep feature_names_in_ (checked at serving time)
+    return pd.DataFrame(X, columns=list(TRAINING_COLUMNS), copy=False)
+
+
+def apply_budget(algo_name, params, n_rows, fraction=1.0, resource="auto"):
+    """Scales a candidate down to `fraction` of its full training budget.
+
+    Random forests shrink n_estimators (resource "auto" or "n_estimators");
+    everything else trains on the first `fraction` of the (already
+    shuffled) training rows. Returns (params, rows to train on).
+    """
+    if fraction >= 1.0:
+        return params, n_rows
+    if algo_name == "random_forest" and resource in ("auto", "n_estimators"):
+        return dict(params, n_estimators=max(1, round(params["n_estimators"] * fraction))), n_rows
+    return params, max(10, int(n_rows * fraction))
+
+
+def fit_candidate(algo_name, params, seed, fraction=1.0, resource="auto"):
+    """Fits one candidate on the shared data, returns its result dict."""
+    start = time.perf_counter()
+    fit_params, rows = apply_budget(algo_name, params, len(_data["train_x"]), fraction, resource)
+    model = get_model(algo_name, fit_params, seed)
+    model.fit(_frame(_data["train_x"][:rows]), np.asarray(_data["train_y"][:rows]))
+    rmse, mae, r2 = eval_metrics(_data["test_y"], model.predict(_frame(_data["test_x"])))
+    return {
+        "algorithm": algo_name,
+        "params": params,
+        "fraction": fraction,
+        "rmse": float(rmse),
+        "mae": float(mae),
+        "r2": float(r2),
+        "fit_seconds": time.perf_counter() - start,
+        "model": model,
+    }
+
+
+class SweepExecutor:
+    """Evaluates batches of candidates, in-process or on a process pool.
+
+    With one worker everything runs in this process. Otherwise the shared
+    arrays are written once and a pool of `workers` processes maps them;
+    the pool is reused for every `run` call (e.g. successive-halving rungs)
+    until the executor is closed.
+    """
+
+    def __init__(self, arrays, seed, workers=1, resource="auto"):
+        self.arrays = arrays
+        self.seed = seed
+        self.workers = resolve_workers(workers)
+        self.resource = resource
+        self._directory = None
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start_pool(self):
+        self._directory = tempfile.TemporaryDirectory(prefix="sweep-")
+        paths = share_arrays(self.arrays, self._directory.name)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(paths,))
+
+    def run(self, candidates, fraction=1.0):
+        # Yields a result per (algo_name, params) candidate, in completion order
+        global _data
+        if self.workers == 1 or (len(candidates) == 1 and self._pool is None):
+            _data = self.arrays
+            try:
+                for algo_name, params in candidates:
+                    yield fit_candidate(algo_name, params, self.seed, fraction, self.resource)
+            finally:
+                _data = None
+            return
+
+        if self._pool is None:
+            self._start_pool()
+        futures = [
+            self._pool.submit(fit_candidate, algo_name, params, self.seed, fraction, self.resource)
+            for algo_name, params in candidates
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+
+
+def run_sweep(candidates, arrays, seed, workers=1):
+    """Evaluates (algo_name, params) candidates at full budget, yielding results as they finish."""
+    workers = min(resolve_workers(workers), max(1, len(candidates)))
+    with SweepExecutor(arrays, seed, workers) as executor:
+        yield from executor.run(candidates)
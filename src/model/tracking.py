@@ -0,0 +1,302 @@
+"""MLflow tracking modes for train.py (params.yaml train.tracking).
+
+    direct    log straight to the remote tracker (DagsHub) as before
+    deferred  log to a local file store during the sweep and upload each
+              finished run to the remote tracker from a background thread
+              (upload: background) or in one pass at the end (upload: sync)
+    offline   log to the local file store only; upload later with
+              `python src/model/tracking.py sync`, or never (air-gapped)
+
+Uploads copy params, metric histories, tags and artifacts with log_batch
+and remember what was sent in <local store>/sync_state.json, so a run can
+be synced again after more artifacts were logged and an interrupted sync
+can be resumed.
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+from urllib.parse import urlparse, unquote
+import mlflow
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+MODES = ("direct", "deferred", "offline")
+
+DAGSHUB_REPO_OWNER = "hemantku1990"
+DAGSHUB_REPO_NAME = "my-first-repo"
+
+# log_batch limits of the MLflow REST API
+MAX_PARAMS_PER_BATCH = 100
+MAX_ENTRIES_PER_BATCH = 1000
+
+
+def init_remote():
+    """Points MLflow at the remote tracker and returns its URI.
+
+    MLFLOW_TRACKING_URI wins when set; otherwise DagsHub is initialized,
+    which also exports the credentials MLflow needs.
+    """
+    remote = os.getenv("MLFLOW_TRACKING_URI")
+    if remote:
+        mlflow.set_tracking_uri(remote)
+        return remote
+    # Imported here: dagshub is slow to import and not needed offline
+    import dagshub
+    dagshub.init(repo_owner=DAGSHUB_REPO_OWNER, repo_name=DAGSHUB_REPO_NAME, mlflow=True)
+    return mlflow.get_tracking_uri()
+
+
+def local_path(uri):
+    # file: URI (or plain path) -> filesystem path
+    parsed = urlparse(uri)
+    return unquote(parsed.path) if parsed.scheme == "file" else uri
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class RunSyncer:
+    """Copies runs from a local file store to a remote tracking server."""
+
+    def __init__(self, local_uri, remote_uri):
+        self.remote_uri = remote_uri
+        self.local = MlflowClient(tracking_uri=local_uri)
+        self.remote = MlflowClient(tracking_uri=remote_uri)
+        self.state_path = os.path.join(local_path(local_uri), "sync_state.json")
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        self._experiments = {}
+        self._lock = threading.Lock()
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def _remote_experiment(self, local_experiment_id):
+        if local_experiment_id not in self._experiments:
+            name = self.local.get_experiment(local_experiment_id).name
+            experiment = self.remote.get_experiment_by_name(name)
+            self._experiments[local_experiment_id] = (
+                experiment.experiment_id if experiment else self.remote.create_experiment(name)
+            )
+        return self._experiments[local_experiment_id]
+
+    def sync_run(self, run_id):
+        """Uploads one local run (or what is new in it), returns the remote run id."""
+        with self._lock:
+            run = self.local.get_run(run_id)
+            entry = self.state.get(run_id)
+            if entry is None:
+                remote_run = self.remote.create_run(
+                    self._remote_experiment(run.info.experiment_id),
+                    start_time=run.info.start_time,
+                    run_name=run.info.run_name,
+                )
+                entry = {"remote_run_id": remote_run.info.run_id, "data": False, "artifacts": []}
+                self.state[run_id] = entry
+                self._save_state()
+            remote_id = entry["remote_run_id"]
+
+            if not entry["data"]:
+                self._upload_data(run, remote_id)
+                entry["data"] = True
+                self._save_state()
+
+            artifact_dir = local_path(run.info.artifact_uri)
+            if os.path.isdir(artifact_dir):
+                for name in sorted(os.listdir(artifact_dir)):
+                    if name in entry["artifacts"]:
+                        continue
+                    path = os.path.join(artifact_dir, name)
+                    if os.path.isdir(path):
+                        self.remote.log_artifacts(remote_id, path, artifact_path=name)
+                    else:
+                        self.remote.log_artifact(remote_id, path)
+                    entry["artifacts"].append(name)
+                    self._save_state()
+
+            if run.info.end_time:
+                self.remote.set_terminated(remote_id, run.info.status, run.info.end_time)
+            return remote_id
+
+    def _upload_data(self, run, remote_id):
+        params = [Param(k, v) for k, v in run.data.params.items()]
+        tags = [RunTag(k, v) for k, v in run.data.tags.items() if k != "mlflow.runName"]
+        metrics = [
+            Metric(m.key, m.value, m.timestamp, m.step)
+            for key in run.data.metrics
+            for m in self.local.get_metric_history(run.info.run_id, key)
+        ]
+        for batch in _chunks(params, MAX_PARAMS_PER_BATCH):
+            self.remote.log_batch(remote_id, params=batch)
+        for batch in _chunks(tags + metrics, MAX_ENTRIES_PER_BATCH):
+            self.remote.log_batch(
+                remote_id,
+                tags=[e for e in batch if isinstance(e, RunTag)],
+                metrics=[e for e in batch if isinstance(e, Metric)]
+            )
+
+    def sync_all(self):
+        # Every run in every local experiment; returns local -> remote run ids
+        mapping = {}
+        for experiment in self.local.search_experiments():
+            for run in self.local.search_runs([experiment.experiment_id], max_results=50_000):
+                mapping[run.info.run_id] = self.sync_run(run.info.run_id)
+        return mapping
+
+    def remote_artifact_uri(self, remote_id, path=""):
+        uri = self.remote.get_run(remote_id).info.artifact_uri
+        return f"{uri}/{path}" if path else uri
+
+
+class Tracker:
+    """Sets up the tracking URI for a mode and uploads deferred runs.
+
+    train.py calls `start()` before logging, `run_finished(run_id)` after
+    each run is complete (again when more artifacts were added) and
+    `close()` at the end, which returns local -> remote run ids for runs
+    that were uploaded.
+    """
+
+    def __init__(self, mode="direct", local_uri="file:./mlruns", upload="background"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown tracking mode '{mode}', use one of {list(MODES)}")
+        self.mode = mode
+        self.local_uri = local_uri
+        self.upload = upload
+        self.syncer = None
+        self.mapping = {}
+        self._pending = []
+        self._queue = None
+        self._thread = None
+
+    @classmethod
+    def from_params(cls, settings):
+        settings = dict(settings or {})
+        mode = os.getenv("TRACKING_MODE") or settings.get("mode", "direct")
+        return cls(mode, settings.get("local_uri", "file:./mlruns"), settings.get("upload", "background"))
+
+    def start(self):
+        if self.mode == "direct":
+            init_remote()
+            return
+        if self.mode == "deferred":
+            # Resolve the remote (and its credentials) before switching to the local store
+            self.syncer = RunSyncer(self.local_uri, init_remote())
+            if self.upload == "background":
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._upload_loop, name="mlflow-upload", daemon=True)
+                self._thread.start()
+        mlflow.set_tracking_uri(self.local_uri)
+
+    def _sync(self, run_id):
+        try:
+            self.mapping[run_id] = self.syncer.sync_run(run_id)
+        except Exception as e:
+            # The run stays in the local store; `tracking.py sync` can retry
+            print(f"Warning: failed to upload run {run_id}: {e}")
+
+    def _upload_loop(self):
+        while True:
+            run_id = self._queue.get()
+            if run_id is None:
+                return
+            self._sync(run_id)
+
+    def run_finished(self, run_id):
+        if self.mode != "deferred":
+            return
+        if self._queue is not None:
+            self._queue.put(run_id)
+        else:
+            self._pending.append(run_id)
+
+    def close(self):
+        if self.mode != "deferred":
+            return self.mapping
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        for run_id in dict.fromkeys(self._pending):
+            self._sync(run_id)
+        self._pending = []
+        return self.mapping
+
+
+def relog_artifacts(run_id, local_dir, artifact_path, settings=None):
+    """Logs `local_dir` again as `artifact_path` of an existing run.
+
+    For stages after train.py that change artifacts it already logged. The
+    run is looked up on the remote tracker (where run_info.json points once
+    uploaded) and then in the local store. A run found locally has the
+    artifact marked as not uploaded, so the next sync sends the new copy.
+    Returns the tracking URI the artifacts went to.
+    """
+    tracker = Tracker.from_params(settings)
+    uris = [] if tracker.mode == "offline" else [init_remote()]
+    uris.append(tracker.local_uri)
+    for uri in uris:
+        client = MlflowClient(tracking_uri=uri)
+        try:
+            client.get_run(run_id)
+        except mlflow.exceptions.MlflowException:
+            continue
+        client.log_artifacts(run_id, local_dir, artifact_path=artifact_path)
+        if uri == tracker.local_uri:
+            _mark_not_uploaded(uri, run_id, artifact_path)
+        return uri
+    raise LookupError(f"Run {run_id} not found in {uris}")
+
+
+def _mark_not_uploaded(local_uri, run_id, artifact_path):
+    state_path = os.path.join(local_path(local_uri), "sync_state.json")
+    if not os.path.exists(state_path):
+        return
+    with open(state_path) as f:
+        state = json.load(f)
+    entry = state.get(run_id)
+    if entry and artifact_path in entry["artifacts"]:
+        entry["artifacts"].remove(artifact_path)
+        with open(state_path, "w") as f:
+            json.dump(state, f, indent=2)
+
+
+def rewrite_run_info(path, syncer, mapping):
+    # Point run_info.json at the uploaded copy of its run
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        info = json.load(f)
+    remote_id = mapping.get(info.get("run_id"))
+    if remote_id:
+        info["run_id"] = remote_id
+        info["artifact_uri"] = syncer.remote_artifact_uri(remote_id, "triton_repo")
+        with open(path, "w") as f:
+            json.dump(info, f)
+        print(f"Updated {path} to remote run {remote_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload runs logged in offline/deferred mode")
+    parser.add_argument("command", choices=["sync"])
+    parser.add_argument("--local-uri", default="file:./mlruns", help="Local MLflow file store")
+    parser.add_argument("--run-info", default="run_info.json", help="run_info.json to repoint at the remote run")
+    args = parser.parse_args()
+
+    syncer = RunSyncer(args.local_uri, init_remote())
+    mapping = syncer.sync_all()
+    print(f"Synced {len(mapping)} runs to {syncer.remote_uri}")
+    rewrite_run_info(args.run_info, syncer, mapping)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,62 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import ElasticNet
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import mlflow
 import mlflow.sklearn
 import mlflow.onnx
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
 import sys
 import os
 import argparse
-import dagshub
 import yaml
-import itertools
 import shutil
+import pickle
+import time
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType
 
-def eval_metrics(actual, pred):
-    rmse = np.sqrt(mean_squared_error(actual, pred))
-    mae = mean_absolute_error(actual, pred)
-    r2 = r2_score(actual, pred)
-    return rmse, mae, r2
-
-def get_model(algo_name, params, seed):
-    if algo_name == "elastic_net":
-        return ElasticNet(
-            alpha=params["alpha"], 
-            l1_ratio=params["l1_ratio"], 
-            random_state=seed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.model.features import TRAINING_COLUMNS, NUM_FEATURES  # noqa: E402
+from src.model.sweep import resolve_workers, SweepExecutor  # noqa: E402
+from src.model.search import run_search  # noqa: E402
+from src.model.tracking import Tracker, rewrite_run_info  # noqa: E402
+from src.model.triton_config import generate as generate_triton_configs  # noqa: E402
+
+def trial_name(algo_name, run_params):
+    return f"{algo_name}_{'_'.join([f'{k}{v}' for k,v in run_params.items()])}"
+
+def log_trial(client, result):
+    # One run per trial: params and metrics in a single log_batch call, then the model
+    run_name = trial_name(result["algorithm"], result["params"])
+    if result["fraction"] < 1.0:
+        run_name += f"_b{result['fraction']:.2f}"
+    with mlflow.start_run(run_name=run_name) as run:
+        timestamp = int(time.time() * 1000)
+        client.log_batch(
+            run.info.run_id,
+            params=[Param(k, str(v)) for k, v in result["params"].items()] + [
+                Param("algorithm", result["algorithm"]),
+                Param("budget_fraction", str(round(result["fraction"], 4))),
+                Param("rung", str(result.get("rung", 0))),
+                Param("bracket", str(result.get("bracket", 0))),
+            ],
+            metrics=[Metric(k, result[k], timestamp, 0) for k in ("rmse", "r2", "mae", "fit_seconds")]
         )
-    elif algo_name == "random_forest":
-        return RandomForestRegressor(
-            n_estimators=params["n_estimators"], 
-            max_depth=params["max_depth"], 
-            random_state=seed
-        )
-    else:
-        raise ValueError(f"Unknown algorithm: {algo_name}")
+        # Reduced-budget fits are only stepping stones; keep their metrics, not the model
+        if result["fraction"] >= 1.0:
+            mlflow.sklearn.log_model(result["model"], "model")
+    return run.info.run_id
 
 def train_optimization():
-    # Initialize Dagshub
-    dagshub.init(repo_owner='hemantku1990', repo_name='my-first-repo', mlflow=True)
-    
     # Load params
     with open("params.yaml", "r") as f:
-        params = yaml.safe_load(f)["train"]
+        all_params = yaml.safe_load(f)
+    params = all_params["train"]
+
+    # direct: DagsHub as before; deferred/offline: local file store first
+    tracker = Tracker.from_params(params.get("tracking"))
+    tracker.start()
 
     seed = params.get("seed", 42)
     experiment_name = params.get("experiment_name", "Default_Experiment")
@@ -64,59 +75,47 @@ def train_optimization():
     # Split data
     train, test = train_test_split(data, random_state=seed)
 
-    train_x = train.drop(["target"], axis=1)
-    test_x = test.drop(["target"], axis=1)
-    train_y = train[["target"]]
-    test_y = test[["target"]]
+    # Plain float arrays: workers map these instead of receiving DataFrames
+    arrays = {
+        "train_x": train[list(TRAINING_COLUMNS)].to_numpy(dtype=np.float64),
+        "train_y": train["target"].to_numpy(dtype=np.float64),
+        "test_x": test[list(TRAINING_COLUMNS)].to_numpy(dtype=np.float64),
+        "test_y": test["target"].to_numpy(dtype=np.float64),
+    }
 
     # MLflow tracking
-    print(f"Logging to MLflow at {mlflow.get_tracking_uri()}")
+    print(f"Logging to MLflow at {mlflow.get_tracking_uri()} ({tracker.mode} mode)")
+    client = MlflowClient()
 
     best_run_id = None
     best_rmse = float("inf")
     best_model = None
     best_algo_name = ""
 
-    # Iterate over enabled algorithms
-    for algo_name in params["enabled_algorithms"]:
-        search_space = params["search_space"][algo_name]
-        
-        # Generate parameter grid
-        keys, values = zip(*search_space.items())
-        param_combinations = [dict(zip(keys, v)) for v in itertools.product(*values)]
-
-        for run_params in param_combinations:
-            run_name = f"{algo_name}_{'_'.join([f'{k}{v}' for k,v in run_params.items()])}"
-            
-            with mlflow.start_run(run_name=run_name) as run:
-                print(f"Training {run_name}...")
-                
-                model = get_model(algo_name, run_params, seed)
-                model.fit(train_x, train_y)
-
-                predicted_qualities = model.predict(test_x)
-                (rmse, mae, r2) = eval_metrics(test_y, predicted_qualities)
-
-                print(f"  RMSE: {rmse}")
-                print(f"  MAE: {mae}")
-                print(f"  R2: {r2}")
-
-                # Log params and metrics
-                mlflow.log_params(run_params)
-                mlflow.log_param("algorithm", algo_name)
-                mlflow.log_metric("rmse", rmse)
-                mlflow.log_metric("r2", r2)
-                mlflow.log_metric("mae", mae)
-
-                mlflow.sklearn.log_model(model, "model")
-                
-                # Check if best
-                if rmse < best_rmse:
-                    best_rmse = rmse
-                    best_run_id = run.info.run_id
-                    best_model = model
-                    best_algo_name = algo_name
-                    print(f"  -> New best model found!")
+    spaces = {algo_name: params["search_space"][algo_name] for algo_name in params["enabled_algorithms"]}
+    search = params.get("search") or {}
+    workers = resolve_workers(params.get("workers", 1))
+    print(f"Searching with strategy '{search.get('strategy', 'grid')}' on {workers} worker(s)")
+
+    # Workers fit and evaluate; logging happens here, as each result arrives
+    with SweepExecutor(arrays, seed, workers, resource=search.get("resource", "auto")) as executor:
+        for result in run_search(spaces, search, executor, seed):
+            print(f"Trained {trial_name(result['algorithm'], result['params'])} "
+                  f"at {result['fraction']:.0%} budget in {result['fit_seconds']:.2f}s")
+            print(f"  RMSE: {result['rmse']}")
+            print(f"  MAE: {result['mae']}")
+            print(f"  R2: {result['r2']}")
+
+            run_id = log_trial(client, result)
+            tracker.run_finished(run_id)
+
+            # Only fully trained candidates can become the exported model
+            if result["fraction"] >= 1.0 and result["rmse"] < best_rmse:
+                best_rmse = result["rmse"]
+                best_run_id = run_id
+                best_model = result["model"]
+                best_algo_name = result["algorithm"]
+                print(f"  -> New best model found!")
 
     if best_run_id:
         print(f"\nOptimization Complete. Best Run ID: {best_run_id} with RMSE: {best_rmse}")
@@ -141,7 +140,7 @@ def train_optimization():
         
         # Convert & Save ONNX
         try:
-            initial_type = [('float_input', FloatTensorType([None, 13]))]
+            initial_type = [('float_input', FloatTensorType([None, NUM_FEATURES]))]
             onx = convert_sklearn(best_model, initial_types=initial_type)
             
             onnx_path = os.path.join(export_path, "model.onnx")
@@ -149,6 +148,14 @@ def train_optimization():
                 f.write(onx.SerializeToString())
                 
             print(f"Triton-ready model saved to {export_path}")
+
+            # Batching and instance settings measured on this CPU
+            triton_settings = all_params.get("triton") or {}
+            if triton_settings.get("enabled", True):
+                try:
+                    generate_triton_configs(triton_repo_path, onx.SerializeToString(), triton_settings)
+                except Exception as e:
+                    print(f"Warning: Triton profiling failed, keeping the template configs: {e}")
             
             # Log the entire Triton repository as an artifact
             with mlflow.start_run(run_id=best_run_id):
@@ -166,6 +173,9 @@ def train_optimization():
             with open("run_info.json", "w") as f:
                 json.dump({"run_id": best_run_id, "artifact_uri": artifact_uri, "best_rmse": best_rmse}, f)
 
+            # Deferred mode uploads the new triton_repo artifacts too
+            tracker.run_finished(best_run_id)
+
         except Exception as e:
             print(f"Warning: Failed to convert {best_algo_name} to ONNX: {e}")
             
@@ -174,9 +184,25 @@ def train_optimization():
             shutil.rmtree("models/wine_model")
         os.makedirs("models/wine_model", exist_ok=True)
         mlflow.sklearn.save_model(best_model, "models/wine_model/sklearn")
+        # Pre-resolved copy the app unpickles directly at startup, skipping MLflow
+        with open("models/wine_model/model.pkl", "wb") as f:
+            pickle.dump(best_model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # ONNX copy for the app's embedded ONNX Runtime mode (SERVING_MODE=onnx)
+        onnx_export = os.path.join(export_path, "model.onnx")
+        if os.path.exists(onnx_export):
+            shutil.copy(onnx_export, "models/wine_model/model.onnx")
         
     else:
         print("No models were trained.")
 
+    # Wait for deferred uploads and point run_info.json at the remote run
+    mapping = tracker.close()
+    if mapping:
+        print(f"Uploaded {len(mapping)} runs to the remote tracker")
+        rewrite_run_info("run_info.json", tracker.syncer, mapping)
+    elif tracker.mode == "offline":
+        print(f"Runs kept in {tracker.local_uri}; upload with: python src/model/tracking.py sync")
+
 if __name__ == "__main__":
     train_optimization()
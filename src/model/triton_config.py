@@ -0,0 +1,232 @@
+"""Triton config generation from an offline onnxruntime profiling sweep.
+
+The exported model is loaded into local ONNX Runtime sessions the way
+Triton's onnxruntime backend would run them on this CPU: `instances`
+sessions with `threads` intra-op threads each, all driven concurrently
+with batches of each candidate size. From the measured throughput and
+latency it picks
+
+    max_batch_size        smallest batch reaching `saturation` of the peak
+                          throughput with p95 latency within the budget,
+                          but never below the template's max_batch_size
+                          (the app's MAX_BATCH_SIZE chunks and warm-up
+                          batches, 8 by default, must still be accepted)
+    instance_group count  the instance count (and threads per instance)
+                          with the best throughput at the saturating batch
+    dynamic_batching      preferred sizes max/2 and max, and a queue delay
+                          of half the p95 latency of the saturating batch
+
+and writes them into the copied repository: the wine_model config gets
+dynamic_batching, instance_group and thread parameters. The other configs
+only get the same max_batch_size (an ensemble cannot batch more than its
+steps); the Python models keep their hand-tuned dynamic_batching, which
+these ONNX Runtime timings say nothing about.
+
+    python src/model/triton_config.py --repo models/triton_repository
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import numpy as np
+import onnxruntime as ort
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.model.features import NUM_FEATURES  # noqa: E402
+
+MODEL_NAME = "wine_model"
+# Hand-written configs train.py copies into models/triton_repository
+TEMPLATE_REPO = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "model_repository")
+INPUT_NAME = "float_input"
+
+DEFAULTS = {
+    "batch_sizes": [1, 2, 4, 8, 16, 32, 64],
+    "instance_counts": [1, 2, 4],
+    "threads_per_instance": [1, 2],
+    "duration_seconds": 0.2,
+    "latency_budget_ms": 10.0,
+    "saturation": 0.9,
+    "cpu_accelerator": None,
+}
+
+
+def make_session(model_bytes, threads):
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(model_bytes, options, providers=["CPUExecutionProvider"])
+
+
+def measure(sessions, batch_size, duration):
+    """Drives every session from its own thread for `duration` seconds.
+
+    ONNX Runtime releases the GIL while running, so the sessions execute
+    in parallel like Triton model instances. Returns rows/s and p95 latency.
+    """
+    X = np.random.default_rng(0).normal(size=(batch_size, NUM_FEATURES)).astype(np.float32)
+    latencies = [[] for _ in sessions]
+    deadline = time.perf_counter() + duration
+
+    def drive(sess, samples):
+        sess.run(None, {INPUT_NAME: X})
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            sess.run(None, {INPUT_NAME: X})
+            samples.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=drive, args=(s, l)) for s, l in zip(sessions, latencies)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    samples = np.concatenate([np.asarray(l) for l in latencies if l]) if any(latencies) else np.array([elapsed])
+    return {
+        "throughput": len(samples) * batch_size / elapsed,
+        "p95_ms": float(np.percentile(samples, 95)) * 1000,
+    }
+
+
+def profile(model_bytes, settings):
+    """Runs the sweep; returns one result dict per (instances, threads, batch)."""
+    cores = os.cpu_count() or 1
+    results = []
+    for threads in settings["threads_per_instance"]:
+        for instances in settings["instance_counts"]:
+            if instances * threads > cores:
+                continue
+            sessions = [make_session(model_bytes, threads) for _ in range(instances)]
+            for batch_size in settings["batch_sizes"]:
+                stats = measure(sessions, batch_size, settings["duration_seconds"])
+                results.append({"instances": instances, "threads": threads, "batch_size": batch_size, **stats})
+    if not results:
+        raise RuntimeError("No instance/thread combination fits on this CPU")
+    return results
+
+
+def choose(results, settings, min_batch_size=1):
+    # Only configurations that meet the latency budget are eligible
+    budget = settings["latency_budget_ms"]
+    eligible = [r for r in results if r["p95_ms"] <= budget] or [min(results, key=lambda r: r["p95_ms"])]
+    peak = max(r["throughput"] for r in eligible)
+
+    saturating = min(r["batch_size"] for r in eligible if r["throughput"] >= settings["saturation"] * peak)
+    best = max((r for r in eligible if r["batch_size"] == saturating), key=lambda r: r["throughput"])
+    # Clients (the app's chunks and warm-up) send batches up to the template size
+    batch_size = max(saturating, min_batch_size)
+    delay_us = max(50, int(best["p95_ms"] * 1000 / 2))
+    preferred = sorted({max(1, batch_size // 2), batch_size})
+    return {
+        "max_batch_size": batch_size,
+        "preferred_batch_size": preferred,
+        "max_queue_delay_microseconds": delay_us,
+        "instance_count": best["instances"],
+        "intra_op_thread_count": best["threads"],
+        "expected_throughput": round(best["throughput"]),
+        "expected_p95_ms": round(best["p95_ms"], 3),
+    }
+
+
+def dynamic_batching_block(chosen):
+    preferred = ", ".join(str(b) for b in chosen["preferred_batch_size"])
+    return (
+        "dynamic_batching {\n"
+        f"  preferred_batch_size: [ {preferred} ]\n"
+        f"  max_queue_delay_microseconds: {chosen['max_queue_delay_microseconds']}\n"
+        "}"
+    )
+
+
+def model_tuning_block(chosen, cpu_accelerator=None):
+    lines = [
+        "# Generated by src/model/triton_config.py from a local onnxruntime profiling sweep",
+        dynamic_batching_block(chosen),
+        "instance_group [",
+        f"  {{ count: {chosen['instance_count']}, kind: KIND_CPU }}",
+        "]",
+        'parameters { key: "intra_op_thread_count" value: { string_value: "%d" } }' % chosen["intra_op_thread_count"],
+        'parameters { key: "inter_op_thread_count" value: { string_value: "1" } }',
+    ]
+    if cpu_accelerator:
+        lines += [
+            "optimization { execution_accelerators {",
+            f'  cpu_execution_accelerator: [ {{ name: "{cpu_accelerator}" }} ]',
+            "} }",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def rewrite_config(text, chosen, tuning=None):
+    text = re.sub(r"max_batch_size:\s*\d+", f"max_batch_size: {chosen['max_batch_size']}", text, count=1)
+    if tuning is None:
+        return text
+    # Replace earlier generated tuning of the profiled model
+    text = re.sub(r"# Generated by.*\n", "", text)
+    text = re.sub(r"dynamic_batching\s*\{[^}]*\}\n?", "", text)
+    text = re.sub(r"instance_group\s*\[[^\]]*\]\n?", "", text)
+    text = re.sub(r'parameters\s*\{\s*key:\s*"(intra|inter)_op_thread_count"[^\n]*\n', "", text)
+    text = re.sub(r"optimization \{ execution_accelerators \{.*?\} \}\n", "", text, flags=re.S)
+    return re.sub(r"(max_batch_size:\s*\d+\n)", lambda m: m.group(1) + tuning, text, count=1)
+
+
+def template_batch_size(template_repo=TEMPLATE_REPO):
+    # max_batch_size of the profiled model in the template, not in an already generated copy,
+    # so a re-profile can lower what an earlier run chose
+    with open(os.path.join(template_repo, MODEL_NAME, "config.pbtxt")) as f:
+        match = re.search(r"max_batch_size:\s*(\d+)", f.read())
+    return int(match.group(1)) if match else 1
+
+
+def write_configs(repo, chosen, cpu_accelerator=None):
+    for name in sorted(os.listdir(repo)):
+        path = os.path.join(repo, name, "config.pbtxt")
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            text = f.read()
+        tuning = model_tuning_block(chosen, cpu_accelerator) if name == MODEL_NAME else None
+        with open(path, "w") as f:
+            f.write(rewrite_config(text, chosen, tuning))
+
+
+def generate(repo, model_bytes, settings=None, min_batch_size=None):
+    """Profiles the model and rewrites the configs in `repo`; returns the chosen values.
+
+    max_batch_size is floored at `min_batch_size`, by default the template's value.
+    """
+    settings = {**DEFAULTS, **(settings or {})}
+    results = profile(model_bytes, settings)
+    if min_batch_size is None:
+        min_batch_size = template_batch_size()
+    chosen = choose(results, settings, min_batch_size)
+    write_configs(repo, chosen, settings.get("cpu_accelerator"))
+    with open(os.path.join(repo, "profile.json"), "w") as f:
+        json.dump({"chosen": chosen, "settings": settings, "results": results}, f, indent=2)
+    print(
+        f"Triton config: max_batch_size={chosen['max_batch_size']}, "
+        f"instances={chosen['instance_count']}x{chosen['intra_op_thread_count']} threads, "
+        f"queue delay={chosen['max_queue_delay_microseconds']}us "
+        f"(~{chosen['expected_throughput']} rows/s, p95 {chosen['expected_p95_ms']}ms)"
+    )
+    return chosen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Triton configs from a local profiling sweep")
+    parser.add_argument("--repo", default="models/triton_repository", help="Triton model repository to rewrite")
+    args = parser.parse_args()
+
+    with open("params.yaml") as f:
+        settings = (yaml.safe_load(f).get("triton") or {})
+    with open(os.path.join(args.repo, MODEL_NAME, "1", "model.onnx"), "rb") as f:
+        generate(args.repo, f.read(), settings)
+
+
+if __name__ == "__main__":
+    main()
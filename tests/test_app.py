@@ -41,3 +41,168 @@ def test_predict_structure():
         data = response.json()
         assert "prediction" in data
         assert isinstance(data["prediction"], float)
+
+SAMPLE_ROWS = [
+    [13.2, 1.78, 2.14, 11.2, 100.0, 2.65, 2.76, 0.26, 1.28, 4.38, 1.05, 3.4, 1050.0],
+    [12.37, 0.94, 1.36, 10.6, 88.0, 1.98, 0.57, 0.28, 0.42, 1.95, 1.05, 1.82, 520.0],
+    [12.86, 1.35, 2.32, 18.0, 122.0, 1.51, 1.25, 0.21, 0.94, 4.1, 0.76, 1.29, 630.0],
+]
+
+class SumModel:
+    # Stand-in estimator: prediction is the row sum, so ordering bugs show up
+    def predict(self, data):
+        return data.sum(axis=1)
+
+def test_predict_batch_records_and_columns_agree(monkeypatch):
+    from src.app import main
+    from src.app.backends import FEATURE_NAMES, LocalBackend
+    monkeypatch.setattr(main, "backend", LocalBackend(SumModel()))
+
+    instances = [dict(zip(FEATURE_NAMES, row)) for row in SAMPLE_ROWS]
+    columns = {name: [row[i] for row in SAMPLE_ROWS] for i, name in enumerate(FEATURE_NAMES)}
+
+    by_records = client.post("/predict/batch", json={"instances": instances})
+    by_columns = client.post("/predict/batch", json={"columns": columns})
+
+    assert by_records.status_code == 200
+    assert by_columns.status_code == 200
+    assert by_records.json()["predictions"] == by_columns.json()["predictions"]
+    assert by_records.json()["predictions"] == pytest.approx([sum(r) for r in SAMPLE_ROWS], rel=1e-5)
+
+def test_predict_batch_rejects_ragged_columns():
+    from src.app.backends import FEATURE_NAMES
+    columns = {name: [1.0, 2.0] for name in FEATURE_NAMES}
+    columns["proline"] = [1.0]
+    response = client.post("/predict/batch", json={"columns": columns})
+    assert response.status_code == 422
+
+def test_iter_chunks_respects_max_batch_size():
+    import numpy as np
+    from src.app.backends import iter_chunks
+    X = np.zeros((19, 13), dtype=np.float32)
+    sizes = [chunk.shape[0] for chunk in iter_chunks(X, size=8)]
+    assert sizes == [8, 8, 3]
+
+def test_predict_batch_serves_repeated_rows_from_cache(monkeypatch):
+    from src.app import main
+    from src.app.backends import FEATURE_NAMES, LocalBackend
+    from src.app.cache import PredictionCache
+
+    class CountingModel(SumModel):
+        rows = 0
+
+        def predict(self, data):
+            CountingModel.rows += len(data)
+            return super().predict(data)
+
+    monkeypatch.setattr(main, "backend", LocalBackend(CountingModel()))
+    monkeypatch.setattr(main, "cache", PredictionCache())
+    instances = [dict(zip(FEATURE_NAMES, row)) for row in SAMPLE_ROWS]
+
+    first = client.post("/predict/batch", json={"instances": instances})
+    second = client.post("/predict/batch", json={"instances": instances + instances[:1]})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["predictions"] == first.json()["predictions"] + first.json()["predictions"][:1]
+    assert CountingModel.rows == len(SAMPLE_ROWS)
+
+def test_predict_stream_ndjson(monkeypatch):
+    import json
+    from src.app import main
+    from src.app.backends import FEATURE_NAMES, LocalBackend
+    monkeypatch.setattr(main, "backend", LocalBackend(SumModel()))
+
+    body = "\n".join(json.dumps(dict(zip(FEATURE_NAMES, row))) for row in SAMPLE_ROWS)
+    response = client.post("/predict/stream", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    predictions = [json.loads(line)["prediction"] for line in response.text.splitlines()]
+    assert predictions == pytest.approx([sum(r) for r in SAMPLE_ROWS], rel=1e-5)
+
+def test_scored_rows_are_queued_for_drift(monkeypatch):
+    from src.app import main
+    from src.app.backends import FEATURE_NAMES, LocalBackend
+    from src.app.drift_logger import DriftLogger
+
+    class Sink:
+        async def send(self, X):
+            pass
+
+        async def close(self):
+            pass
+
+    logger = DriftLogger(Sink(), batch_size=1000, flush_interval=60)
+    monkeypatch.setattr(main, "backend", LocalBackend(SumModel()))
+    monkeypatch.setattr(main, "drift_logger", logger)
+
+    client.post("/predict", json=dict(zip(FEATURE_NAMES, SAMPLE_ROWS[0])))
+    client.post("/predict/batch", json={"instances": [dict(zip(FEATURE_NAMES, r)) for r in SAMPLE_ROWS]})
+
+    assert logger._queued_rows == 1 + len(SAMPLE_ROWS)
+
+def test_health_ready_after_warm_up(monkeypatch):
+    from src.app import main
+    from src.app.backends import LocalBackend
+    monkeypatch.setattr(main, "backend", LocalBackend(SumModel()))
+    monkeypatch.setattr(main, "warm", False)
+
+    assert client.get("/health/live").status_code == 200
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_health_ready_is_503_without_a_model(monkeypatch):
+    from src.app import main
+    from src.app.backends import LocalBackend
+    monkeypatch.setattr(main, "backend", LocalBackend(None))
+    monkeypatch.setattr(main, "warm", False)
+
+    assert client.get("/health/ready").status_code == 503
+    assert client.get("/health/live").status_code == 200
+
+
+def test_admin_reload_and_rollback(monkeypatch):
+    from src.app import main
+    from src.app.backends import LocalBackend
+    from src.app.registry import ModelRegistry
+
+    current = LocalBackend(SumModel(), version="old")
+    registry = ModelRegistry(
+        current, factory=lambda: LocalBackend(SumModel(), version="new"), on_swap=main.use_backend
+    )
+    monkeypatch.setattr(main, "backend", current)
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(main, "warm", main.warm)
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.post("/admin/reload", headers=headers)
+    assert response.json() == {"reloaded": True, "version": "new", "previous": "old"}
+    assert main.backend.version == "new"
+
+    response = client.post("/admin/rollback", headers=headers)
+    assert response.json() == {"version": "old", "previous": "new"}
+    assert main.backend is current
+
+
+def test_admin_endpoints_disabled_without_token(monkeypatch):
+    from src.app import main
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(main, "registry", None)
+
+    assert client.post("/admin/reload").status_code == 403
+    assert client.post("/admin/rollback", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_batch_row_limit(monkeypatch):
+    from src.app import main
+    monkeypatch.setattr(main, "MAX_BATCH_ROWS", 2)
+    row = dict(zip(main.FEATURE_NAMES, [1.0] * 13))
+
+    response = client.post("/predict/batch", json={"instances": [row] * 3})
+    assert response.status_code == 422
+    assert "/predict/stream" in response.text
+    columns = {name: [1.0] * 3 for name in main.FEATURE_NAMES}
+    assert client.post("/predict/batch", json={"columns": columns}).status_code == 422
@@ -0,0 +1,145 @@
+import asyncio
+import numpy as np
+import pytest
+
+from src.app.backends import SeldonBackend
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeClient:
+    # Echoes the first feature back as the prediction
+    def __init__(self):
+        self.posts = 0
+        self.closed = False
+
+    async def post(self, url, json):
+        self.posts += 1
+        data = json["inputs"][0]["data"]
+        return FakeResponse({"outputs": [{"name": "prediction", "data": data}]})
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_seldon_backend_reuses_one_client_across_requests(monkeypatch):
+    clients = []
+
+    def make_client(self):
+        clients.append(FakeClient())
+        return clients[-1]
+
+    monkeypatch.setattr(SeldonBackend, "_make_client", make_client)
+    X = np.arange(20 * 13, dtype=np.float32).reshape(20, 13)
+
+    async def scenario():
+        backend = SeldonBackend("http://seldon")
+        await backend.start()
+        first = await backend.predict(X)
+        second = await backend.predict(X[:3])
+        await backend.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert len(clients) == 1
+    assert clients[0].posts == 4  # 8 + 8 + 4 rows, then 3 rows
+    assert clients[0].closed
+    assert first == pytest.approx(X[:, 0])
+    assert second == pytest.approx(X[:3, 0])
+
+
+def test_triton_http_request_uses_binary_tensors():
+    from src.app.backends import TritonBackend
+    backend = TritonBackend("localhost:8000", protocol="http")
+    inputs, outputs = backend._build_request(np.ones((2, 13), dtype=np.float32))
+
+    assert len(inputs) == 13
+    assert all(inp._raw_data is not None and inp._data is None for inp in inputs)
+    assert outputs[0]._binary
+
+
+def test_triton_rejects_unknown_protocol():
+    from src.app.backends import TritonBackend
+    with pytest.raises(ValueError):
+        TritonBackend("localhost:8000", protocol="websocket")
+
+
+def test_proxies_call_the_ensembles_in_the_model_repository():
+    import re
+    from src.app.backends import ENSEMBLE_MODELS, SeldonBackend, TritonBackend
+
+    for layout, name in ENSEMBLE_MODELS.items():
+        with open(f"model_repository/{name}/config.pbtxt") as f:
+            assert re.search(r'^name: "([^"]+)"', f.read()).group(1) == name
+        assert TritonBackend("localhost:8000", layout=layout).model_name == name
+        assert SeldonBackend("http://seldon", layout=layout).predict_url == f"http://seldon/v2/models/{name}/infer"
+
+
+def test_triton_packed_layout_sends_one_tensor():
+    from src.app.backends import TritonBackend
+    backend = TritonBackend("localhost:8001", protocol="grpc", layout="packed")
+    inputs, _ = backend._build_request(np.ones((5, 13), dtype=np.float32))
+
+    assert backend.model_name == "ensemble-packed"
+    assert [inp.name() for inp in inputs] == ["float_input"]
+    assert inputs[0].shape() == [5, 13]
+
+
+def test_onnx_backend_matches_sklearn(tmp_path):
+    from sklearn.linear_model import LinearRegression
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from src.app.backends import OnnxBackend
+
+    rng = np.random.default_rng(0)
+    X = rng.random((50, 13)).astype(np.float32)
+    y = X @ rng.random(13)
+    estimator = LinearRegression().fit(X, y)
+
+    onx = convert_sklearn(estimator, initial_types=[("float_input", FloatTensorType([None, 13]))])
+    model_path = tmp_path / "model.onnx"
+    model_path.write_bytes(onx.SerializeToString())
+
+    async def scenario():
+        backend = OnnxBackend(model_path=str(model_path))
+        await backend.start()
+        small = await backend.predict(X[:1])
+        large = await backend.predict(X)
+        return backend.ready, small, large
+
+    ready, small, large = asyncio.run(scenario())
+
+    assert ready
+    assert small.shape == (1,)
+    assert large == pytest.approx(estimator.predict(X), rel=1e-4)
+
+
+def test_chunks_of_one_request_are_sent_with_bounded_concurrency():
+    import asyncio
+    from src.app.backends import gather_chunks
+
+    running, peak = 0, 0
+
+    async def infer_chunk(chunk):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return chunk.sum(axis=1)
+
+    X = np.ones((100, 13), dtype=np.float32)
+    predictions = asyncio.run(gather_chunks(infer_chunk, X, limit=3))
+
+    assert np.concatenate(predictions).tolist() == [13.0] * 100
+    assert peak == 3
@@ -0,0 +1,70 @@
+import asyncio
+import numpy as np
+import pytest
+
+from src.app.batching import MicroBatcher
+
+
+def test_concurrent_rows_are_stacked_into_few_backend_calls():
+    calls = []
+
+    async def infer(X):
+        calls.append(X.shape[0])
+        return X.sum(axis=1)
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=8, max_wait_us=50_000)
+        rows = [np.full(13, i, dtype=np.float32) for i in range(20)]
+        results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert results == [pytest.approx(13.0 * i) for i in range(20)]
+    assert sum(calls) == 20
+    assert max(calls) <= 8
+    assert len(calls) == 3
+
+
+def test_backend_error_is_raised_to_every_caller():
+    async def infer(X):
+        raise RuntimeError("backend down")
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=4, max_wait_us=1000)
+        rows = [np.zeros(13, dtype=np.float32) for _ in range(3)]
+        results = await asyncio.gather(*(batcher.submit(row) for row in rows), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+
+def test_batch_stages_are_charged_to_every_waiting_request():
+    from src.app.instrumentation import StageTimer, _current, record
+
+    async def infer(X):
+        record("decode", 0.001)
+        return X.sum(axis=1)
+
+    async def request(batcher, timer):
+        _current.set(timer)
+        return await batcher.submit(np.ones(13, dtype=np.float32))
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=8, max_wait_us=20_000)
+        first = StageTimer("/predict")
+        await asyncio.create_task(request(batcher, first))
+        # Later batches must not report into the request that started the worker
+        later = [StageTimer("/predict") for _ in range(3)]
+        await asyncio.gather(*(asyncio.create_task(request(batcher, t)) for t in later))
+        await batcher.close()
+        return first, later
+
+    first, later = asyncio.run(scenario())
+
+    assert first.timings["decode"] == pytest.approx(0.001)
+    assert [t.timings["decode"] for t in later] == [pytest.approx(0.001)] * 3
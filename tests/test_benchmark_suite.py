@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from benchmarks.fake_v2_server import create_app
+from benchmarks.suite import compare, open_loop
+
+
+def result(rows_per_second=1000.0, p99_ms=10.0, errors=0):
+    return {"rows_per_second": rows_per_second, "p99_ms": p99_ms, "errors": errors}
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"app-local": {"closed/c1/b1": result(), "closed/c8/b1": result()}}
+    current = {
+        "app-local": {
+            "closed/c1/b1": result(rows_per_second=900, p99_ms=11),  # within 15%
+            "closed/c8/b1": result(rows_per_second=800, p99_ms=20, errors=2),
+            "open/r100/b1": result(rows_per_second=1),  # not in the baseline
+        },
+        "app-onnx": {"closed/c1/b1": result(rows_per_second=1)},
+    }
+    regressions = compare(current, baseline, tolerance=0.15)
+    assert len(regressions) == 3
+    assert all(line.startswith("app-local closed/c8/b1") for line in regressions)
+
+
+def test_compare_ignores_tiny_p99_changes():
+    baseline = {"onnx-direct": {"closed/c1/b1": result(p99_ms=0.02)}}
+    current = {"onnx-direct": {"closed/c1/b1": result(p99_ms=0.05)}}
+    assert compare(current, baseline, tolerance=0.15) == []
+
+
+def test_open_loop_keeps_schedule():
+    async def send():
+        await asyncio.sleep(0.001)
+        return True
+
+    latencies, errors, elapsed = asyncio.run(open_loop(send, rate=200, duration=0.5))
+    assert len(latencies) == 100 and errors == 0
+    assert 0.45 < elapsed < 1.0
+
+
+def test_fake_server_answers_json_and_binary_requests():
+    client = TestClient(create_app())
+    rows = np.arange(6, dtype=np.float32).reshape(2, 3)
+
+    response = client.post("/v2/models/wine/infer", json={
+        "inputs": [{"name": "x", "datatype": "FP32", "shape": [2, 3], "data": rows.ravel().tolist()}]
+    })
+    assert response.json()["outputs"][0]["data"] == [3.0, 12.0]
+
+    header = json.dumps({
+        "inputs": [{"name": "x", "datatype": "FP32", "shape": [2, 3],
+                    "parameters": {"binary_data_size": rows.nbytes}}],
+        "outputs": [{"name": "prediction", "parameters": {"binary_data": True}}],
+    }).encode()
+    response = client.post(
+        "/v2/models/wine/infer", content=header + rows.tobytes(),
+        headers={"Inference-Header-Content-Length": str(len(header))}
+    )
+    length = int(response.headers["inference-header-content-length"])
+    assert np.frombuffer(response.content[length:], dtype=np.float32).tolist() == [3.0, 12.0]
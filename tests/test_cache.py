@@ -0,0 +1,68 @@
+import numpy as np
+
+from src.app.cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def row(value):
+    return np.full(13, value, dtype=np.float32)
+
+
+def test_lru_eviction_keeps_recently_used_rows():
+    cache = PredictionCache(max_entries=2)
+    cache.check_version("v1")
+    a, b, c = (cache.key(row(v)) for v in (1.0, 2.0, 3.0))
+
+    cache.put(a, 1.0, "v1")
+    cache.put(b, 2.0, "v1")
+    assert cache.get(a) == 1.0  # a is now most recently used
+    cache.put(c, 3.0, "v1")
+
+    assert cache.get(b) is None
+    assert cache.get(a) == 1.0
+    assert cache.get(c) == 3.0
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = PredictionCache(ttl_seconds=10, clock=clock)
+    cache.check_version("v1")
+    key = cache.key(row(1.0))
+    cache.put(key, 5.0, "v1")
+
+    clock.now = 9.9
+    assert cache.get(key) == 5.0
+    clock.now = 10.0
+    assert cache.get(key) is None
+    assert len(cache) == 0
+
+
+def test_quantized_keys_share_entries():
+    cache = PredictionCache(decimals=2)
+    assert cache.key(row(1.0001)) == cache.key(row(1.0))
+    assert cache.key(row(1.01)) != cache.key(row(1.0))
+
+
+def test_new_model_version_invalidates_entries():
+    cache = PredictionCache()
+    cache.check_version("v1")
+    key = cache.key(row(1.0))
+    cache.put(key, 1.0, "v1")
+
+    cache.check_version("v2")
+    assert cache.get(key) is None
+    # A result computed by the old model is not stored under the new version
+    cache.put(key, 1.0, "v1")
+    assert len(cache) == 0
+
+
+def test_memory_cap_limits_entries():
+    cache = PredictionCache(max_entries=1_000_000, max_bytes=10_000)
+    assert 0 < cache.max_entries < 100
@@ -0,0 +1,38 @@
+import json
+import numpy as np
+import pytest
+
+from src.drift.artifact import DetectorArtifact, METADATA_FILE, is_artifact, save_artifact
+from src.drift.engine import DriftEngine, ReferenceProfile
+
+
+def test_artifact_round_trips_with_memory_mapped_arrays(tmp_path):
+    x_ref = np.random.default_rng(0).normal(size=(2000, 13)).astype(np.float32)
+    save_artifact(tmp_path, x_ref, p_val=0.01)
+
+    assert is_artifact(tmp_path)
+    artifact = DetectorArtifact(tmp_path)
+
+    assert artifact.metadata["p_val"] == 0.01 and artifact.metadata["n_rows"] == 2000
+    assert isinstance(artifact.array("x_ref"), np.memmap)
+    assert np.array_equal(artifact.array("x_ref"), x_ref)
+
+    expected = ReferenceProfile.from_data(x_ref)
+    profile = artifact.profile
+    assert not profile.edges.flags.owndata and not profile.ref_counts.flags.owndata
+    assert np.array_equal(profile.ref_cdf, expected.ref_cdf)
+    assert artifact._detector is None
+
+    result = DriftEngine(profile, windows=(100,)).update(x_ref[:100])
+    assert result["p_val"].shape == (1, 13)
+
+
+def test_unknown_format_version_is_rejected(tmp_path):
+    save_artifact(tmp_path, np.zeros((50, 13), dtype=np.float32))
+    path = tmp_path / METADATA_FILE
+    metadata = json.loads(path.read_text())
+    metadata["format_version"] = 99
+    path.write_text(json.dumps(metadata))
+
+    with pytest.raises(ValueError, match="format 99"):
+        DetectorArtifact(tmp_path)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import numpy as np
+
+from src.app.drift_logger import DriftLogger, SpoolSink
+
+
+class RecordingSink:
+    def __init__(self, fail=False, delay=0.0):
+        self.batches = []
+        self.fail = fail
+        self.delay = delay
+
+    async def send(self, X):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("drift server down")
+        self.batches.append(X)
+
+    async def close(self):
+        pass
+
+
+def rows(n, start=0):
+    return np.arange(start, start + n, dtype=np.float32).repeat(13).reshape(n, 13)
+
+
+def test_rows_are_sent_in_batches_without_blocking_log():
+    sink = RecordingSink(delay=0.05)
+
+    async def scenario():
+        logger = DriftLogger(sink, batch_size=4, flush_interval=10)
+        for i in range(10):
+            logger.log(rows(1, i))
+        assert sink.batches == []
+        await asyncio.sleep(0.2)
+        await logger.close()
+
+    asyncio.run(scenario())
+
+    assert [len(b) for b in sink.batches] == [4, 4, 2]
+    assert np.concatenate(sink.batches)[:, 0].tolist() == list(range(10))
+
+
+def test_partial_batch_is_flushed_after_interval():
+    sink = RecordingSink()
+
+    async def scenario():
+        logger = DriftLogger(sink, batch_size=100, flush_interval=0.01)
+        logger.log(rows(3))
+        await asyncio.sleep(0.1)
+        sent = [len(b) for b in sink.batches]
+        await logger.close()
+        return sent
+
+    assert asyncio.run(scenario()) == [3]
+
+
+def test_overflow_policies():
+    async def scenario(overflow):
+        sink = RecordingSink()
+        logger = DriftLogger(sink, batch_size=1000, flush_interval=10, max_queue_rows=5, overflow=overflow)
+        logger.log(rows(3, 0))
+        logger.log(rows(3, 3))
+        await logger.close()
+        return np.concatenate(sink.batches)[:, 0].tolist()
+
+    assert asyncio.run(scenario("drop_newest")) == [0, 1, 2]
+    assert asyncio.run(scenario("drop_oldest")) == [3, 4, 5]
+
+
+def test_sampling_and_failures_never_raise(tmp_path):
+    async def scenario():
+        logger = DriftLogger(RecordingSink(fail=True), sample_rate=0.5, batch_size=10, seed=0)
+        logger.log(rows(1000))
+        queued = logger._queued_rows
+        await logger.close()
+        return queued
+
+    queued = asyncio.run(scenario())
+    assert 400 < queued < 600
+
+
+def test_spool_sink_appends_ndjson(tmp_path):
+    path = tmp_path / "drift.ndjson"
+
+    async def scenario():
+        logger = DriftLogger(SpoolSink(str(path)), batch_size=2)
+        logger.log(rows(3))
+        await logger.close()
+
+    asyncio.run(scenario())
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line[0] for line in lines] == [0, 1, 2] and len(lines[0]) == 13
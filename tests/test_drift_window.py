@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from src.drift.window import DriftWindow, RingBuffer, as_matrix, stack_features
+from src.model.features import FEATURE_NAMES
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingDetector:
+    def __init__(self):
+        self.windows = []
+
+    def predict(self, X):
+        self.windows.append(X.copy())
+        return {"data": {"is_drift": int(X.mean() > 10), "p_val": np.full(X.shape[1], 0.5)}}
+
+
+def test_stack_features_keeps_every_row():
+    columns = {name: np.arange(4, dtype=np.float64).reshape(4, 1) + j for j, name in enumerate(FEATURE_NAMES)}
+    del columns["proline"]
+
+    X = stack_features(columns)
+
+    assert X.shape == (4, 13) and X.dtype == np.float32
+    assert X[:, 0].tolist() == [0, 1, 2, 3]
+    assert X[:, -1].tolist() == [0, 0, 0, 0]
+    assert as_matrix(np.zeros(26)).shape == (2, 13)
+
+
+def test_ring_buffer_wraps_in_arrival_order():
+    buffer = RingBuffer(5, width=2)
+    buffer.extend(np.array([[0, 0], [1, 1], [2, 2]], dtype=np.float32))
+    buffer.extend(np.array([[3, 3], [4, 4], [5, 5], [6, 6]], dtype=np.float32))
+
+    assert len(buffer) == 5
+    assert buffer.values()[:, 0].tolist() == [2, 3, 4, 5, 6]
+
+
+def test_window_tests_once_per_window_of_rows():
+    detector = CountingDetector()
+    window = DriftWindow(detector, max_rows=6, test_every=4, min_rows=1, width=2)
+
+    for value in range(3):
+        result = window.update(np.full((1, 2), value, dtype=np.float32))
+    assert detector.windows == [] and result["window_rows"] == 0 and np.isnan(result["p_val"]).all()
+
+    result = window.update(np.full((5, 2), 20, dtype=np.float32))
+
+    assert len(detector.windows) == 1
+    assert detector.windows[0][:, 0].tolist() == [2, 20, 20, 20, 20, 20]
+    assert result == window.result and result["is_drift"] == 1 and result["window_rows"] == 6
+
+
+def test_window_by_time_only_sees_recent_rows():
+    clock = FakeClock()
+    detector = CountingDetector()
+    window = DriftWindow(detector, max_rows=100, max_age_seconds=60, test_every=100, min_rows=1, width=2, clock=clock)
+
+    window.update(np.zeros((3, 2), dtype=np.float32))
+    clock.now = 45
+    window.update(np.ones((2, 2), dtype=np.float32))
+    assert detector.windows == []
+
+    clock.now = 70
+    result = window.update(np.ones((1, 2), dtype=np.float32))
+
+    assert len(detector.windows) == 1
+    assert detector.windows[0].tolist() == [[1, 1]] * 3
+    assert result["window_rows"] == 3
+
+
+def test_stack_features_rejects_ragged_columns():
+    with pytest.raises(ValueError):
+        stack_features({"alcohol": [1, 2], "ash": [1, 2, 3]})
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.model.features import FEATURE_NAMES, TRAINING_COLUMNS, SCHEMA
+
+
+class Record:
+    def __init__(self, values):
+        for name, value in zip(FEATURE_NAMES, values):
+            setattr(self, name, value)
+
+
+def test_training_columns_use_csv_spelling():
+    assert len(TRAINING_COLUMNS) == len(FEATURE_NAMES) == 13
+    assert "od280/od315_of_diluted_wines" in TRAINING_COLUMNS
+    assert "od280_od315_of_diluted_wines" not in TRAINING_COLUMNS
+
+
+def test_schema_packs_records_and_mappings_in_order():
+    values = [float(i) for i in range(13)]
+    mapping = dict(zip(TRAINING_COLUMNS, values))
+
+    assert SCHEMA.row(Record(values)).tolist() == values
+    assert SCHEMA.row_from_mapping(mapping).tolist() == values
+    assert SCHEMA.row(Record(values)).dtype == np.float32
+
+
+def test_schema_fills_preallocated_buffer():
+    buffer = np.zeros((8, 13), dtype=np.float32)
+    records = [Record([float(r)] * 13) for r in range(3)]
+
+    out = SCHEMA.rows(records, out=buffer)
+
+    assert out.shape == (3, 13)
+    assert np.shares_memory(out, buffer)
+    assert buffer[2, 0] == 2.0
+    with pytest.raises(ValueError):
+        SCHEMA.rows([Record([0.0] * 13)] * 9, out=buffer)
+
+
+def test_local_backend_accepts_arrays_from_dataframe_fitted_model():
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+    from src.app.backends import compile_estimator
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.random((20, 13)), columns=TRAINING_COLUMNS)
+    estimator = LinearRegression().fit(frame, rng.random(20))
+    expected = estimator.predict(frame)
+
+    compiled = compile_estimator(estimator)
+
+    assert not hasattr(compiled, "feature_names_in_")
+    assert compiled.predict(frame.values.astype(np.float32)) == pytest.approx(expected, rel=1e-5)
+
+    reordered = LinearRegression().fit(frame[list(reversed(TRAINING_COLUMNS))], rng.random(20))
+    with pytest.raises(ValueError):
+        compile_estimator(reordered)
@@ -0,0 +1,56 @@
+import logging
+import time
+
+from prometheus_client import REGISTRY
+
+from src.app.instrumentation import StageTimer, debug_sampled
+
+
+def test_nested_stage_is_left_out_of_the_enclosing_one():
+    timer = StageTimer("/predict")
+    time.sleep(0.01)
+    timer.mark("pack")
+    time.sleep(0.03)
+    timer.add("decode", 0.02)
+    timer.mark("backend")
+
+    assert timer.timings["pack"] >= 0.01
+    assert timer.timings["decode"] == 0.02
+    assert 0.01 <= timer.timings["backend"] < 0.03
+
+
+def test_debug_lines_are_not_formatted_above_debug_level():
+    class Loud:
+        def __str__(self):
+            raise AssertionError("formatted although DEBUG is off")
+
+    logger = logging.getLogger("wine.test")
+    logger.setLevel(logging.INFO)
+    debug_sampled(logger, "row %s", Loud())
+
+
+def test_requests_are_observed_per_stage(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.app import main
+    from src.app.backends import FEATURE_NAMES, LocalBackend
+
+    class SumModel:
+        def predict(self, data):
+            return data.sum(axis=1)
+
+    monkeypatch.setattr(main, "backend", LocalBackend(SumModel(), version="v-test"))
+    row = dict(zip(FEATURE_NAMES, [1.0] * 13))
+
+    def count(stage):
+        labels = {"endpoint": "/predict/batch", "stage": stage, "mode": main.SERVING_MODE, "version": "v-test"}
+        return REGISTRY.get_sample_value("wine_request_stage_seconds_count", labels) or 0
+
+    before = {stage: count(stage) for stage in ("validate", "pack", "queue", "backend", "serialize")}
+    response = TestClient(main.app).post("/predict/batch", json={"instances": [row, row]})
+
+    assert response.json() == {"predictions": [13.0, 13.0]}
+    for stage, value in before.items():
+        assert count(stage) == value + 1, stage
+    assert REGISTRY.get_sample_value(
+        "wine_request_seconds_count", {"endpoint": "/predict/batch", "mode": main.SERVING_MODE, "version": "v-test"}
+    ) >= 1
@@ -0,0 +1,32 @@
+import asyncio
+
+from src.app.limits import ConcurrencyLimiter, Saturated
+
+
+def test_limiter_rejects_when_saturated():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_inflight=1, max_waiting=1, acquire_timeout=0.05)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        async def try_once():
+            try:
+                async with limiter.slot():
+                    return 200
+            except Saturated as e:
+                return e.status_code
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(try_once())
+        await asyncio.sleep(0)
+        rejected = await try_once()
+        timed_out = await waiter
+        release.set()
+        await holder
+        return rejected, timed_out
+
+    assert asyncio.run(scenario()) == (429, 503)
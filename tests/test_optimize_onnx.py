@@ -0,0 +1,42 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import ElasticNet
+
+from src.model.optimize_onnx import linear_graph, optimize, predict, session
+
+
+def make_data(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 13)).astype(np.float32)
+    return X, X @ rng.normal(size=13) + 5
+
+
+def test_linear_model_picks_a_variant_within_tolerance():
+    X, y = make_data()
+    model = ElasticNet(alpha=0.01).fit(X, y)
+
+    best, model_bytes, report = optimize(model, X[:50], tolerance=1e-4, batch_sizes=(1, 8), repeats=5)
+
+    assert best in report["variants"] and "skipped" not in report["variants"][best]
+    assert {"baseline", "linear_matmul", "linear_int8", "linear_fp16"} <= set(report["variants"])
+    # int8 / fp16 only survive when they stay within tolerance
+    for entry in report["variants"].values():
+        assert "skipped" in entry or entry["max_error"] <= 1e-4
+    assert np.allclose(predict(session(model_bytes), X[:50]), model.predict(X[:50]), atol=1e-3)
+
+
+def test_matmul_graph_matches_sklearn():
+    X, y = make_data(1)
+    model = ElasticNet(alpha=0.1).fit(X, y)
+
+    assert np.allclose(predict(session(linear_graph(model)), X), model.predict(X), atol=1e-4)
+
+
+def test_forest_variants_exclude_linear_rewrites():
+    X, y = make_data(2)
+    model = RandomForestRegressor(n_estimators=5, max_depth=3, random_state=0).fit(X, y)
+
+    best, _, report = optimize(model, X[:50], batch_sizes=(8,), repeats=3)
+
+    assert "ml_opset3" in report["variants"] and "linear_matmul" not in report["variants"]
+    assert report["selected"] == best
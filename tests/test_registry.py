@@ -0,0 +1,111 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+
+from src.app.backends import LocalBackend
+from src.app.registry import ModelRegistry
+
+
+class ConstantModel:
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+
+    def predict(self, X):
+        if self.delay:
+            time.sleep(self.delay)
+        return np.full(len(X), self.value)
+
+
+def make_registry(disk, **kwargs):
+    # `disk` stands in for the model directory: {"stamp": ..., "value": ...}
+    def factory():
+        if disk["value"] is None:
+            raise ValueError("truncated model file")
+        return LocalBackend(ConstantModel(disk["value"]), version=f"v{disk['value']}")
+    swapped = []
+    registry = ModelRegistry(
+        LocalBackend(ConstantModel(1), version="v1"),
+        factory=factory, fingerprint=lambda: disk["stamp"], on_swap=swapped.append, **kwargs
+    )
+    return registry, swapped
+
+
+def test_reload_swaps_only_when_the_model_changed():
+    disk = {"stamp": 1, "value": 1}
+    registry, swapped = make_registry(disk)
+
+    async def scenario():
+        unchanged = await registry.reload()
+        disk.update(stamp=2, value=2)
+        changed = await registry.reload()
+        return unchanged, changed
+
+    assert asyncio.run(scenario()) == (False, True)
+    assert registry.backend.version == "v2" and registry.previous.version == "v1"
+    assert swapped == [registry.backend]
+
+
+def test_failed_load_keeps_serving_current_model():
+    disk = {"stamp": 1, "value": 1}
+    registry, swapped = make_registry(disk)
+    disk.update(stamp=2, value=None)
+
+    with pytest.raises(ValueError):
+        asyncio.run(registry.reload())
+    assert registry.backend.version == "v1" and swapped == []
+
+
+def test_rollback_returns_to_previous_version():
+    disk = {"stamp": 1, "value": 1}
+    registry, _ = make_registry(disk)
+
+    async def scenario():
+        with pytest.raises(LookupError):
+            await registry.rollback()
+        disk.update(stamp=2, value=2)
+        await registry.reload()
+        await registry.rollback()
+        # The rolled-back-from model is still on disk, so polling does not re-apply it
+        return await registry.reload()
+
+    assert asyncio.run(scenario()) is False
+    assert registry.backend.version == "v1" and registry.previous.version == "v2"
+
+
+def test_in_flight_request_finishes_on_old_version():
+    disk = {"stamp": 1, "value": 1}
+    registry = ModelRegistry(
+        LocalBackend(ConstantModel(1, delay=0.2), version="v1"),
+        factory=lambda: LocalBackend(ConstantModel(2), version="v2"),
+        fingerprint=lambda: disk["stamp"]
+    )
+
+    async def scenario():
+        current = registry.backend
+        in_flight = asyncio.create_task(current.predict(np.zeros((1, 13), dtype=np.float32)))
+        await asyncio.sleep(0.05)
+        disk["stamp"] = 2
+        await registry.reload()
+        after = await registry.backend.predict(np.zeros((1, 13), dtype=np.float32))
+        return (await in_flight)[0], after[0]
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_watcher_picks_up_new_model():
+    disk = {"stamp": 1, "value": 1}
+    registry, _ = make_registry(disk, poll_interval=0.01)
+
+    async def scenario():
+        registry.start_watching()
+        disk.update(stamp=2, value=3)
+        for _ in range(100):
+            if registry.backend.version == "v3":
+                break
+            await asyncio.sleep(0.01)
+        await registry.close()
+
+    asyncio.run(scenario())
+    assert registry.backend.version == "v3"
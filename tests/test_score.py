@@ -0,0 +1,24 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+
+def test_malformed_input_exits_with_a_readable_error(tmp_path):
+    X = np.random.default_rng(0).random((20, 13))
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(LinearRegression().fit(X, X.sum(axis=1)), f)
+    requests = tmp_path / "requests.jsonl"
+    requests.write_text('{"alcohol": 13.2}\n')
+
+    env = dict(os.environ, PYTHONPATH=os.getcwd(), SERVING_MODE="local", MODEL_PATH=str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, "src/model/score.py", str(requests)], env=env, capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 1
+    assert "Traceback" not in result.stderr
+    assert "line 1: missing feature 'malic_acid'" in result.stderr
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.model.search import budget_steps, expand_grid, run_search, sample_candidates
+
+
+class FakeExecutor:
+    """Scores candidates without fitting: RMSE = alpha, improving with budget."""
+
+    def __init__(self):
+        self.calls = []
+
+    def run(self, candidates, fraction=1.0):
+        self.calls.append((len(candidates), fraction))
+        for algo, params in candidates:
+            yield {"algorithm": algo, "params": params, "fraction": fraction,
+                   "rmse": params["alpha"] + (1 - fraction)}
+
+
+SPACES = {"elastic_net": {"alpha": [float(a) for a in range(27)], "l1_ratio": [0.5]}}
+
+
+def test_grid_runs_every_combination_at_full_budget():
+    executor = FakeExecutor()
+    results = list(run_search(SPACES, {"strategy": "grid"}, executor))
+
+    assert len(results) == 27 and executor.calls == [(27, 1.0)]
+
+
+def test_random_samples_distinct_trials_and_ranges():
+    rng = np.random.default_rng(0)
+    picks = sample_candidates(SPACES, 10, rng)
+    assert len({p["alpha"] for _, p in picks}) == 10
+
+    ranged = {"elastic_net": {"alpha": {"low": 0.01, "high": 10, "log": True}, "l1_ratio": [0.1, 0.9]}}
+    picks = sample_candidates(ranged, 5, rng)
+    assert all(0.01 <= p["alpha"] <= 10 for _, p in picks)
+    with pytest.raises(ValueError):
+        expand_grid(ranged["elastic_net"])
+
+
+def test_successive_halving_keeps_the_best_and_spends_less():
+    executor = FakeExecutor()
+    settings = {"strategy": "halving", "max_trials": 27, "eta": 3, "min_fraction": 0.111}
+
+    results = list(run_search(SPACES, settings, executor))
+
+    assert [c[0] for c in executor.calls] == [27, 9, 3]
+    assert [round(c[1], 3) for c in executor.calls] == [0.111, 0.333, 1.0]
+    full = [r for r in results if r["fraction"] == 1.0]
+    assert min(r["params"]["alpha"] for r in full) == 0.0
+    assert sum(n * f for n, f in executor.calls) < 27 * 0.5
+
+
+def test_pruning_screens_grid_and_hyperband_brackets():
+    executor = FakeExecutor()
+    list(run_search(SPACES, {"strategy": "grid", "prune_ratio": 1.5, "min_fraction": 0.25}, executor))
+    # rung best is 0.75, so only alpha <= 0.375 survive to the full budget
+    assert executor.calls == [(27, 0.25), (1, 1.0)]
+
+    executor = FakeExecutor()
+    results = list(run_search(SPACES, {"strategy": "hyperband", "eta": 3, "min_fraction": 0.111}, executor))
+    assert {r["bracket"] for r in results} == {0, 1, 2}
+    assert budget_steps(0.111, 3, round) == 2
@@ -0,0 +1,110 @@
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from src.model.features import FEATURE_NAMES
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_gunicorn_workers_share_preloaded_model(tmp_path):
+    X = np.random.default_rng(0).random((20, 13))
+    model = LinearRegression().fit(X, X.sum(axis=1))
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(model, f)
+
+    port = free_port()
+    env = dict(
+        os.environ, PYTHONPATH=os.getcwd(), SERVING_MODE="local", MODEL_PATH=str(tmp_path),
+        WEB_CONCURRENCY="2", BIND=f"127.0.0.1:{port}", MODEL_WATCH_SECONDS="0"
+    )
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "src/app/gunicorn_conf.py", "src.app.main:app"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(300):
+            try:
+                if httpx.get(f"{url}/health/ready").status_code == 200:
+                    break
+            except httpx.TransportError:
+                time.sleep(0.05)
+        row = dict(zip(FEATURE_NAMES, [1.0] * 13))
+        predictions = [httpx.post(f"{url}/predict/batch", json={"instances": [row]}).json()["predictions"][0]
+                       for _ in range(10)]
+        metrics = httpx.get(f"{url}/metrics").text
+    finally:
+        proc.terminate()
+        output = proc.communicate(timeout=30)[0]
+
+    assert predictions == [predictions[0]] * 10
+    assert abs(predictions[0] - model.predict(np.ones((1, 13)))[0]) < 1e-4
+    # The model was loaded once, in the master, before the workers were forked
+    assert output.count("Model loaded locally") == 1
+    assert "frozen for copy-on-write sharing across 2 workers" in output
+    assert 'wine_app_startup_seconds{phase="load"}' in metrics
+
+
+def test_gunicorn_master_reloads_the_model_for_all_workers(tmp_path):
+    X = np.random.default_rng(0).random((20, 13))
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(LinearRegression().fit(X, X.sum(axis=1)), f)
+
+    port = free_port()
+    env = dict(
+        os.environ, PYTHONPATH=os.getcwd(), SERVING_MODE="local", MODEL_PATH=str(tmp_path),
+        WEB_CONCURRENCY="2", BIND=f"127.0.0.1:{port}", MODEL_WATCH_SECONDS="0.2"
+    )
+    for name in ("PROMETHEUS_MULTIPROC_DIR", "GUNICORN_OWN_METRICS_DIR", "GUNICORN_MODEL_WATCH_SECONDS"):
+        env.pop(name, None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "src/app/gunicorn_conf.py", "src.app.main:app"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    url = f"http://127.0.0.1:{port}"
+    row = dict(zip(FEATURE_NAMES, [1.0] * 13))
+
+    def predictions():
+        try:
+            return {httpx.post(f"{url}/predict/batch", json={"instances": [row]}).json()["predictions"][0]
+                    for _ in range(10)}
+        except (httpx.TransportError, KeyError):
+            return set()
+
+    try:
+        for _ in range(300):
+            if predictions():
+                break
+            time.sleep(0.05)
+        before = predictions()
+
+        with open(tmp_path / "model.pkl", "wb") as f:
+            pickle.dump(LinearRegression().fit(X, 2 * X.sum(axis=1)), f)
+        for _ in range(300):
+            after = predictions()
+            if after and after != before and len(after) == 1:
+                break
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        output = proc.communicate(timeout=30)[0]
+
+    assert len(before) == 1 and abs(before.pop() - 13.0) < 1e-4
+    assert len(after) == 1 and abs(after.pop() - 26.0) < 1e-4
+    # Reloaded once, by the master; the workers never watch themselves
+    assert output.count("Model loaded locally") == 1
+    assert output.count("Model reloaded") == 1
+    assert "Model on disk changed, reloading workers" in output
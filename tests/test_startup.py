@@ -0,0 +1,46 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+from sklearn.linear_model import LinearRegression
+
+from src.app.backends import load_local_model
+
+# Modules only the backend of another serving mode (or training) needs
+HEAVY = ("mlflow", "pandas", "tritonclient", "aiohttp", "httpx", "onnxruntime", "requests", "sklearn")
+
+
+def imported_after_app_import(**env):
+    code = (
+        "import sys, json; import src.app.main; "
+        f"print(json.dumps(sorted(m for m in {HEAVY!r} if m in sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd(), **env}
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_onnx_mode_import_skips_other_backends():
+    # The session itself is created at startup, not on import
+    assert imported_after_app_import(SERVING_MODE="onnx", ONNX_MODEL_PATH="missing.onnx") == []
+
+
+def test_triton_mode_import_skips_mlflow_and_onnxruntime():
+    loaded = imported_after_app_import(SERVING_MODE="triton", TRITON_URL="localhost:8000")
+    assert "tritonclient" in loaded
+    assert not {"mlflow", "onnxruntime", "pandas", "sklearn"} & set(loaded)
+
+
+def test_local_model_loads_pickle_without_mlflow(tmp_path):
+    model = LinearRegression().fit([[0.0] * 13, [1.0] * 13], [0.0, 1.0])
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(model, f)
+
+    loaded, version = load_local_model(str(tmp_path))
+
+    assert loaded.predict([[1.0] * 13])[0] == model.predict([[1.0] * 13])[0]
+    assert version == "local"
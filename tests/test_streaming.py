@@ -0,0 +1,66 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+
+from src.app.streaming import ChunkParser, LineSplitter, StreamFormatError, stream_ndjson
+from src.model.features import FEATURE_NAMES, TRAINING_COLUMNS
+
+
+async def blocks_of(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def row_sums(X):
+    await asyncio.sleep(0)
+    return X.sum(axis=1)
+
+
+def collect(data, fmt, chunk_rows=4, block_size=7):
+    async def scenario():
+        out = b""
+        async for part in stream_ndjson(blocks_of(data, block_size), fmt, row_sums, chunk_rows, max_inflight=2):
+            out += part
+        return [json.loads(line) for line in out.decode().splitlines()]
+    return asyncio.run(scenario())
+
+
+def test_ndjson_stream_preserves_order_across_chunks():
+    rows = [[float(i)] * 13 for i in range(10)]
+    data = "\n".join(json.dumps(dict(zip(FEATURE_NAMES, r))) for r in rows).encode()
+
+    lines = collect(data, "ndjson")
+
+    assert [line["prediction"] for line in lines] == pytest.approx([13.0 * i for i in range(10)])
+
+
+def test_csv_stream_maps_header_columns():
+    header = ",".join(["target"] + list(reversed(TRAINING_COLUMNS)))
+    body = "\n".join(",".join(["0"] + [str(v) for v in reversed(range(13))]) for _ in range(3))
+    data = (header + "\n" + body + "\n").encode()
+
+    lines = collect(data, "csv")
+
+    assert [line["prediction"] for line in lines] == [float(sum(range(13)))] * 3
+
+
+def test_bad_line_ends_stream_with_error():
+    good = json.dumps([1.0] * 13)
+    data = "\n".join([good, good, "{not json"]).encode()
+
+    lines = collect(data, "ndjson", chunk_rows=1)
+
+    assert lines[:2] == [{"prediction": 13.0}, {"prediction": 13.0}]
+    assert "line 3" in lines[-1]["error"]
+
+
+def test_parser_reuses_fixed_chunk_buffer():
+    splitter = LineSplitter()
+    parser = ChunkParser("ndjson", chunk_rows=2)
+    lines = splitter.feed(b"[" + b",".join([b"1"] * 13) + b"]\n[" + b",".join([b"2"] * 13) + b"]")
+    assert parser.feed(lines) == []
+    chunks = parser.feed(splitter.flush())
+    assert len(chunks) == 1 and chunks[0].shape == (2, 13) and chunks[0].dtype == np.float32
+    with pytest.raises(StreamFormatError):
+        parser.feed(["[1, 2]"])
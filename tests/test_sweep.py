@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src.model.sweep import run_sweep
+
+
+def make_arrays(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, 13))
+    y = X @ rng.normal(size=13) + rng.normal(scale=0.1, size=300)
+    return {"train_x": X[:200], "train_y": y[:200], "test_x": X[200:], "test_y": y[200:]}
+
+
+CANDIDATES = [
+    ("elastic_net", {"alpha": 0.1, "l1_ratio": 0.1}),
+    ("elastic_net", {"alpha": 1.0, "l1_ratio": 0.5}),
+    ("random_forest", {"n_estimators": 5, "max_depth": 3}),
+]
+
+
+def by_candidate(results):
+    return {(r["algorithm"], tuple(r["params"].items())): r for r in results}
+
+
+def test_parallel_sweep_matches_inline_sweep():
+    arrays = make_arrays()
+
+    inline = by_candidate(run_sweep(CANDIDATES, arrays, seed=42, workers=1))
+    parallel = by_candidate(run_sweep(CANDIDATES, arrays, seed=42, workers=2))
+
+    assert inline.keys() == parallel.keys() and len(inline) == 3
+    for key, result in inline.items():
+        assert parallel[key]["rmse"] == pytest.approx(result["rmse"])
+        assert list(parallel[key]["model"].feature_names_in_)[-1] == "proline"
@@ -0,0 +1,93 @@
+import mlflow
+from mlflow.tracking import MlflowClient
+
+from src.model.tracking import RunSyncer, Tracker, relog_artifacts
+
+
+def log_local_run(local_uri, tmp_path):
+    client = MlflowClient(tracking_uri=local_uri)
+    experiment_id = client.create_experiment("sweep")
+    run = client.create_run(experiment_id, run_name="elastic_net_alpha0.1")
+    run_id = run.info.run_id
+    client.log_batch(run_id, params=[mlflow.entities.Param("alpha", "0.1")],
+                     metrics=[mlflow.entities.Metric("rmse", 0.5, 1, 0)])
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    (model_dir / "MLmodel").write_text("flavors: {}\n")
+    client.log_artifacts(run_id, str(model_dir), artifact_path="model")
+    client.set_terminated(run_id)
+    return client, run_id
+
+
+def test_deferred_runs_are_copied_once_and_resynced_incrementally(tmp_path):
+    local_uri = (tmp_path / "local").as_uri()
+    remote_uri = (tmp_path / "remote").as_uri()
+    local, run_id = log_local_run(local_uri, tmp_path)
+
+    syncer = RunSyncer(local_uri, remote_uri)
+    remote_id = syncer.sync_run(run_id)
+
+    remote = MlflowClient(tracking_uri=remote_uri)
+    copied = remote.get_run(remote_id)
+    assert copied.data.params == {"alpha": "0.1"} and copied.data.metrics == {"rmse": 0.5}
+    assert copied.info.run_name == "elastic_net_alpha0.1" and copied.info.status == "FINISHED"
+    assert [a.path for a in remote.list_artifacts(remote_id)] == ["model"]
+
+    # New artifacts on the same run are added; nothing is duplicated
+    extra = tmp_path / "triton"
+    extra.mkdir()
+    (extra / "config.pbtxt").write_text("name: x\n")
+    local.log_artifacts(run_id, str(extra), artifact_path="triton_repo")
+
+    again = RunSyncer(local_uri, remote_uri)
+    assert again.sync_all() == {run_id: remote_id}
+    assert sorted(a.path for a in remote.list_artifacts(remote_id)) == ["model", "triton_repo"]
+    assert len(remote.get_metric_history(remote_id, "rmse")) == 1
+    assert len(remote.search_runs([copied.info.experiment_id])) == 1
+
+
+def test_offline_mode_only_uses_the_local_store(tmp_path, monkeypatch):
+    local_uri = (tmp_path / "local").as_uri()
+    monkeypatch.setenv("TRACKING_MODE", "offline")
+    previous = mlflow.get_tracking_uri()
+    tracker = Tracker.from_params({"mode": "direct", "local_uri": local_uri})
+    try:
+        tracker.start()
+        assert tracker.mode == "offline" and mlflow.get_tracking_uri() == local_uri
+        tracker.run_finished("abc")
+        assert tracker.close() == {}
+    finally:
+        mlflow.set_tracking_uri(previous)
+
+
+def test_relogged_artifacts_are_uploaded_again_by_the_next_sync(tmp_path, monkeypatch):
+    local_uri = (tmp_path / "local").as_uri()
+    remote_uri = (tmp_path / "remote").as_uri()
+    local, run_id = log_local_run(local_uri, tmp_path)
+    repo = tmp_path / "triton"
+    repo.mkdir()
+    (repo / "config.pbtxt").write_text("max_batch_size: 8\n")
+    local.log_artifacts(run_id, str(repo), artifact_path="triton_repo")
+    remote_id = RunSyncer(local_uri, remote_uri).sync_run(run_id)
+
+    (repo / "config.pbtxt").write_text("max_batch_size: 16\n")
+    monkeypatch.setenv("TRACKING_MODE", "offline")
+    assert relog_artifacts(run_id, str(repo), "triton_repo", {"local_uri": local_uri}) == local_uri
+    RunSyncer(local_uri, remote_uri).sync_run(run_id)
+
+    remote = MlflowClient(tracking_uri=remote_uri)
+    path = remote.download_artifacts(remote_id, "triton_repo/config.pbtxt", str(tmp_path))
+    assert open(path).read() == "max_batch_size: 16\n"
+
+
+def test_relog_goes_to_the_remote_run(tmp_path, monkeypatch):
+    remote_uri = (tmp_path / "remote").as_uri()
+    remote, run_id = log_local_run(remote_uri, tmp_path)
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", remote_uri)
+    monkeypatch.delenv("TRACKING_MODE", raising=False)
+    previous = mlflow.get_tracking_uri()
+    try:
+        assert relog_artifacts(run_id, str(tmp_path / "model"), "triton_repo", {"mode": "direct"}) == remote_uri
+    finally:
+        mlflow.set_tracking_uri(previous)
+    assert sorted(a.path for a in remote.list_artifacts(run_id)) == ["model", "triton_repo"]
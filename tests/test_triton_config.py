@@ -0,0 +1,107 @@
+import json
+import shutil
+
+import numpy as np
+from sklearn.linear_model import ElasticNet
+
+from src.model.optimize_onnx import convert
+from src.model.triton_config import choose, generate, model_tuning_block, rewrite_config
+
+
+def result(instances, batch_size, throughput, p95_ms, threads=1):
+    return {"instances": instances, "threads": threads, "batch_size": batch_size,
+            "throughput": throughput, "p95_ms": p95_ms}
+
+
+SETTINGS = {"latency_budget_ms": 5.0, "saturation": 0.9}
+
+
+def test_choose_picks_smallest_saturating_batch_within_budget():
+    results = [
+        result(1, 8, 5000, 1.0), result(1, 32, 9000, 2.0),
+        result(2, 8, 8000, 1.5), result(2, 32, 9500, 3.0),
+        result(2, 64, 20000, 9.0),  # faster but over the latency budget
+    ]
+
+    chosen = choose(results, SETTINGS)
+
+    assert chosen["max_batch_size"] == 32
+    assert chosen["instance_count"] == 2
+    assert chosen["preferred_batch_size"] == [16, 32]
+    assert chosen["max_queue_delay_microseconds"] == 1500
+
+
+def test_choose_keeps_template_batch_size_as_floor():
+    results = [result(1, 1, 9000, 0.1), result(1, 4, 9500, 0.5), result(1, 16, 9600, 2.0)]
+
+    chosen = choose(results, SETTINGS, min_batch_size=8)
+
+    assert chosen["max_batch_size"] == 8
+    assert chosen["preferred_batch_size"] == [4, 8]
+    assert chosen["max_queue_delay_microseconds"] == 50
+
+
+def test_rewrite_keeps_hand_tuned_batching_of_other_models():
+    template = open("model_repository/preprocessing/config.pbtxt").read()
+    chosen = choose([result(1, 16, 100, 1.0)], SETTINGS)
+
+    text = rewrite_config(template, chosen)
+
+    assert "max_batch_size: 16" in text
+    assert text == template.replace("max_batch_size: 8", "max_batch_size: 16")
+
+
+def test_rewrite_replaces_generated_model_tuning():
+    template = open("model_repository/wine_model/config.pbtxt").read()
+    first = choose([result(1, 16, 100, 1.0)], SETTINGS)
+    second = choose([result(2, 32, 100, 1.0)], SETTINGS)
+
+    text = rewrite_config(rewrite_config(template, first, model_tuning_block(first)), second, model_tuning_block(second))
+
+    assert "max_batch_size: 32" in text
+    assert text.count("dynamic_batching") == 1 and text.count("instance_group") == 1
+    assert "preferred_batch_size: [ 16, 32 ]" in text
+
+
+def test_generate_writes_repository_configs(tmp_path):
+    repo = tmp_path / "repo"
+    shutil.copytree("model_repository", repo)
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 13)).astype(np.float32)
+    model = ElasticNet(alpha=0.1).fit(X, X @ rng.normal(size=13))
+
+    chosen = generate(str(repo), convert(model), {
+        "batch_sizes": [1, 4], "instance_counts": [1, 2], "threads_per_instance": [1],
+        "duration_seconds": 0.02, "latency_budget_ms": 1000, "cpu_accelerator": "openvino",
+    })
+
+    wine = (repo / "wine_model" / "config.pbtxt").read_text()
+    assert chosen["max_batch_size"] >= 8
+    assert f"max_batch_size: {chosen['max_batch_size']}" in wine
+    assert "dynamic_batching" in wine and "KIND_CPU" in wine
+    assert "intra_op_thread_count" in wine and 'name: "openvino"' in wine
+    ensemble = (repo / "ensemble-model" / "config.pbtxt").read_text()
+    assert f"max_batch_size: {chosen['max_batch_size']}" in ensemble
+    assert "dynamic_batching" not in ensemble
+    preprocessing = (repo / "preprocessing" / "config.pbtxt").read_text()
+    assert "preferred_batch_size: [ 4, 8 ]" in preprocessing
+    report = json.loads((repo / "profile.json").read_text())
+    assert report["chosen"] == chosen and report["results"]
+
+
+def test_regenerating_can_lower_max_batch_size(tmp_path, monkeypatch):
+    from src.model import triton_config
+    repo = tmp_path / "repo"
+    shutil.copytree("model_repository", repo)
+    sweeps = iter([
+        [result(1, 8, 100, 1.0), result(1, 32, 1000, 1.0)],  # first model saturates at 32
+        [result(1, 8, 1000, 0.1), result(1, 32, 1000, 0.4)],  # optimized model already at 8
+    ])
+    monkeypatch.setattr(triton_config, "profile", lambda model_bytes, settings: next(sweeps))
+
+    first = generate(str(repo), b"", SETTINGS)
+    second = generate(str(repo), b"", SETTINGS)
+
+    assert first["max_batch_size"] == 32
+    assert second["max_batch_size"] == 8
+    assert "max_batch_size: 8" in (repo / "wine_model" / "config.pbtxt").read_text()